@@ -1,18 +1,12 @@
-from crewai import Agent, LLM
-from config.settings import settings
+from crewai import Agent
+from llm.factory import create_llm
 from tools.analysis_tool import AnalysisTool
 
 def create_analyst_agent():
     """
     Creates the Analyst Agent responsible for analyzing research findings
     """
-    llm = LLM(
-        model=settings.MODEL_NAME,
-        base_url=settings.GROQ_BASE_URL,
-        api_key=settings.GROQ_API_KEY,
-        temperature=settings.TEMPERATURE,
-        max_tokens=settings.MAX_TOKENS,
-    )
+    llm = create_llm()
     
     return Agent(
         role="Senior Data Analyst",
@@ -1,18 +1,14 @@
-from crewai import Agent, LLM
-from config.settings import settings
+from crewai import Agent
+from llm.factory import create_llm
 from tools.fact_check_tool import FactCheckTool
+from tools.passage_search_tool import PassageSearchTool
+from tools.knowledge_search_tool import KnowledgeSearchTool
 
 def create_fact_checker_agent():
     """
     Creates the Fact-Checker Agent responsible for verifying claims
     """
-    llm = LLM(
-        model=settings.MODEL_NAME,
-        base_url=settings.GROQ_BASE_URL,
-        api_key=settings.GROQ_API_KEY,
-        temperature=0.3,  # Lower temperature for more factual, consistent checking
-        max_tokens=settings.MAX_TOKENS,
-    )
+    llm = create_llm(temperature=0.3)  # Lower temperature for more factual, consistent checking
     
     return Agent(
         role="Senior Fact-Checker",
@@ -26,7 +22,7 @@ def create_fact_checker_agent():
             "only accurate, verified information makes it into the final report. You are thorough, precise, "
             "and take pride in maintaining the highest standards of factual accuracy."
         ),
-        tools=[FactCheckTool()],
+        tools=[FactCheckTool(), PassageSearchTool(), KnowledgeSearchTool()],
         llm=llm,
         verbose=True,
         allow_delegation=False,
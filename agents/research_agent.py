@@ -1,22 +1,18 @@
-from crewai import Agent, LLM
-from config.settings import settings
-from tools.web_search_tool import WebSearchTool
-from tools.web_scraper_tool import WebScraperTool
-from crewai_tools import SerperDevTool
+from crewai import Agent
+from llm.factory import create_llm
+from tools.web_search_tool import WebSearchTool, MultiQuerySearchTool
+from tools.web_scraper_tool import WebScraperTool, BatchWebScraperTool
+from tools.passage_search_tool import PassageSearchTool
+from tools.knowledge_search_tool import KnowledgeSearchTool
 
 
-def create_research_agent():
+def create_research_agent(search_backends=None):
     """
-    Creates the Research Agent responsible for gathering information
+    Creates the Research Agent responsible for gathering information.
+    search_backends overrides settings.SEARCH_BACKENDS for this agent's searches.
     """
 
-    llm = LLM(
-        model=settings.MODEL_NAME,
-        base_url=settings.GROQ_BASE_URL,
-        api_key=settings.GROQ_API_KEY,
-        temperature=settings.TEMPERATURE,
-        max_tokens=settings.MAX_TOKENS,
-    )
+    llm = create_llm()
 
     return Agent(
         role="Senior Research Specialist",
@@ -28,8 +24,11 @@ def create_research_agent():
             "You're methodical, thorough, and leave no stone unturned in your research."
         ),
         tools=[WebScraperTool(), 
-               WebSearchTool(),
-            #    SerperDevTool()
+               BatchWebScraperTool(),
+               WebSearchTool(backends=search_backends),
+               MultiQuerySearchTool(backends=search_backends),
+               PassageSearchTool(),
+               KnowledgeSearchTool(),
                ],
         llm=llm,
         verbose=True,
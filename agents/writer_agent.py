@@ -1,17 +1,11 @@
-from crewai import Agent, LLM
-from config.settings import settings
+from crewai import Agent
+from llm.factory import create_llm
 
 def create_writer_agent():
     """
     Creates the Writer Agent responsible for producing the final report
     """
-    llm = LLM(
-        model=settings.MODEL_NAME,
-        base_url=settings.GROQ_BASE_URL,
-        api_key=settings.GROQ_API_KEY,
-        temperature=0.7,
-        max_tokens=settings.MAX_TOKENS,
-    )
+    llm = create_llm(temperature=0.7)
     
     return Agent(
         role="Expert Technical Writer",
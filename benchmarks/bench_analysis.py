@@ -0,0 +1,150 @@
+"""
+Measure AnalysisTool's per-source text statistics on many long sources.
+
+Compares keyword extraction, theme counting and contradiction detection
+against the previous implementation, which rebuilt its stopword set and ran
+an uncompiled regex per source, lowercased every word twice, fully sorted a
+hand-built frequency dict and re-lowercased both sources for every source
+pair. Also checks that both produce the same keywords and themes.
+
+Usage:
+    python -m benchmarks.bench_analysis [--sources 100] [--words 5000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+from tools.analysis_tool import AnalysisTool
+from tools.contradictions import detect_contradictions, source_terms
+from tools.text_processing import token_counts, top_keywords
+
+
+def make_sources(num_sources, words_per_source, seed=7):
+    """Text with a Zipf-like vocabulary, capitalized sentence starts and punctuation"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choice(letters) for _ in range(rng.randint(2, 11))) for _ in range(6000)]
+    vocabulary += ["the", "and", "with", "this", "that", "increase", "decline", "growth"]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    sources = []
+    for i in range(num_sources):
+        words = rng.choices(vocabulary, weights=weights, k=words_per_source)
+        sentences = []
+        for start in range(0, len(words), 12):
+            sentence = words[start:start + 12]
+            sentence[0] = sentence[0].capitalize()
+            sentences.append(" ".join(sentence) + ".")
+        sources.append({"url": f"https://example.com/source-{i}", "content": " ".join(sentences)})
+    return sources
+
+
+def legacy_extract_keywords(text, top_n=10):
+    """AnalysisTool._extract_keywords before the shared text_processing module"""
+    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+                    'of', 'with', 'is', 'was', 'are', 'were', 'been', 'be', 'have', 'has',
+                    'that', 'this', 'it', 'from', 'by', 'as'}
+    words = re.findall(r'\b[A-Z][a-z]+\b|\b[a-z]{4,}\b', text)
+    keywords = [w.lower() for w in words if w.lower() not in common_words]
+    freq = {}
+    for kw in keywords:
+        freq[kw] = freq.get(kw, 0) + 1
+    return [k for k, v in sorted(freq.items(), key=lambda x: x[1], reverse=True)[:top_n]]
+
+
+def legacy_contradictions(sources):
+    """AnalysisTool._detect_contradictions before the vectorized engine"""
+    opposing_pairs = [('increase', 'decrease'), ('rise', 'fall'), ('growth', 'decline'),
+                      ('positive', 'negative'), ('improve', 'worsen'), ('success', 'failure'),
+                      ('gain', 'loss')]
+    contradictions = []
+    for i, source1 in enumerate(sources):
+        text1 = source1.get("content", "").lower()
+        for j, source2 in enumerate(sources[i + 1:], start=i + 1):
+            text2 = source2.get("content", "").lower()
+            for term1, term2 in opposing_pairs:
+                if term1 in text1 and term2 in text2:
+                    contradictions.append((i, j, term1, term2))
+    return contradictions[:5]
+
+
+def legacy_analysis(sources):
+    """The statistics and contradiction passes of the previous AnalysisTool._run"""
+    total_word_count = 0
+    all_keywords = []
+    per_source = []
+    for source in sources:
+        text = source.get("content", "")
+        words = text.split()
+        total_word_count += len(words)
+        keywords = legacy_extract_keywords(text)
+        all_keywords.extend(keywords)
+        per_source.append(keywords)
+    keyword_freq = {}
+    for kw in all_keywords:
+        keyword_freq[kw] = keyword_freq.get(kw, 0) + 1
+    themes = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)[:10]
+    legacy_contradictions(sources)
+    return total_word_count, per_source, themes
+
+
+def shared_analysis(sources):
+    """The same passes as AnalysisTool._run does them now, from one tokenization"""
+    total_word_count = 0
+    keyword_freq = Counter()
+    term_sets = []
+    per_source = []
+    for source in sources:
+        text = source.get("content", "")
+        total_word_count += len(text.split())
+        tokens = token_counts(text)
+        keywords = top_keywords(tokens)
+        keyword_freq.update(keywords)
+        term_sets.append(source_terms(tokens))
+        per_source.append(keywords)
+    detect_contradictions(sources, term_sets)
+    return total_word_count, per_source, keyword_freq.most_common(10)
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sources", type=int, default=100)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sources = make_sources(args.sources, args.words)
+
+    legacy_time, legacy = best_of(args.repeat, legacy_analysis, sources)
+    shared_time, shared = best_of(args.repeat, shared_analysis, sources)
+
+    if legacy != shared:
+        print("Keyword output differs from the previous implementation", file=sys.stderr)
+        return 1
+
+    tool = AnalysisTool()
+    tool_time, _ = best_of(args.repeat, tool._run, {"sources": sources})
+
+    print(f"{args.sources} sources x {args.words} words, best of {args.repeat}")
+    print(f"  legacy analysis     {legacy_time * 1000:9.1f} ms")
+    print(f"  shared tokenization {shared_time * 1000:9.1f} ms  ({legacy_time / shared_time:.1f}x)")
+    print(f"  AnalysisTool._run   {tool_time * 1000:9.1f} ms  (includes JSON output)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
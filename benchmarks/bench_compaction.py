@@ -0,0 +1,107 @@
+"""
+Measure context compaction and check that fact-check verdicts survive it.
+
+The research output is a list of findings with source URLs, the analysis
+repeats many of them, and the fact-check output gives a verdict on a
+sample, quoting each finding as written (the way the fact-checker reports
+them). Compaction is timed at several sizes and budgets; the run fails if
+a verdict is missing from the compacted context the writer would see
+while any point without a verdict was kept (only a budget too small for
+the verdicts alone may cut them).
+
+Usage:
+    python -m benchmarks.bench_compaction [--findings 20 100 400] [--budget 2000 6000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from crewai.tasks.task_output import TaskOutput
+
+from crew.context_compaction import ContextCompactor
+from llm.rate_limit import estimate_tokens
+
+from benchmarks.bench_fact_check import make_vocabulary
+
+VERDICTS = ["VERIFIED", "DISPUTED", "UNVERIFIED", "FALSE"]
+
+
+def make_outputs(num_findings, seed=13):
+    """(research, analysis, fact_check) task outputs and the verdict lines expected to survive"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+
+    findings = []
+    for i in range(num_findings):
+        words = " ".join(rng.choices(vocabulary, k=rng.randint(8, 16)))
+        findings.append(f"Finding {i} {words}.")
+
+    cited = [f"{finding} https://example.com/source-{i % 25}" for i, finding in enumerate(findings)]
+    research = "## Findings\n" + "\n".join(f"- {point}" for point in cited)
+    analysis = "## Key insights\n" + "\n".join(f"- {point}" for point in rng.sample(cited, num_findings // 2))
+
+    checked = rng.sample(findings, max(1, num_findings // 4))
+    verdicts = [f"{finding.rstrip('.')}: {rng.choice(VERDICTS)}" for finding in checked]
+    # A short finding whose only new term in the fact-check is the verdict
+    research += "\n- Wind additions slowed in Europe."
+    verdicts.append("Wind additions slowed in Europe: DISPUTED")
+    fact_check = "## Verification results\n" + "\n".join(f"- {line}" for line in verdicts)
+
+    outputs = [
+        TaskOutput(description="research", raw=research, agent="researcher", name="research"),
+        TaskOutput(description="analysis", raw=analysis, agent="analyst", name="analysis"),
+        TaskOutput(description="fact_check", raw=fact_check, agent="fact_checker", name="fact_check"),
+    ]
+    return outputs, verdicts
+
+
+def kept_points(compacted: str, task: str):
+    context = json.loads(compacted)["context"]
+    return [point for block in context if block["task"] == task for section in block["sections"]
+            for point in section["points"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--findings", type=int, nargs="+", default=[20, 100, 400])
+    parser.add_argument("--budget", type=int, nargs="+", default=[2000, 6000])
+    args = parser.parse_args()
+
+    print(f"{'findings':>9}{'budget':>8}{'raw tok':>9}{'compact tok':>13}{'dupes':>7}{'dropped':>9}"
+          f"{'verdicts kept':>15}{'ms':>8}")
+    print("-" * 78)
+    failures = []
+    for num_findings in args.findings:
+        outputs, verdicts = make_outputs(num_findings)
+        raw_tokens = estimate_tokens("\n\n".join(output.raw for output in outputs))
+        for budget in args.budget:
+            start = time.perf_counter()
+            compacted, stats = ContextCompactor(budget).compact(outputs)
+            elapsed = time.perf_counter() - start
+
+            kept = kept_points(compacted, "fact_check")
+            missing = [line for line in verdicts if line not in kept]
+            others = [point for task in ("research", "analysis", "fact_check")
+                      for point in kept_points(compacted, task) if point not in verdicts]
+            if missing and others:
+                failures.append(f"{num_findings} findings, budget {budget}: lost {len(missing)} verdicts, "
+                                f"e.g. {missing[0]!r}")
+            print(
+                f"{num_findings:>9}{budget:>8}{raw_tokens:>9}{estimate_tokens(compacted):>13}"
+                f"{stats['duplicates_removed']:>7}{stats['points_dropped']:>9}"
+                f"{len(verdicts) - len(missing):>8}/{len(verdicts):<6}{elapsed * 1000:>8.1f}"
+            )
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
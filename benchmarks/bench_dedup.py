@@ -0,0 +1,92 @@
+"""
+Measure source deduplication cost and accuracy as the number of sources grows.
+
+Each corpus mixes unique pages with copies of some of them: the same page
+under a tracking-parameter URL, syndicated copies on other sites, and
+copies with a few words edited. A pairwise comparison of every fingerprint
+is timed alongside the banded lookup deduplicate_sources uses.
+
+Usage:
+    python -m benchmarks.bench_dedup [--sources 100 500 2000] [--words 600]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from config.settings import settings
+from tools.dedup import deduplicate_sources, hamming_distance, simhash
+from tools.text_processing import tokenize
+
+from benchmarks.bench_fact_check import make_vocabulary
+
+
+def make_sources(num_sources, words_per_source, seed=7):
+    """Sources where about a third are copies of an earlier page; returns (sources, unique count)"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    sources, originals = [], []
+    for i in range(num_sources):
+        if originals and rng.random() < 0.33:
+            original = rng.choice(originals)
+            words = original["content"].split()
+            kind = rng.choice(("tracking", "syndicated", "edited"))
+            if kind == "tracking":
+                url = original["url"] + "?utm_source=feed"
+            else:
+                url = f"https://mirror-{i}.example.org/{original['url'].rsplit('/', 1)[-1]}"
+            if kind == "edited":
+                for position in rng.sample(range(len(words)), 2):
+                    words[position] = rng.choice(vocabulary)
+            sources.append({"url": url, "title": original["title"], "content": " ".join(words)})
+        else:
+            source = {
+                "url": f"https://site-{i}.example.com/article-{i}",
+                "title": f"Article {i}",
+                "content": " ".join(rng.choices(vocabulary, weights=weights, k=words_per_source)),
+            }
+            originals.append(source)
+            sources.append(source)
+    return sources, len(originals)
+
+
+def pairwise_duplicates(sources, max_distance=settings.SOURCE_DEDUP_MAX_DISTANCE):
+    """Compare every pair of fingerprints: the quadratic baseline"""
+    fingerprints = [simhash(tokenize(source["content"], lower=True)) for source in sources]
+    return sum(
+        1 for i in range(len(fingerprints)) for j in range(i)
+        if hamming_distance(fingerprints[i], fingerprints[j]) <= max_distance
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sources", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--words", type=int, default=600)
+    args = parser.parse_args()
+
+    print(f"{'sources':>8}{'unique':>8}{'kept':>7}{'dedup ms':>11}{'per source':>12}{'pairwise ms':>13}")
+    print("-" * 59)
+    for num_sources in args.sources:
+        sources, unique = make_sources(num_sources, args.words)
+
+        start = time.perf_counter()
+        result = deduplicate_sources(sources)
+        dedup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pairwise_duplicates(sources)
+        pairwise = time.perf_counter() - start
+
+        print(
+            f"{num_sources:>8}{unique:>8}{len(result.sources):>7}{dedup * 1000:>11.1f}"
+            f"{dedup * 1000 / num_sources:>10.2f}ms{pairwise * 1000:>13.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
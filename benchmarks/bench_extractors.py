@@ -0,0 +1,145 @@
+"""
+Compare the BeautifulSoup and lxml extraction engines on saved HTML fixtures.
+
+Checks that both engines produce byte-identical JSON for every fixture, and
+that streaming mode, fed the body in chunks with no charset from the
+response headers, finds the same title, description and headings (its
+content comes from the whole page rather than the main container, so it
+is not compared). Then times each engine, and streaming mode with its
+SCRAPER_STREAMING_MAX_CHARS budget along with how much of each body it read.
+
+Usage:
+    python -m benchmarks.bench_extractors [--repeat 20]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from config.settings import settings
+from tools.html_extractors import EXTRACTORS, StreamingExtractor
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+STREAMING_CHUNK_SIZE = 1024
+STREAMING_FIELDS = ("title", "description", "headings")
+
+
+def load_fixtures():
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            fixtures[os.path.basename(path)] = f.read()
+    return fixtures
+
+
+def check_identical(fixtures):
+    """Return the fixtures whose JSON output differs between engines"""
+    mismatches = []
+    for name, html in fixtures.items():
+        outputs = {
+            engine: json.dumps(extract(html), indent=2)
+            for engine, extract in EXTRACTORS.items()
+        }
+        if len(set(outputs.values())) != 1:
+            mismatches.append(name)
+    return mismatches
+
+
+def extract_streaming(html, max_chars=None):
+    """
+    Streaming extraction of a body read in chunks, as for a response without
+    a charset; returns the document and the number of bytes read
+    """
+    extractor = StreamingExtractor(max_chars=max_chars)
+    bytes_read = 0
+    for start in range(0, len(html), STREAMING_CHUNK_SIZE):
+        chunk = html[start:start + STREAMING_CHUNK_SIZE]
+        bytes_read += len(chunk)
+        if extractor.feed(chunk):
+            break
+    return extractor.result(), bytes_read
+
+
+def check_streaming(fixtures):
+    """Return the fixtures whose streaming metadata differs from the full extraction"""
+    mismatches = []
+    for name, html in fixtures.items():
+        full = EXTRACTORS["lxml"](html)
+        streamed, _ = extract_streaming(html)
+        if any(streamed[field] != full[field] for field in STREAMING_FIELDS):
+            mismatches.append(name)
+    return mismatches
+
+
+def time_engine(extract, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Extractions per fixture and engine")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"No fixtures found in {FIXTURES_DIR}")
+        return 1
+
+    mismatches = check_identical(fixtures)
+    streaming_mismatches = check_streaming(fixtures)
+
+    def stream(html):
+        return extract_streaming(html, settings.SCRAPER_STREAMING_MAX_CHARS)
+
+    engines = list(EXTRACTORS)
+    print(
+        f"{'fixture':<24}{'size':>10}" + "".join(f"{e + ' ms':>12}" for e in engines)
+        + f"{'speedup':>10}{'stream ms':>12}{'read':>8}"
+    )
+    print("-" * (34 + 12 * len(engines) + 30))
+
+    totals = {engine: 0.0 for engine in engines + ["streaming"]}
+    for name, html in fixtures.items():
+        timings = {engine: time_engine(EXTRACTORS[engine], html, args.repeat) for engine in engines}
+        timings["streaming"] = time_engine(stream, html, args.repeat)
+        _, bytes_read = stream(html)
+        for engine, seconds in timings.items():
+            totals[engine] += seconds
+        speedup = timings["bs4"] / timings["lxml"] if timings["lxml"] else 0.0
+        print(
+            f"{name:<24}{len(html):>10}"
+            + "".join(f"{timings[e] * 1000:>12.2f}" for e in engines)
+            + f"{speedup:>9.1f}x{timings['streaming'] * 1000:>12.2f}{bytes_read / len(html):>8.0%}"
+        )
+
+    print("-" * (34 + 12 * len(engines) + 30))
+    total_speedup = totals["bs4"] / totals["lxml"] if totals["lxml"] else 0.0
+    print(
+        f"{'total':<34}"
+        + "".join(f"{totals[e] * 1000:>12.2f}" for e in engines)
+        + f"{total_speedup:>9.1f}x{totals['streaming'] * 1000:>12.2f}"
+    )
+
+    failed = False
+    if mismatches:
+        print(f"\nOutput differs between engines for: {', '.join(mismatches)}")
+        failed = True
+    if streaming_mismatches:
+        print(f"\nStreaming metadata differs from the full extraction for: {', '.join(streaming_mismatches)}")
+        failed = True
+    if failed:
+        return 1
+
+    print("\nAll fixtures produce identical output on every engine, and the same metadata in streaming mode.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Measure how FactCheckTool scales with the number of claims and sources.
+
+Compares the indexed verification against the previous implementation,
+which rescanned the concatenated source text once per key term and
+re-lowercased every source for every claim.
+
+Usage:
+    python -m benchmarks.bench_fact_check [--claims 10 100 500] [--sources 5 20 50]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from tools.fact_check_tool import FactCheckTool
+from tools.text_index import InvertedIndex
+
+def make_vocabulary(rng, size=8000):
+    """Pseudo-words; drawn with a Zipf-like skew so some terms are common and most are rare"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_corpus(num_sources, num_claims, words_per_source=1500, seed=13):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def words(count):
+        return " ".join(rng.choices(vocabulary, weights=weights, k=count))
+
+    sources = [
+        {
+            "url": f"https://example.com/source-{i}",
+            "title": f"Source {i}",
+            "content": words(words_per_source)
+        }
+        for i in range(num_sources)
+    ]
+    claims = [words(rng.randint(6, 14)).capitalize() + "." for _ in range(num_claims)]
+    return claims, sources
+
+
+def legacy_verify(claims, sources):
+    """The substring-scan verification FactCheckTool used before the inverted index"""
+    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+                    'for', 'of', 'with', 'is', 'was', 'are', 'were', 'been', 'be',
+                    'has', 'have', 'had', 'that', 'this', 'it', 'from', 'by'}
+    source_text = " ".join(source.get("content", "") for source in sources).lower()
+    results = []
+    for claim in claims:
+        key_terms = [w for w in re.findall(r'\b\w{3,}\b', claim.lower()) if w not in common_words][:10]
+        matching = [t for t in key_terms if t.lower() in source_text]
+        supporting = [
+            source.get("url") for source in sources
+            if any(t.lower() in source.get("content", "").lower() for t in key_terms)
+        ]
+        results.append((matching, supporting[:3]))
+    return results
+
+
+def indexed_verify(tool, claims, sources):
+    """FactCheckTool's verification path, without the JSON (de)serialization"""
+    index = InvertedIndex(source.get("content", "") for source in sources)
+    return [tool._verify_claim(claim, index, sources) for claim in claims]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--claims", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--sources", type=int, nargs="+", default=[5, 20, 50])
+    args = parser.parse_args()
+
+    tool = FactCheckTool()
+
+    print(f"{'claims':>8}{'sources':>9}{'legacy ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    print("-" * 51)
+    for num_sources in args.sources:
+        for num_claims in args.claims:
+            claims, sources = make_corpus(num_sources, num_claims)
+
+            legacy = timed(legacy_verify, claims, sources)
+            indexed = timed(indexed_verify, tool, claims, sources)
+
+            print(
+                f"{num_claims:>8}{num_sources:>9}{legacy * 1000:>12.1f}"
+                f"{indexed * 1000:>12.1f}{legacy / indexed:>9.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
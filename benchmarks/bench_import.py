@@ -0,0 +1,149 @@
+"""
+Measure how long the CLI and the main modules take to import.
+
+Each module is imported in a fresh interpreter under `python -X importtime`;
+the median cumulative import time over --repeat runs is reported with the
+slowest modules it pulled in. main must reach the topic prompt without
+loading crewai or the HTML parsers, which are checked as forbidden imports.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat 5] [--top 10]
+        [--budget main=0.3] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules timed by default, from the CLI entry point to a fully built crew
+TARGETS = ["main", "config.settings", "tools.http_client", "crew.checkpoint", "crew.research_crew"]
+
+# Packages that must not be imported by the target modules
+FORBIDDEN = {
+    "main": ["crewai", "crewai_tools", "bs4", "lxml", "validators", "requests"],
+    "config.settings": ["crewai", "requests"],
+    "tools.http_client": ["crewai", "bs4", "lxml"],
+    "crew.checkpoint": ["crewai", "bs4", "lxml"],
+}
+
+# Seconds of cumulative import time each target may take
+DEFAULT_BUDGETS = {"main": 0.3, "config.settings": 0.1}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_profile(module: str) -> dict:
+    """Import module in a fresh interpreter and parse its -X importtime report"""
+    env = dict(os.environ)
+    # The API key is only checked when a crew starts, so imports must work without it
+    env.pop("GROQ_API_KEY", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    # Lines are (depth, name, cumulative seconds) in completion order, so a
+    # module's imports are the deeper lines right before it
+    lines = []
+    for line in completed.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            _, cumulative_us, indent, name = match.groups()
+            lines.append((len(indent), name, int(cumulative_us) / 1e6))
+
+    position = max(i for i, (_, name, _) in enumerate(lines) if name == module)
+    depth, _, seconds = lines[position]
+    subtree = []
+    for line in reversed(lines[:position]):
+        if line[0] <= depth:
+            break
+        subtree.append(line)
+
+    return {
+        "seconds": seconds,
+        "process_seconds": wall,
+        # Everything the target imported, and its direct imports with their cumulative time
+        "modules": {name for _, name, _ in subtree},
+        "direct": {name: cumulative for line_depth, name, cumulative in subtree if line_depth == depth + 2},
+    }
+
+
+def parse_budgets(values) -> dict:
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values or []:
+        module, _, seconds = value.partition("=")
+        budgets[module] = float(seconds)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=TARGETS, help="Modules to time")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imported modules listed per target")
+    parser.add_argument("--budget", action="append", metavar="MODULE=SECONDS",
+                        help="Fail when a module's median import time is above this (repeatable)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    results, failures = {}, []
+
+    for module in args.modules:
+        profiles = [import_profile(module) for _ in range(args.repeat)]
+        seconds = statistics.median(p["seconds"] for p in profiles)
+        process_seconds = statistics.median(p["process_seconds"] for p in profiles)
+        imported = profiles[-1]["modules"]
+        slowest = sorted(profiles[-1]["direct"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        forbidden = [
+            name for name in FORBIDDEN.get(module, [])
+            if any(imported_name == name or imported_name.startswith(f"{name}.") for imported_name in imported)
+        ]
+
+        print(f"\n{module}: {seconds * 1000:.1f} ms import, {process_seconds * 1000:.0f} ms process "
+              f"({len(imported)} modules)")
+        for name, cumulative in slowest:
+            print(f"  {name:<40}{cumulative * 1000:>10.1f} ms")
+
+        budget = budgets.get(module)
+        if budget is not None and seconds > budget:
+            failures.append(f"{module} took {seconds:.3f}s to import (budget {budget:.3f}s)")
+        if forbidden:
+            failures.append(f"{module} imports {', '.join(forbidden)}")
+
+        results[module] = {
+            "seconds": seconds,
+            "process_seconds": process_seconds,
+            "modules": len(imported),
+            "slowest": dict(slowest),
+            "forbidden_imports": forbidden,
+        }
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Measure the knowledge store as it grows across research runs.
+
+Each size is built from scratch as a mix of source and claim items, one
+add() at a time as the tools record them. The store is then closed and
+reopened (what every new run pays), and queried for topics whose facts it
+holds. Reports insert rate, reopen time, query latency and how often the
+stored fact is among the top results after reopening.
+
+Usage:
+    python -m benchmarks.bench_knowledge [--items 1000 10000 50000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from tools.knowledge_store import KnowledgeStore
+
+from benchmarks.bench_fact_check import make_vocabulary
+
+
+def make_items(num_items, seed=11):
+    """
+    (kind, key, text, url, marker) per item, half pages and half claims;
+    every item names its own site
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    items = []
+    for i in range(num_items):
+        marker = f"site{i}zeta"
+        if rng.random() < 0.5:
+            filler = " ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(40, 120)))
+            text = f"Report on the {marker} storage facility\n\n{filler}"
+            items.append(("source", f"example.com/report-{i}", text, f"https://example.com/report-{i}", marker))
+        else:
+            text = f"The {marker} storage facility reached {rng.randint(100, 999)} megawatts of capacity."
+            items.append(("claim", text.lower(), text, None, marker))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'items':>7}{'inserts/s':>11}{'reopen ms':>11}{'query ms':>10}{'hit@5':>8}{'vectors MB':>12}")
+    print("-" * 59)
+    for num_items in args.items:
+        items = make_items(num_items)
+        with tempfile.TemporaryDirectory() as work_dir:
+            store = KnowledgeStore(work_dir)
+            start = time.perf_counter()
+            for kind, key, text, url, _ in items:
+                store.add(kind, key, text, url=url, topic="energy storage")
+            insert_time = time.perf_counter() - start
+            del store
+
+            start = time.perf_counter()
+            store = KnowledgeStore(work_dir)
+            reopen_time = time.perf_counter() - start
+
+            sample = random.Random(3).sample(items, min(args.queries, num_items))
+            hits = 0
+            start = time.perf_counter()
+            for _, _, text, _, marker in sample:
+                results = store.search(f"What capacity did the {marker} storage facility reach?", k=5)
+                hits += any(marker in result["text"] for result in results)
+            query_time = time.perf_counter() - start
+            vectors_mb = os.path.getsize(os.path.join(work_dir, "vectors.f32")) / 1e6
+
+        print(
+            f"{num_items:>7}{num_items / insert_time:>11.0f}{reopen_time * 1000:>11.1f}"
+            f"{query_time * 1000 / len(sample):>10.2f}{hits / len(sample):>8.0%}{vectors_mb:>12.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Benchmark each tool and the full ResearchCrew pipeline against local fixtures.
+
+A stub server (benchmarks/stubs.py) replaces the web, DuckDuckGo and the LLM
+API, so this runs with no network. For every corpus size it times the
+search, scrape, analysis and fact-check tools directly, then runs the whole
+crew and reports wall time per task, tool, LLM call and HTTP request from
+the run's trace.
+
+The researcher scrapes the pages its searches return (at most
+--scrape-calls batches); the analysis and fact-check tools are handed the
+whole corpus, so their cost grows with the corpus size.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 5 50 500] [--repeat 3]
+        [--page-latency 0.02] [--llm-latency 0.2] [--skip-pipeline] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import CLAIMS, FixtureCorpus, StubServer
+from config.settings import settings
+
+
+def configure_offline(stub: StubServer, work_dir: str):
+    """Point every network dependency at the stub and keep caches out of the way"""
+    # The stub LLM accepts any key
+    settings.GROQ_API_KEY = settings.GROQ_API_KEY or "offline-benchmark"
+    settings.GROQ_BASE_URL = f"{stub.base_url}/v1"
+    settings.DUCKDUCKGO_API_URL = f"{stub.base_url}/duckduckgo/"
+    settings.SEARCH_BACKENDS = ["duckduckgo"]
+
+    # Measure fetching and parsing, not cache hits from an earlier size
+    settings.HTTP_CACHE_ENABLED = False
+    settings.DOCUMENT_CACHE_DISK = False
+    settings.LOCAL_INDEX_PATH = os.path.join(work_dir, "local_index.sqlite3")
+    settings.PASSAGE_STORE_PATH = os.path.join(work_dir, "passages.sqlite3")
+    settings.KNOWLEDGE_STORE_DIR = os.path.join(work_dir, "knowledge")
+    settings.LLM_CACHE_MODE = "off"
+    settings.LLM_REQUESTS_PER_MINUTE = 0
+    settings.LLM_TOKENS_PER_MINUTE = 0
+
+    settings.OUTPUT_DIR = os.path.join(work_dir, "outputs")
+    settings.TRACE_DIR = os.path.join(work_dir, "traces")
+    settings.RUNS_DIR = os.path.join(work_dir, "runs")
+
+
+def reset_caches():
+    """Drop in-memory extraction results so every measurement parses its pages"""
+    from tools.document_cache import get_document_cache
+
+    get_document_cache().clear()
+
+
+def time_calls(fn, repeat: int):
+    """Median wall time of fn over repeat calls, and its last result"""
+    durations, result = [], None
+    for _ in range(repeat):
+        reset_caches()
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def bench_tools(stub: StubServer, corpus: FixtureCorpus, repeat: int):
+    from tools.analysis_tool import AnalysisTool
+    from tools.fact_check_tool import FactCheckTool
+    from tools.web_scraper_tool import WebScraperTool
+    from tools.web_search_tool import MultiQuerySearchTool
+
+    sources = corpus.sources(stub.base_url)
+    urls = [source["url"] for source in sources]
+    queries = json.dumps([stub.topic, f"{stub.topic} costs", f"{stub.topic} policy"])
+
+    search = MultiQuerySearchTool()
+    scraper = WebScraperTool()
+    analysis = AnalysisTool()
+    fact_check = FactCheckTool()
+    analysis_input = json.dumps({"sources": sources})
+    fact_check_input = json.dumps({"claims": CLAIMS, "sources": sources})
+
+    rows = []
+
+    seconds, _ = time_calls(lambda: search._run(queries), repeat)
+    rows.append(("tool search (3 queries)", seconds, 3 / seconds))
+
+    seconds, results = time_calls(lambda: scraper.scrape_many(urls), repeat)
+    failed = sum(1 for r in results if r.get("status") != "success")
+    if failed:
+        print(f"  warning: {failed} of {len(urls)} pages failed to scrape")
+    rows.append((f"tool scrape ({len(urls)} pages)", seconds, len(urls) / seconds))
+
+    seconds, _ = time_calls(lambda: analysis._run(analysis_input), repeat)
+    rows.append((f"tool analysis ({len(sources)} sources)", seconds, len(sources) / seconds))
+
+    seconds, _ = time_calls(lambda: fact_check._run(fact_check_input), repeat)
+    rows.append((f"tool fact_check ({len(CLAIMS)} claims)", seconds, len(sources) / seconds))
+
+    return rows
+
+
+def bench_pipeline(stub: StubServer, quiet: bool = True):
+    """Run the full crew once; returns its wall time and the trace summary"""
+    from crew.research_crew import ResearchCrew
+
+    reset_caches()
+    output = io.StringIO()
+    redirect = contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext()
+    with redirect:
+        crew = ResearchCrew(stub.topic)
+        for agent in crew.agents.values():
+            agent.verbose = not quiet
+        crew.crew.verbose = not quiet
+
+        start = time.perf_counter()
+        crew.run()
+        seconds = time.perf_counter() - start
+
+    return seconds, crew.get_timing_metrics(), crew.report_stream.time_to_first_token
+
+
+def print_rows(rows):
+    print(f"  {'stage':<44}{'seconds':>10}{'items/s':>12}")
+    for name, seconds, throughput in rows:
+        rate = f"{throughput:>12.1f}" if throughput is not None else f"{'':>12}"
+        print(f"  {name:<44}{seconds:>10.3f}{rate}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500], help="Corpus sizes (sources)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per tool measurement (median is reported)")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Simulated seconds per page fetch")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Simulated seconds per search")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM request")
+    parser.add_argument("--scrape-calls", type=int, default=3, help="Batch scrapes the stub researcher makes")
+    parser.add_argument("--skip-pipeline", action="store_true", help="Only benchmark the tools")
+    parser.add_argument("--verbose", action="store_true", help="Show the crew's own output")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as work_dir:
+        for size in args.sizes:
+            corpus = FixtureCorpus(size)
+            stub = StubServer(
+                corpus,
+                page_latency=args.page_latency,
+                search_latency=args.search_latency,
+                llm_latency=args.llm_latency,
+                scrape_batch=settings.SCRAPER_MAX_BATCH,
+                max_scrape_calls=args.scrape_calls,
+            )
+            with stub:
+                configure_offline(stub, work_dir)
+                print(f"\nCorpus size {size} ({sum(len(p) for p in corpus.pages) // 1024} KiB of HTML)")
+
+                rows = bench_tools(stub, corpus, args.repeat)
+                entry = {"tools": {name: {"seconds": s, "per_second": t} for name, s, t in rows}}
+
+                if not args.skip_pipeline:
+                    seconds, timings, ttft = bench_pipeline(stub, quiet=not args.verbose)
+                    rows.append(("pipeline total", seconds, None))
+                    if ttft is not None:
+                        rows.append(("pipeline time to first report token", ttft, None))
+                    for name, stage in timings["stages"].items():
+                        if name != "research_crew.run":
+                            rows.append((f"  {name} (x{stage['count']})", stage["total_seconds"], None))
+                    entry["pipeline"] = {
+                        "seconds": seconds,
+                        "time_to_first_token": ttft,
+                        "timings": timings,
+                        "stub_requests": dict(stub.counts),
+                    }
+
+                print_rows(rows)
+                results[str(size)] = entry
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
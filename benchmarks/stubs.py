@@ -0,0 +1,406 @@
+"""
+Local stand-ins for every network dependency of a research run.
+
+One ThreadingHTTPServer on 127.0.0.1 serves:
+  /pages/<n>.html        a synthetic corpus built from the saved HTML fixtures
+  /duckduckgo/           DuckDuckGo Instant Answer JSON (fixtures/search)
+                         with its links pointing at corpus pages
+  /v1/chat/completions   an OpenAI-compatible chat endpoint that plays each
+                         agent's part: it calls the agent's tools in a fixed
+                         order, then answers with that role's canned
+                         completion (fixtures/llm), streamed when asked
+
+Nothing here touches the network, so the pipeline can be benchmarked on a
+bare machine.
+"""
+
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PAGE_URL_RE = re.compile(r"http://127\.0\.0\.1:\d+/pages/\d+\.html")
+
+# Words the generated pages are written in; includes the opposing terms the
+# contradiction detector looks for so analysis has real work to do
+_VOCABULARY = (
+    "solar wind storage battery grid capacity cost price demand supply market policy investment "
+    "transmission generation efficiency emissions carbon turbine panel module utility operator "
+    "region country project financing subsidy tariff auction developer manufacturer research "
+    "increase decrease rise fall growth decline improve worsen gain loss expand shrink "
+    "record annual quarterly forecast estimate report analysis study survey data trend share "
+    "the of and to in for on with by from that this is was are were has have will can"
+).split()
+
+CLAIMS = [
+    "Solar and wind capacity additions reached a record high last year",
+    "Battery storage costs fell sharply over the last decade",
+    "Grid operators report rising curtailment in regions with high wind penetration",
+    "Investment in transmission lags behind investment in generation",
+    "Financing costs increased project costs in several markets",
+    "Offshore wind auctions attracted fewer bids than expected",
+    "Module prices decreased while demand continued to grow",
+    "Emissions from the power sector declined in most regions",
+]
+
+
+def _sanitize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def schema_instance(schema: Dict, definitions: Optional[Dict] = None):
+    """Smallest value valid for a JSON schema (empty lists and strings, zeros)"""
+    definitions = definitions if definitions is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return schema_instance(definitions.get(schema["$ref"].rsplit("/", 1)[-1], {}), definitions)
+    if "anyOf" in schema:
+        return schema_instance(schema["anyOf"][0], definitions)
+
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        properties = schema.get("properties", {})
+        return {
+            name: schema_instance(properties[name], definitions)
+            for name in schema.get("required", properties)
+        }
+    return {"array": [], "string": "", "integer": 0, "number": 0, "boolean": False}.get(kind)
+
+
+class FixtureCorpus:
+    """
+    num_sources HTML pages made from the saved fixtures, each with its own
+    generated article text. Deterministic for a given size and seed.
+    """
+
+    def __init__(self, num_sources: int, words_per_page: int = 600, seed: int = 7):
+        self.num_sources = num_sources
+        templates = []
+        for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "html", "*.html"))):
+            with open(path, "rb") as f:
+                templates.append(f.read())
+        if not templates:
+            raise RuntimeError(f"No HTML fixtures found in {FIXTURES_DIR}/html")
+
+        rng = random.Random(seed)
+        self.pages: List[bytes] = []
+        self.texts: List[str] = []
+        for n in range(num_sources):
+            paragraphs = []
+            remaining = words_per_page
+            while remaining > 0:
+                count = min(remaining, rng.randint(40, 90))
+                words = rng.choices(_VOCABULARY, k=count)
+                paragraphs.append(" ".join(words).capitalize() + ".")
+                remaining -= count
+            text = "\n\n".join(paragraphs)
+            self.texts.append(text)
+
+            article = (
+                f"<article><h1>Source {n}: renewable energy outlook</h1>"
+                + "".join(f"<p>{p}</p>" for p in paragraphs)
+                + "</article>"
+            ).encode("ascii")
+            template = templates[n % len(templates)]
+            marker = template.lower().rfind(b"</body>")
+            if marker == -1:
+                self.pages.append(template + article)
+            else:
+                self.pages.append(template[:marker] + article + template[marker:])
+
+    def sources(self, base_url: str) -> List[Dict]:
+        """The corpus as the source dicts the analysis and fact-check tools take"""
+        return [
+            {"url": f"{base_url}/pages/{n}.html", "title": f"Source {n}", "content": text}
+            for n, text in enumerate(self.texts)
+        ]
+
+
+class StubLLMPolicy:
+    """
+    Decides the stub model's reply. Each agent role follows a fixed script of
+    tool calls (one step per tool result already in the conversation) and
+    then gives the canned completion for its role.
+    """
+
+    def __init__(self, server: "StubServer"):
+        self.server = server
+        with open(os.path.join(FIXTURES_DIR, "llm", "completions.json"), encoding="utf-8") as f:
+            self.completions: Dict[str, str] = json.load(f)
+
+    def role_of(self, messages: List[Dict]) -> Optional[str]:
+        """The agent role named in the system prompt (or the first message)"""
+        prompts = [m for m in messages if m.get("role") == "system"] or messages[:1]
+        for message in prompts:
+            content = str(message.get("content", ""))
+            for role in self.completions:
+                if role in content:
+                    return role
+        return None
+
+    def reply(self, messages: List[Dict], tools: List[Dict]) -> Dict:
+        """{"content": str} or {"tool_call": (name, arguments)}"""
+        role = self.role_of(messages)
+        tool_results = [m for m in messages if m.get("role") == "tool"]
+        available = {
+            _sanitize(tool["function"]["name"]): tool["function"] for tool in tools or []
+            if tool.get("type") == "function"
+        }
+
+        step = self._script_step(role, len(tool_results), tool_results)
+        if step is not None:
+            name, value = step
+            function = available.get(name)
+            if function is not None:
+                properties = list((function.get("parameters") or {}).get("properties", {}))
+                argument = properties[0] if properties else "input"
+                return {"tool_call": (function["name"], json.dumps({argument: value}))}
+
+        template = self.completions.get(role, "Done: {topic}")
+        return {"content": template.replace("{topic}", self.server.topic)}
+
+    def _script_step(self, role: Optional[str], done: int, tool_results: List[Dict]):
+        server = self.server
+        if role == "Senior Research Specialist":
+            if done == 0:
+                queries = [server.topic] + [f"{server.topic} {suffix}" for suffix in
+                                            ("costs", "trends", "policy", "grid", "storage")]
+                return "multi_query_search_tool", json.dumps(queries[:server.search_queries])
+            found = []
+            for result in tool_results:
+                found.extend(PAGE_URL_RE.findall(str(result.get("content", ""))))
+            urls = list(dict.fromkeys(found))
+            batch = server.scrape_batch
+            # Scrape the URLs from the search in batches, one tool call per batch
+            start = (done - 1) * batch
+            if start < len(urls) and done <= server.max_scrape_calls:
+                return "batch_web_scraper_tool", json.dumps(urls[start:start + batch])
+            return None
+
+        if role == "Senior Data Analyst" and done == 0:
+            return "content_analysis_tool", json.dumps({"sources": server.corpus.sources(server.base_url)})
+
+        if role == "Senior Fact-Checker" and done == 0:
+            return "fact_verification_tool", json.dumps({
+                "claims": CLAIMS,
+                "sources": server.corpus.sources(server.base_url)
+            })
+
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StubServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub = self.server
+        parts = urlsplit(self.path)
+
+        match = re.fullmatch(r"/pages/(\d+)\.html", parts.path)
+        if match and int(match.group(1)) < stub.corpus.num_sources:
+            stub.delay(stub.page_latency)
+            stub.count("pages")
+            self._send(200, stub.corpus.pages[int(match.group(1))], "text/html")
+            return
+
+        if parts.path.rstrip("/") == "/duckduckgo":
+            stub.delay(stub.search_latency)
+            stub.count("searches")
+            query = parse_qs(parts.query).get("q", [""])[0]
+            self._send(200, json.dumps(stub.search_response(query)).encode("utf-8"), "application/json")
+            return
+
+        self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        stub = self.server
+        if urlsplit(self.path).path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, b"not found", "text/plain")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        stub.delay(stub.llm_latency)
+        stub.count("llm_requests")
+
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            # Structured calls (crewai's memory extraction) get an empty but valid answer
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            reply = {"content": json.dumps(schema_instance(schema))}
+        else:
+            reply = stub.policy.reply(request.get("messages", []), request.get("tools"))
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4 + 1
+
+        if request.get("stream") and "content" in reply:
+            self._stream(request, reply["content"], prompt_tokens)
+            return
+
+        if "tool_call" in reply:
+            name, arguments = reply["tool_call"]
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": arguments}
+                }]
+            }
+            finish_reason, completion = "tool_calls", arguments
+        else:
+            message = {"role": "assistant", "content": reply["content"]}
+            finish_reason, completion = "stop", reply["content"]
+
+        body = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(completion) // 4 + 1,
+                "total_tokens": prompt_tokens + len(completion) // 4 + 1
+            }
+        }
+        self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _stream(self, request: Dict, content: str, prompt_tokens: int):
+        """Server-sent events in the chat.completion.chunk format"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        response_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def event(choices, usage=None):
+            chunk = {
+                "id": response_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": choices,
+            }
+            if usage is not None:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for start in range(0, len(content), 24):
+            self.server.delay(self.server.token_latency)
+            event([{"index": 0, "delta": {"content": content[start:start + 24]}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        completion_tokens = len(content) // 4 + 1
+        event([], usage={
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        })
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Serves the corpus, search and chat endpoints from a background thread.
+    Latencies are in seconds and simulate network round trips.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        corpus: FixtureCorpus,
+        topic: str = "Renewable energy grid integration",
+        page_latency: float = 0.0,
+        search_latency: float = 0.0,
+        llm_latency: float = 0.0,
+        token_latency: float = 0.0,
+        search_queries: int = 3,
+        scrape_batch: int = 10,
+        max_scrape_calls: int = 3,
+    ):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.corpus = corpus
+        self.topic = topic
+        self.page_latency = page_latency
+        self.search_latency = search_latency
+        self.llm_latency = llm_latency
+        self.token_latency = token_latency
+        self.search_queries = search_queries
+        self.scrape_batch = scrape_batch
+        self.max_scrape_calls = max_scrape_calls
+        self.policy = StubLLMPolicy(self)
+
+        with open(os.path.join(FIXTURES_DIR, "search", "duckduckgo.json"), encoding="utf-8") as f:
+            self._search_template = json.load(f)
+
+        self._counts_lock = threading.Lock()
+        self.counts = {"pages": 0, "searches": 0, "llm_requests": 0}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key: str):
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    @staticmethod
+    def delay(seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def search_response(self, query: str) -> Dict:
+        """The recorded DuckDuckGo answer, linking to the corpus pages chosen for query"""
+        data = json.loads(json.dumps(self._search_template))
+        topics = data.get("RelatedTopics", [])
+        # Stable per query so repeated searches agree, different across queries
+        first = zlib.crc32(query.encode("utf-8")) % self.corpus.num_sources
+        pages = [(first + i) % self.corpus.num_sources for i in range(len(topics) + 1)]
+
+        data["AbstractURL"] = f"{self.base_url}/pages/{pages[0]}.html"
+        for topic, page in zip(topics, pages[1:]):
+            topic["FirstURL"] = f"{self.base_url}/pages/{page}.html"
+        return data
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -17,18 +17,199 @@ class Settings:
     # OUTPUT CONFIGURATION
     OUTPUT_DIR = "outputs"
     REPORT_FORMAT = "markdown"
+    # Stream the writer's tokens into "<report>.partial" as they are generated;
+    # the finished report is renamed into place when the crew completes
+    REPORT_STREAMING = os.getenv("REPORT_STREAMING", "true").lower() in ("1", "true", "yes")
+
+    # Run Checkpoints
+    # Each run saves finished task outputs and web tool results under
+    # RUNS_DIR so an interrupted run can be resumed (main.py --resume)
+    CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes")
+    RUNS_DIR = os.path.join(OUTPUT_DIR, "runs")
+
+    # Tracing
+    # Spans for every task, tool call, LLM call and HTTP request; exported
+    # after each run as JSON (with timing summaries) and OpenTelemetry OTLP/JSON
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+    TRACE_DIR = os.path.join(OUTPUT_DIR, "traces")
+    TRACE_MAX_SPANS = 50000  # Oldest spans are dropped past this many
 
     # Research Configuration
     MAX_SEARCH_RESULTS = 10
     MAX_SOURCES = 5
+    # Search backends tried in order; "serper" is skipped unless SERPER_API_KEY is set
+    SEARCH_BACKENDS = [
+        name.strip() for name in os.getenv("SEARCH_BACKENDS", "duckduckgo,serper,local").split(",")
+        if name.strip()
+    ]
+    DUCKDUCKGO_API_URL = os.getenv("DUCKDUCKGO_API_URL", "https://api.duckduckgo.com/")
+    SEARCH_MAX_QUERIES = 6  # Query variants accepted by one multi-query search
+    SEARCH_MAX_MERGED_RESULTS = 20
     SCRAPING_TIMEOUT = 30
+    SCRAPER_MAX_BATCH = 10
+    SCRAPER_ENGINE = "bs4"  # "bs4" (BeautifulSoup) or "lxml" (same output, much less CPU)
+    SCRAPER_MODE = "full"  # "full" parses the whole page, "streaming" stops once the content budget is filled
+    SCRAPER_MAX_CONTENT_CHARS = 5000  # Page text returned to the agent (the most relevant passages when given a query)
+    SCRAPER_MAX_DOCUMENT_CHARS = 200_000  # Page text kept and indexed in the passage store
+    SCRAPER_STREAMING_MAX_CHARS = 20_000  # Streaming mode stops reading once it has this much text (and indexes only that)
+    SCRAPER_MAX_BYTES = 2 * 1024 * 1024  # Streaming mode stops reading the body past this size
+    SCRAPER_CHUNK_SIZE = 16 * 1024
+
+    # Crew Configuration
+    # "sequential" runs tasks one by one; "dag" runs tasks whose context
+    # dependencies are met concurrently (fact-checking alongside analysis,
+    # research sub-topics in parallel)
+    CREW_PROCESS = os.getenv("CREW_PROCESS", "sequential")
+    DAG_MAX_WORKERS = 4
+    BATCH_MAX_WORKERS = 2  # Topics researched at the same time in batch mode
+
+    # Research Service (python main.py --serve)
+    SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8765"))
+    SERVICE_MAX_WORKERS = 2  # Jobs researched at the same time; each keeps one warm set of agents
+    SERVICE_MAX_QUEUED = 50  # Submissions beyond this many waiting jobs are rejected
+    SERVICE_MAX_FINISHED_JOBS = 200  # Finished jobs kept for status and report queries
+    SERVICE_STREAM_IDLE_TIMEOUT = 600  # Seconds a report stream waits for the next token
+    SERVICE_OUTPUT_DIR = os.path.join(OUTPUT_DIR, "service")
+
+    # Context Compaction
+    # Outputs handed to later tasks are deduplicated, turned into compact
+    # JSON with numbered sources and cut to a token budget per task
+    CONTEXT_COMPACTION = os.getenv("CONTEXT_COMPACTION", "true").lower() in ("1", "true", "yes")
+    CONTEXT_TOKEN_BUDGET = 3000  # Estimated tokens of context per task
+    CONTEXT_TOKEN_BUDGETS = {  # Per task name, overrides CONTEXT_TOKEN_BUDGET
+        "writing": 5000,
+    }
+
+    # LLM Rate Limiting
+    # Shared by every agent in the process; match these to the account quota (0 disables a limit)
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "12000"))
+    LLM_COMPLETION_TOKENS_ESTIMATE = 1024  # Tokens reserved for a reply until actual usage is known
+    LLM_MAX_RETRIES = 5  # Retries after a 429 response
+    LLM_BACKOFF_BASE = 2.0  # Seconds; doubles on every retry
+    LLM_BACKOFF_MAX = 60.0
+
+    # LLM Response Cache
+    # "off", "read_write" (answer repeated prompts from disk) or "replay"
+    # (serve only cached responses and fail on a miss, for reproducible runs)
+    LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "read_write")
+    LLM_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite3")
+    # Token Jaccard similarity (0-1) at which a near-duplicate prompt reuses a
+    # cached response; None disables the near-duplicate lookup
+    LLM_CACHE_SEMANTIC_THRESHOLD = None
+    LLM_CACHE_SEMANTIC_CANDIDATES = 500  # Recent entries compared per lookup
+
+    # Analysis Configuration
+    # Opposing term pairs used to flag contradictions between sources;
+    # inflections (-s, -es, -ed, -ing) of each term match too
+    CONTRADICTION_OPPOSING_TERMS = [
+        ("increase", "decrease"),
+        ("rise", "fall"),
+        ("growth", "decline"),
+        ("positive", "negative"),
+        ("improve", "worsen"),
+        ("success", "failure"),
+        ("gain", "loss"),
+        ("expand", "shrink"),
+        ("strengthen", "weaken"),
+        ("surge", "plunge"),
+        ("accelerate", "slow"),
+        ("benefit", "harm"),
+        ("safe", "dangerous"),
+        ("effective", "ineffective"),
+        ("efficient", "inefficient"),
+        ("support", "oppose"),
+        ("confirm", "deny"),
+        ("accept", "reject"),
+        ("agree", "disagree"),
+        ("likely", "unlikely"),
+        ("advantage", "disadvantage"),
+        ("profit", "deficit"),
+        ("surplus", "shortage"),
+        ("cheap", "expensive"),
+        ("optimistic", "pessimistic"),
+        ("overestimate", "underestimate"),
+        ("legal", "illegal"),
+        ("true", "false"),
+        ("boom", "recession"),
+        ("outperform", "underperform"),
+    ]
+    CONTRADICTION_MAX_RESULTS = 5
+
+    # Source Deduplication
+    # Sources with the same canonical URL or near-identical content (SimHash)
+    # are merged before analysis and fact-checking
+    SOURCE_DEDUP_ENABLED = True
+    SOURCE_DEDUP_MAX_DISTANCE = 5  # Fingerprint bits (of 64) near-duplicates may differ in
+    SOURCE_DEDUP_MIN_WORDS = 50  # Shorter contents only merge by URL or identical text
+
+    # Fact-Check Configuration
+    FACT_CHECK_MODE = "terms"  # "terms", "tfidf" or "embedding"
+    FACT_CHECK_TOP_PASSAGES = 3
+    # (verified, partially verified) minimum cosine similarity per mode
+    FACT_CHECK_SIMILARITY_THRESHOLDS = {
+        "tfidf": (0.45, 0.25),
+        "embedding": (0.7, 0.5),
+    }
+    PASSAGE_MAX_CHARS = 600
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+    # HTTP Configuration
+    HTTP_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    HTTP_POOL_CONNECTIONS = 20  # Number of hosts kept in the connection pool
+    HTTP_POOL_MAXSIZE = 10  # Keep-alive connections per host
+    HTTP_MAX_CONCURRENCY = 8  # Requests in flight across all hosts
+    HTTP_PER_HOST_CONCURRENCY = 2  # Requests in flight against a single host
+    HTTP_MAX_RETRIES = 2
+
+    # HTTP Response Cache
+    HTTP_CACHE_ENABLED = True
+    HTTP_CACHE_DIR = os.path.join(".cache", "http")
+    HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Bodies are evicted LRU above this size
+    HTTP_CACHE_DEFAULT_TTL = 6 * 60 * 60  # Seconds before a cached page is revalidated
+    HTTP_CACHE_DOMAIN_TTLS = {
+        "api.duckduckgo.com": 60 * 60,
+        "en.wikipedia.org": 24 * 60 * 60,
+    }
+
+    # Local Search Index (every scraped page is added to it)
+    LOCAL_INDEX_ENABLED = True
+    LOCAL_INDEX_PATH = os.path.join(".cache", "local_index.sqlite3")
+
+    # Passage Store (every scraped page is split into passages and indexed)
+    # Tools retrieve the passages relevant to a query, topic or claim from
+    # whole pages instead of working on their first SCRAPER_MAX_CONTENT_CHARS
+    PASSAGE_STORE_ENABLED = True
+    PASSAGE_STORE_PATH = os.path.join(".cache", "passages.sqlite3")
+    PASSAGE_RETRIEVAL_MODE = "bm25"  # "bm25", or "hybrid" to rerank with local sentence embeddings
+    PASSAGE_TOP_K = 5
+    PASSAGE_RERANK_CANDIDATES = 50  # BM25 candidates reranked in hybrid mode
+
+    # Knowledge Store
+    # Scraped sources and fact-checked claims are kept across runs in a local
+    # vector index; research tasks start from related earlier findings and
+    # agents can search them. "hashing" embeds without a model, network or
+    # API key; "sentence-transformers" uses EMBEDDING_MODEL when it is installed
+    KNOWLEDGE_STORE_ENABLED = os.getenv("KNOWLEDGE_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+    KNOWLEDGE_STORE_DIR = os.path.join(".cache", "knowledge")
+    KNOWLEDGE_EMBEDDER = os.getenv("KNOWLEDGE_EMBEDDER", "hashing")
+    KNOWLEDGE_HASHING_DIM = 1024
+    KNOWLEDGE_TOP_K = 5
+    KNOWLEDGE_MIN_SCORE = 0.2  # Match score (similarity mixed with query terms found) below which a finding is dropped
+    KNOWLEDGE_PRIOR_FINDINGS = 8  # Related earlier findings added to each research task (0 disables)
+
+    # Extracted Document Cache
+    DOCUMENT_CACHE_SIZE = 256  # Documents kept in memory
+    DOCUMENT_CACHE_DISK = True
+    DOCUMENT_CACHE_DIR = os.path.join(".cache", "documents")
 
     # Validation
-    @classmethod
-    def validate(cls):
-        if not cls.GROQ_API_KEY:
+    # Run when a crew starts rather than at import, so tools, benchmarks and
+    # --help work without an API key
+    def validate(self):
+        if not self.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY is not set")
         return True
     
 settings = Settings()
-settings.validate()
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Run research on many topics concurrently in one process.
+
+Crews share the process-wide HTTP client, response cache, document cache and
+local index, so later topics reuse pages fetched for earlier ones. Each topic
+gets its own report file and a manifest.json summarizes the batch.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from config.settings import settings
+from crew.checkpoint import topic_slug
+from crew.research_crew import ResearchCrew
+from llm.rate_limit import rate_limit_stats
+from tools.http_client import get_http_client
+
+
+@dataclass
+class TopicResult:
+    """Outcome of one topic in a batch"""
+
+    topic: str
+    status: str = "pending"
+    report_path: Optional[str] = None
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+    token_usage: Dict = field(default_factory=dict)
+    timings: Dict = field(default_factory=dict)
+    trace_files: List[str] = field(default_factory=list)
+
+
+def parse_topics(lines: Iterable[str]) -> List[str]:
+    """One topic per line; blank lines and # comments are skipped, repeats dropped"""
+    topics = []
+    for line in lines:
+        topic = line.strip()
+        if topic and not topic.startswith("#"):
+            topics.append(topic)
+    return list(dict.fromkeys(topics))
+
+
+def read_topics(path: str, stdin: TextIO = None) -> List[str]:
+    """Read topics from a file, or from stdin when path is "-" """
+    if path == "-":
+        return parse_topics(stdin or sys.stdin)
+    with open(path, encoding="utf-8") as f:
+        return parse_topics(f)
+
+
+class BatchRunner:
+    """
+    Runs one ResearchCrew per topic on a bounded worker pool
+    """
+
+    def __init__(
+        self,
+        topics: List[str],
+        max_workers: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        process: Optional[str] = None,
+        search_backends: Optional[List[str]] = None,
+    ):
+        self.topics = parse_topics(topics)
+        if not self.topics:
+            raise ValueError("No topics provided for the batch")
+
+        self.max_workers = max_workers or settings.BATCH_MAX_WORKERS
+        self.process = process
+        self.search_backends = search_backends
+        self.output_dir = output_dir or os.path.join(
+            settings.OUTPUT_DIR, f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        )
+        self._slug_lock = threading.Lock()
+        self._used_slugs = set()
+
+    def run(self) -> Dict:
+        """Research every topic and return the manifest (also written to manifest.json)"""
+        # Fail once up front instead of once per topic
+        settings.validate()
+        os.makedirs(self.output_dir, exist_ok=True)
+        started_at = datetime.now()
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+            results = list(pool.map(self._run_topic, self.topics))
+
+        manifest = {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "duration_seconds": round(time.perf_counter() - start, 2),
+            "process": self.process or settings.CREW_PROCESS,
+            "max_workers": self.max_workers,
+            "total_topics": len(results),
+            "succeeded": sum(1 for r in results if r.status == "success"),
+            "failed": sum(1 for r in results if r.status == "error"),
+            "http_cache": get_http_client().cache_stats(),
+            "llm_rate_limits": rate_limit_stats(),
+            "results": [asdict(r) for r in results]
+        }
+
+        with open(os.path.join(self.output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        return manifest
+
+    def _report_path(self, topic: str) -> str:
+        slug = topic_slug(topic)
+        with self._slug_lock:
+            candidate, n = slug, 2
+            while candidate in self._used_slugs:
+                candidate = f"{slug}-{n}"
+                n += 1
+            self._used_slugs.add(candidate)
+        return os.path.join(self.output_dir, f"{candidate}.md")
+
+    def _run_topic(self, topic: str) -> TopicResult:
+        result = TopicResult(topic=topic, report_path=self._report_path(topic))
+        start = time.perf_counter()
+        crew = None
+
+        try:
+            crew = ResearchCrew(
+                topic,
+                search_backends=self.search_backends,
+                process=self.process,
+                output_file=result.report_path
+            )
+            output = crew.run()
+            result.status = "success"
+
+            # The writing task normally saves the report; keep the final output either way
+            if not os.path.exists(result.report_path):
+                with open(result.report_path, "w", encoding="utf-8") as f:
+                    f.write(str(output))
+
+            try:
+                result.token_usage = crew.get_usage_metrics().model_dump()
+            except Exception:
+                result.token_usage = {}
+
+        except Exception as e:
+            result.status = "error"
+            result.error = str(e)
+            result.report_path = None
+
+        if crew is not None:
+            result.timings = crew.get_timing_metrics()
+            if settings.TRACING_ENABLED:
+                result.trace_files = crew.export_trace(os.path.join(self.output_dir, "traces"))
+
+        result.duration_seconds = round(time.perf_counter() - start, 2)
+        return result
+
+
+def run_batch(topics: List[str], **kwargs) -> Dict:
+    """Convenience wrapper: research topics concurrently and return the manifest"""
+    return BatchRunner(topics, **kwargs).run()
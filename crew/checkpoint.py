@@ -0,0 +1,136 @@
+"""
+Checkpoints of a research run, so an interrupted run can be resumed.
+
+Every run gets a directory under settings.RUNS_DIR holding run.json (what
+was researched and how far the run got), one JSON file per completed task
+and tool_results.jsonl with the results of every web tool call. Resuming
+restores the completed task outputs, runs only the remaining tasks and
+answers repeated tool calls from the recorded results.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config.settings import settings
+from tools.tool_replay import ToolResultLog
+
+if TYPE_CHECKING:
+    from crewai.tasks.task_output import TaskOutput
+
+
+def topic_slug(topic: str, max_length: int = 60) -> str:
+    """File-name-safe version of a topic"""
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+    return slug[:max_length].rstrip("-") or "topic"
+
+
+class RunCheckpoint:
+    """
+    The run directory of one research run
+    """
+
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        self._lock = threading.Lock()
+        self.tool_log = ToolResultLog(os.path.join(run_dir, "tool_results.jsonl"))
+
+    @classmethod
+    def create(cls, topic: str, root: Optional[str] = None, **details) -> "RunCheckpoint":
+        """Start a new run directory; details (process, subtopics, ...) are kept in run.json"""
+        root = root or settings.RUNS_DIR
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        run_dir = os.path.join(root, f"{stamp}_{topic_slug(topic, 40)}")
+        os.makedirs(os.path.join(run_dir, "tasks"), exist_ok=True)
+
+        checkpoint = cls(run_dir)
+        checkpoint._write_metadata({
+            "topic": topic,
+            **details,
+            "status": "created",
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "completed_tasks": [],
+        })
+        return checkpoint
+
+    @classmethod
+    def open(cls, run_dir: str) -> "RunCheckpoint":
+        if not os.path.exists(os.path.join(run_dir, "run.json")):
+            raise FileNotFoundError(f"No research run checkpoint found in '{run_dir}'")
+        return cls(run_dir)
+
+    @classmethod
+    def latest(cls, topic: Optional[str] = None, root: Optional[str] = None) -> Optional["RunCheckpoint"]:
+        """The most recent run that did not complete, optionally for one topic"""
+        root = root or settings.RUNS_DIR
+        if not os.path.isdir(root):
+            return None
+
+        for name in sorted(os.listdir(root), reverse=True):
+            run_dir = os.path.join(root, name)
+            try:
+                with open(os.path.join(run_dir, "run.json"), encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if metadata.get("status") == "completed":
+                continue
+            if topic is None or metadata.get("topic") == topic:
+                return cls(run_dir)
+        return None
+
+    @property
+    def metadata(self) -> Dict:
+        with open(os.path.join(self.run_dir, "run.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_metadata(self, metadata: Dict):
+        _write_atomic(os.path.join(self.run_dir, "run.json"), json.dumps(metadata, indent=2))
+
+    def _update(self, **changes):
+        with self._lock:
+            metadata = self.metadata
+            metadata.update(changes)
+            metadata["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._write_metadata(metadata)
+
+    def mark(self, status: str, error: Optional[str] = None):
+        """Record the run status: running, completed or failed"""
+        self._update(status=status, error=error)
+
+    def completed_tasks(self) -> List[str]:
+        return list(self.metadata.get("completed_tasks", []))
+
+    def save_task(self, key: str, output: "TaskOutput"):
+        """Persist a finished task's output"""
+        _write_atomic(self._task_path(key), output.model_dump_json(indent=2))
+        with self._lock:
+            metadata = self.metadata
+            if key not in metadata["completed_tasks"]:
+                metadata["completed_tasks"].append(key)
+            metadata["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._write_metadata(metadata)
+
+    def load_task(self, key: str) -> Optional["TaskOutput"]:
+        """The saved output of a completed task, if any"""
+        from crewai.tasks.task_output import TaskOutput
+
+        path = self._task_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return TaskOutput.model_validate_json(f.read())
+
+    def _task_path(self, key: str) -> str:
+        return os.path.join(self.run_dir, "tasks", f"{key}.json")
+
+
+def _write_atomic(path: str, content: str):
+    """Write through a temporary file so a crash never leaves a truncated checkpoint"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
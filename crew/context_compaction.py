@@ -0,0 +1,346 @@
+"""
+Compaction of the context handed from one task to the next.
+
+By default crewai passes every context task's raw output, joined, into the
+next prompt, so each stage's prompt grows with everything written before
+it. CompactingCrew compacts that context first:
+
+- outputs are split into sections (markdown headings) and points (bullets
+  and paragraph sentences); points already seen in this context, or almost
+  entirely contained in an earlier point of the same output, are dropped.
+  A point that adds a fact-check verdict (or sits under a verdict heading)
+  is never dropped as a repeat of another task's point
+- URLs become short [S1] references into a single deduplicated source list
+- the result is compact JSON, and when it is over the task's token budget
+  the least informative points are left out (extractive summarization:
+  points are scored by how many of the context's recurring terms they
+  carry, with a bonus for figures and source references)
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import NOT_SPECIFIED
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+from pydantic import Field
+
+from config.settings import settings
+from llm.rate_limit import estimate_tokens
+from telemetry.tracing import get_tracer
+from tools.text_processing import STOPWORDS, tokenize
+from tools.url_utils import normalize_url
+
+_HEADING_RE = re.compile(r"^\s*(?:#{1,6}\s+(.+?)\s*#*|\*\*([^*]{2,80})\*\*:?|([A-Z][^.!?]{2,60}):)\s*$")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+•]|\d{1,2}[.)])\s+")
+_RULE_RE = re.compile(r"^\s*(?:[-=*_]\s*){3,}$")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_MD_LINK_RE = re.compile(r"\[([^\]\n]{1,200})\]\((https?://[^)\s]+)\)")
+_URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+_EMPHASIS_RE = re.compile(r"\*\*|__|`")
+_REF_RE = re.compile(r"\[S\d+\]")
+_DIGIT_RE = re.compile(r"\d")
+
+# Share of a point's terms that must already appear in one earlier point
+# for it to count as a repeat
+NEAR_DUPLICATE_CONTAINMENT = 0.8
+
+# Words that make a point a fact-check result rather than a restated finding
+VERDICT_TERMS = {
+    "verified", "unverified", "disputed", "false", "true", "misleading", "inaccurate", "accurate",
+    "contradicted", "contradicts", "refuted", "confirmed", "unconfirmed", "unsupported", "supported",
+    "incorrect", "correct", "partially", "outdated",
+}
+
+
+class SourceRegistry:
+    """
+    URLs seen in a context, numbered in order of first appearance
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, str] = {}
+        self.titles: Dict[str, str] = {}
+
+    def ref(self, url: str, title: Optional[str] = None) -> str:
+        # Sentence punctuation right after a bare URL is not part of it
+        url = normalize_url(url.rstrip(".,;:"))
+        if url not in self.ids:
+            self.ids[url] = f"S{len(self.ids) + 1}"
+        if title and url not in self.titles:
+            self.titles[url] = title
+        return f"[{self.ids[url]}]"
+
+    def replace_urls(self, text: str) -> str:
+        """Swap markdown links and bare URLs for source references"""
+        text = _MD_LINK_RE.sub(lambda m: f"{m.group(1)} {self.ref(m.group(2), m.group(1))}", text)
+        return _URL_RE.sub(lambda m: self.ref(m.group(0)), text)
+
+    def as_dict(self, used: set) -> Dict[str, Dict]:
+        sources = {}
+        for url, source_id in self.ids.items():
+            if source_id in used:
+                entry = {"url": url}
+                if url in self.titles:
+                    entry["title"] = self.titles[url]
+                sources[source_id] = entry
+        return sources
+
+
+def _heading(line: str) -> Optional[str]:
+    match = _HEADING_RE.match(line)
+    if not match:
+        return None
+    return next(group for group in match.groups() if group is not None).strip()
+
+
+def split_sections(text: str) -> List[Tuple[Optional[str], List[str]]]:
+    """
+    Split a task output into (heading, points) pairs. A point is a bullet
+    item (with its continuation lines) or one sentence of a paragraph.
+    """
+    sections = [(None, [])]
+    paragraph: List[str] = []
+    bullet: List[str] = []
+
+    def flush():
+        points = sections[-1][1]
+        if bullet:
+            points.append(" ".join(bullet))
+            bullet.clear()
+        if paragraph:
+            points.extend(_SENTENCE_RE.split(" ".join(paragraph)))
+            paragraph.clear()
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or _RULE_RE.match(stripped):
+            flush()
+            continue
+
+        heading = _heading(stripped)
+        if heading is not None:
+            flush()
+            sections.append((heading, []))
+        elif _BULLET_RE.match(line):
+            flush()
+            bullet.append(_BULLET_RE.sub("", line, count=1).strip())
+        elif bullet:
+            bullet.append(stripped)
+        else:
+            paragraph.append(stripped)
+    flush()
+
+    return [(heading, points) for heading, points in sections if heading or points]
+
+
+def _terms(text: str) -> set:
+    return {t for t in tokenize(_REF_RE.sub(" ", text), lower=True) if len(t) >= 3 and t not in STOPWORDS}
+
+
+class ContextCompactor:
+    """
+    Turns the outputs of a task's context tasks into compact JSON within a
+    token budget
+    """
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+
+    def compact(self, outputs: List[TaskOutput]) -> Tuple[str, Dict]:
+        """The compacted context and statistics about what was removed"""
+        sources = SourceRegistry()
+        # Exact repeats are looked up across outputs, near-duplicates only
+        # within one, so a later task restating a point with its own
+        # conclusion (a verdict) keeps it
+        seen: Dict[str, None] = {}
+        duplicates = 0
+
+        # blocks: (label, [(heading, [(point, terms)])])
+        blocks = []
+        for output in outputs:
+            sections = []
+            output_keys: Dict[str, None] = {}
+            output_terms: List[set] = []
+            for heading, points in split_sections(output.raw):
+                verdict_section = bool(_terms(heading or "") & VERDICT_TERMS)
+                kept = []
+                for point in points:
+                    point = " ".join(sources.replace_urls(_EMPHASIS_RE.sub("", point)).split())
+                    terms = _terms(point)
+                    key = " ".join(tokenize(point, lower=True))
+                    if not key:
+                        continue
+                    repeated = key in seen and not (verdict_section or terms & VERDICT_TERMS)
+                    if key in output_keys or repeated or self._is_near_duplicate(terms, output_terms):
+                        duplicates += 1
+                        continue
+                    seen[key] = None
+                    output_keys[key] = None
+                    output_terms.append(terms)
+                    kept.append((point, terms))
+                if kept or heading:
+                    sections.append((heading, kept))
+            blocks.append((output.name or output.agent, sections))
+
+        all_points = [p for _, sections in blocks for _, points in sections for p in points]
+        selected, dropped = self._select(blocks, all_points, sources)
+
+        context = []
+        used_refs = set()
+        for (label, sections), keep in zip(blocks, selected):
+            compact_sections = []
+            for section_index, (heading, points) in enumerate(sections):
+                kept_points = [point for i, (point, _) in enumerate(points) if (section_index, i) in keep]
+                if not kept_points:
+                    continue
+                for point in kept_points:
+                    used_refs.update(ref[1:-1] for ref in _REF_RE.findall(point))
+                section = {"heading": heading} if heading else {}
+                section["points"] = kept_points
+                compact_sections.append(section)
+            context.append({"task": label, "sections": compact_sections})
+
+        compacted = {"sources": sources.as_dict(used_refs), "context": context}
+        if dropped:
+            compacted["omitted_points"] = dropped
+        text = json.dumps(compacted, ensure_ascii=False, separators=(",", ":"))
+
+        return text, {
+            "points": len(all_points) + duplicates,
+            "duplicates_removed": duplicates,
+            "points_dropped": dropped,
+            "sources": len(sources.ids),
+        }
+
+    @staticmethod
+    def _is_near_duplicate(terms: set, seen_terms: List[set]) -> bool:
+        """Almost all of terms are in one earlier point, and what is left is not a verdict"""
+        if len(terms) < 5:
+            return False
+        needed = NEAR_DUPLICATE_CONTAINMENT * len(terms)
+        return any(
+            len(terms & earlier) >= needed and not (terms - earlier) & VERDICT_TERMS
+            for earlier in seen_terms
+        )
+
+    def _select(self, blocks, all_points, sources: SourceRegistry) -> Tuple[List[set], int]:
+        """
+        Pick the (section, point) indices to keep per block. Points carrying
+        a verdict are kept first; then each block gets a share of what is
+        left proportional to its size, so a long research output cannot
+        crowd out the fact-check results.
+        """
+        costs = [
+            [[estimate_tokens(json.dumps(point, ensure_ascii=False)) for point, _ in points] for _, points in sections]
+            for _, sections in blocks
+        ]
+        block_costs = [sum(sum(section) for section in block) for block in costs]
+        total = sum(block_costs)
+
+        # Source list, task labels and headings are kept whatever is dropped
+        skeleton = {
+            "sources": sources.as_dict(set(sources.ids.values())),
+            "context": [
+                {"task": label, "sections": [{"heading": heading, "points": []} for heading, _ in sections]}
+                for label, sections in blocks
+            ],
+        }
+        budget = max(self.token_budget - estimate_tokens(json.dumps(skeleton, ensure_ascii=False)), 0)
+
+        if total <= budget:
+            keep_all = [
+                {(s, i) for s, (_, points) in enumerate(sections) for i in range(len(points))}
+                for _, sections in blocks
+            ]
+            return keep_all, 0
+
+        # Without its verdicts the writer would report disputed claims as fact
+        selected = [set() for _ in blocks]
+        for b, (_, sections) in enumerate(blocks):
+            for s, (_, points) in enumerate(sections):
+                for i, (_, terms) in enumerate(points):
+                    cost = costs[b][s][i]
+                    if terms & VERDICT_TERMS and cost <= budget:
+                        selected[b].add((s, i))
+                        budget -= cost
+                        block_costs[b] -= cost
+                        total -= cost
+
+        document_frequency = Counter(term for _, terms in all_points for term in terms)
+
+        def score(point: str, terms: set) -> float:
+            if not terms:
+                return 0.0
+            centrality = sum(math.log1p(document_frequency[t]) for t in terms) / math.sqrt(len(terms))
+            bonus = (0.5 if _DIGIT_RE.search(point) else 0.0) + (0.3 if _REF_RE.search(point) else 0.0)
+            return centrality * (1.0 + bonus)
+
+        dropped = 0
+        for (_, sections), block_cost, point_costs, keep in zip(blocks, block_costs, costs, selected):
+            share = budget * block_cost / total if total else 0
+            candidates = sorted(
+                (
+                    (score(point, terms), s, i)
+                    for s, (_, points) in enumerate(sections)
+                    for i, (point, terms) in enumerate(points)
+                    if (s, i) not in keep
+                ),
+                reverse=True,
+            )
+            spent = 0
+            for _, s, i in candidates:
+                cost = point_costs[s][i]
+                if spent + cost > share:
+                    dropped += 1
+                    continue
+                keep.add((s, i))
+                spent += cost
+        return selected, dropped
+
+
+def context_token_budget(task: Task) -> int:
+    """The context budget of a task, by task name"""
+    return settings.CONTEXT_TOKEN_BUDGETS.get(task.name, settings.CONTEXT_TOKEN_BUDGET)
+
+
+class CompactingCrew(Crew):
+    """
+    Crew that hands each task a compacted version of its context
+    """
+
+    context_compaction: bool = Field(
+        default_factory=lambda: settings.CONTEXT_COMPACTION,
+        description="Compact task context into deduplicated, budgeted JSON"
+    )
+
+    def _get_context(self, task: Task, task_outputs: List[TaskOutput]) -> str:
+        if not task.context:
+            return ""
+
+        if task.context is NOT_SPECIFIED:
+            outputs = task_outputs
+        else:
+            outputs = [context_task.output for context_task in task.context if context_task.output is not None]
+
+        raw = aggregate_raw_outputs_from_task_outputs(outputs)
+        if not self.context_compaction or not outputs:
+            return raw
+
+        budget = context_token_budget(task)
+        with get_tracer().span("context.compact", **{"context.task": task.name or "unnamed"}) as span:
+            compacted, stats = ContextCompactor(budget).compact(outputs)
+            raw_tokens = estimate_tokens(raw)
+            compacted_tokens = estimate_tokens(compacted)
+            span.set_attribute("context.budget_tokens", budget)
+            span.set_attribute("context.tokens_before", raw_tokens)
+            span.set_attribute("context.tokens_after", min(raw_tokens, compacted_tokens))
+            for name, value in stats.items():
+                span.set_attribute(f"context.{name}", value)
+
+        # Short, repetition-free context can come out longer as JSON
+        return compacted if compacted_tokens < raw_tokens else raw
@@ -0,0 +1,120 @@
+"""
+Crew that runs its tasks as a dependency graph instead of one by one.
+
+Dependencies come from each task's `context`; a task starts as soon as
+every task it depends on has finished, so independent tasks (e.g. several
+research sub-topics, or analysis and fact-checking) run concurrently.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Set
+
+from crewai import Task
+from crewai.crews.utils import prepare_task_execution
+from crewai.utilities.constants import NOT_SPECIFIED
+from pydantic import Field, PrivateAttr
+
+from crew.context_compaction import CompactingCrew
+
+
+def task_dependencies(tasks: List[Task]) -> Dict[int, Set[int]]:
+    """
+    Map each task index to the indices of the tasks it depends on.
+
+    A task without an explicit context depends on every earlier task, which
+    matches what it would see when run sequentially. Context tasks outside
+    the crew that already have an output (restored from a checkpoint) are
+    not waited for.
+    """
+    positions = {id(task): index for index, task in enumerate(tasks)}
+    dependencies = {}
+
+    for index, task in enumerate(tasks):
+        if task.context is NOT_SPECIFIED:
+            dependencies[index] = set(range(index))
+            continue
+
+        depends_on = set()
+        for context_task in task.context or []:
+            if id(context_task) not in positions:
+                if context_task.output is not None:
+                    continue
+                raise ValueError(
+                    f"Task '{task.name or task.description[:40]}' depends on a task "
+                    f"that is not part of the crew"
+                )
+            depends_on.add(positions[id(context_task)])
+        dependencies[index] = depends_on
+
+    return dependencies
+
+
+class DAGCrew(CompactingCrew):
+    """
+    Crew whose sequential process is replaced by a dependency-graph scheduler
+    (context is compacted as in CompactingCrew)
+    """
+
+    max_workers: int = Field(default=4, description="Tasks allowed to run at the same time")
+
+    _agent_locks: Dict[int, threading.Lock] = PrivateAttr(default_factory=dict)
+
+    def _run_sequential_process(self):
+        return self._execute_task_graph(self.tasks)
+
+    def _execute_task_graph(self, tasks: List[Task]):
+        """Run tasks as soon as their dependencies are done"""
+        dependencies = task_dependencies(tasks)
+        for task in tasks:
+            self._agent_locks.setdefault(id(task.agent), threading.Lock())
+
+        outputs = {}
+        remaining = set(range(len(tasks)))
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew-task") as pool:
+            while remaining or running:
+                ready = sorted(i for i in remaining if dependencies[i] <= outputs.keys())
+                for index in ready:
+                    remaining.discard(index)
+                    # Run under a copy of the caller's context so crewai's event
+                    # and tracing context variables reach the worker thread
+                    ctx = contextvars.copy_context()
+                    future = pool.submit(ctx.run, self._execute_graph_task, tasks, index)
+                    running[future] = index
+
+                if not running:
+                    raise ValueError("Task dependencies contain a cycle")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    try:
+                        outputs[index] = future.result()
+                    except Exception:
+                        for pending in running:
+                            pending.cancel()
+                        raise
+
+        return self._create_crew_output([outputs[i] for i in range(len(tasks))])
+
+    def _execute_graph_task(self, tasks: List[Task], index: int):
+        task = tasks[index]
+
+        # An agent keeps per-run executor state, so it works on one task at a time
+        with self._agent_locks[id(task.agent)]:
+            exec_data, _, _ = prepare_task_execution(self, task, index, None, [], None)
+            previous_outputs = [t.output for t in tasks[:index] if t.output is not None]
+            context = self._get_context(task, previous_outputs)
+
+            output = task.execute_sync(
+                agent=exec_data.agent,
+                context=context,
+                tools=exec_data.tools,
+            )
+
+        self._process_task_result(task, output)
+        self._store_execution_log(task, output, index)
+        return output
@@ -0,0 +1,132 @@
+"""
+Live streaming of the final report while the writer agent generates it.
+
+Token chunks of the writing task are forwarded to a callback and appended
+to "<report>.partial" as they arrive; when the crew finishes, the final
+report replaces the target file with an atomic rename.
+"""
+
+import os
+import time
+from typing import Callable, Optional
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+# Answers in the ReAct format start with reasoning; the report follows this marker
+_FINAL_ANSWER_MARKER = "Final Answer:"
+_THOUGHT_PREFIX = "Thought:"
+
+
+class FinalAnswerFilter:
+    """
+    Drops the "Thought: ..." preamble of a streamed ReAct answer and passes
+    through everything after "Final Answer:". Answers without the preamble
+    pass through unchanged.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._buffer = ""
+        self._state = "undecided"
+
+    def feed(self, chunk: str) -> str:
+        if self._state == "passthrough":
+            return chunk
+
+        self._buffer += chunk
+        if _FINAL_ANSWER_MARKER in self._buffer:
+            self._state = "passthrough"
+            return self._buffer.split(_FINAL_ANSWER_MARKER, 1)[1].lstrip()
+
+        if self._state == "undecided":
+            head = self._buffer.lstrip()
+            if head.startswith(_THOUGHT_PREFIX):
+                self._state = "thinking"
+            elif head and not _THOUGHT_PREFIX.startswith(head):
+                self._state = "passthrough"
+                return self._buffer
+        return ""
+
+
+class ReportStream:
+    """
+    Streams one task's LLM output to a callback and a partial report file.
+
+    Use as a context manager around the crew run and call complete() with
+    the final report; if the run fails the .partial file is left in place.
+    """
+
+    def __init__(self, task, path: Optional[str], on_token: Optional[Callable[[str], None]] = None):
+        self.task_id = str(task.id)
+        self.path = path
+        self.partial_path = f"{path}.partial" if path else None
+        self.on_token = on_token
+
+        self.started_at = None
+        self.first_token_at = None
+        self._file = None
+        self._response_id = None
+        self._filter = FinalAnswerFilter()
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from the start of the run to the first report token"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    def __enter__(self):
+        self.started_at = time.monotonic()
+        if self.partial_path:
+            directory = os.path.dirname(self.partial_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.partial_path, "w", encoding="utf-8")
+        crewai_event_bus.on(LLMStreamChunkEvent)(self._on_chunk)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        crewai_event_bus.off(LLMStreamChunkEvent, self._on_chunk)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return False
+
+    def _on_chunk(self, source, event):
+        # Chunk events are delivered synchronously and in order on the
+        # thread making the LLM call
+        if getattr(event, "task_id", None) != self.task_id or event.tool_call:
+            return
+
+        if event.response_id != self._response_id:
+            # A new LLM response for the task (e.g. a retry) restarts the report
+            self._response_id = event.response_id
+            self._filter.reset()
+            if self._file is not None:
+                self._file.seek(0)
+                self._file.truncate()
+
+        text = self._filter.feed(event.chunk)
+        if not text:
+            return
+
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+        if self._file is not None:
+            self._file.write(text)
+            self._file.flush()
+        if self.on_token is not None:
+            self.on_token(text)
+
+    def complete(self, report: str):
+        """Write the final report and move it over the target path atomically"""
+        if not self.partial_path:
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(self.partial_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        os.replace(self.partial_path, self.path)
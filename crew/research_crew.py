@@ -1,5 +1,23 @@
-from crewai import Crew, Process
+from crewai import Process
+from crewai.crews.crew_output import CrewOutput
+from crewai.types.usage_metrics import UsageMetrics
+import functools
 import os
+import queue
+import threading
+from datetime import datetime
+from config.settings import settings
+from crew.checkpoint import RunCheckpoint
+from crew.context_compaction import CompactingCrew
+from crew.dag_crew import DAGCrew
+from crew.report_stream import ReportStream
+from llm.cache import get_llm_cache
+from llm.rate_limit import rate_limit_stats
+from telemetry.tracing import get_tracer
+from tools.document_cache import get_document_cache
+from tools.http_client import get_http_client
+from tools.knowledge_store import format_findings, prior_findings, research_topic
+from tools.tool_replay import recording
 from agents.research_agent import create_research_agent
 from agents.analyst_agent import create_analyst_agent
 from agents.fact_checker_agent import create_fact_checker_agent
@@ -7,107 +25,263 @@ from agents.writer_agent import create_writer_agent
 from tasks.research_tasks import create_research_task
 from tasks.analysis_tasks import create_analysis_task
 from tasks.fact_check_tasks import create_fact_check_task
-from tasks.writing_tasks import create_writing_task
+from tasks.writing_tasks import create_writing_task, default_report_path
 
 class ResearchCrew:
     """
     AI Research Assistant Crew
     Orchestrates multiple agents to conduct comprehensive research.
+
+    process is "sequential" (default) or "dag". In DAG mode fact-checking
+    works from the research findings in parallel with the analysis, and each
+    of the optional subtopics gets its own researcher running concurrently.
+    output_file overrides where the final report is written.
+
+    The report is written to "<output_file>.partial" while the writer
+    generates it and renamed into place when the run completes; run() takes
+    an on_token callback and stream() yields the report tokens as they arrive.
+
+    With CHECKPOINT_ENABLED every finished task and web tool result is saved
+    to a run directory under RUNS_DIR; ResearchCrew.resume() picks up an
+    interrupted run from there, skipping the tasks that already completed.
+
+    agents reuses already built agents (keyed like self.agents, e.g. a warm
+    set from the research service's AgentPool); missing ones are created.
+
+    With KNOWLEDGE_STORE_ENABLED the research tasks start from related
+    findings of earlier runs (self.prior_findings), and the sources and
+    verified claims of this run are added to the knowledge store.
     """
 
-    def __init__(self, topic: str):
+    def __init__(self, topic: str, search_backends=None, process: str = None, subtopics=None,
+                 output_file: str = None, checkpoint: RunCheckpoint = None, agents=None):
+        settings.validate()
         self.topic = topic
-        self.agents = self._create_agents()
+        self.output_file = output_file
+        self.search_backends = search_backends
+        self.process, self.subtopics = self.check_options(process, subtopics)
+        self.agents = self._create_agents(agents)
+        self.prior_findings = prior_findings(topic)
         self.tasks = self._create_tasks()
-        self.crew = self._create_crew()
+        # crewai makes absolute task output paths relative; the report is saved by ReportStream
+        self.report_path = self.output_file or default_report_path(topic)
+        self.report_stream = None
+        self.result = None
+        self.trace_id = None
+        self.checkpoint = checkpoint
+        self._on_task_complete = None
+        self.restored_tasks = self._restore_tasks()
+        self.crew = self._create_crew() if len(self.restored_tasks) < len(self.tasks) else None
 
-    def _create_agents(self):
-        """Initialize all agents"""
-        return {
-            'researcher': create_research_agent(),
-            'analyst': create_analyst_agent(),
-            'fact_checker': create_fact_checker_agent(),
-            'writer': create_writer_agent()
+    @staticmethod
+    def check_options(process: str = None, subtopics=None):
+        """Validate the process and subtopics of a run; returns them normalized"""
+        process = process or settings.CREW_PROCESS
+        if not isinstance(process, str) or process not in ("sequential", "dag"):
+            raise ValueError(f"Unknown crew process '{process}'. Expected 'sequential' or 'dag'")
+        # A bare string would otherwise be split into one subtopic per character
+        if subtopics is not None and (
+            not isinstance(subtopics, (list, tuple)) or not all(isinstance(s, str) for s in subtopics)
+        ):
+            raise ValueError("Research subtopics must be a list of strings")
+        subtopics = [s.strip() for s in (subtopics or []) if s and s.strip()]
+        if subtopics and process != "dag":
+            raise ValueError("Research subtopics require the 'dag' process")
+        return process, subtopics
+
+    @classmethod
+    def resume(cls, run_dir: str = None):
+        """
+        Rebuild the crew of an interrupted run from its checkpoint (the most
+        recent unfinished run when run_dir is None); run() then continues it
+        """
+        checkpoint = RunCheckpoint.open(run_dir) if run_dir else RunCheckpoint.latest()
+        if checkpoint is None:
+            raise FileNotFoundError(f"No unfinished research run to resume in '{settings.RUNS_DIR}'")
+
+        metadata = checkpoint.metadata
+        return cls(
+            metadata["topic"],
+            search_backends=metadata.get("search_backends"),
+            process=metadata.get("process"),
+            subtopics=metadata.get("subtopics"),
+            output_file=metadata.get("output_file"),
+            checkpoint=checkpoint
+        )
+
+    def _restore_tasks(self):
+        """
+        Give completed tasks their saved output, so later tasks read it as
+        context, and save each task's output when it finishes from now on
+        """
+        restored = []
+        completed = set(self.checkpoint.completed_tasks()) if self.checkpoint else set()
+
+        for key, task in self.tasks.items():
+            output = self.checkpoint.load_task(key) if key in completed else None
+            if output is not None:
+                task.output = output
+                restored.append(key)
+            task.callback = functools.partial(self._task_completed, key)
+        return restored
+
+    def _task_completed(self, key, output):
+        if self.checkpoint is not None:
+            self.checkpoint.save_task(key, output)
+        if self._on_task_complete is not None:
+            self._on_task_complete(key, output)
+
+    def _mark_checkpoint(self, status, error=None):
+        if self.checkpoint is not None:
+            self.checkpoint.mark(status, error)
+
+    def _create_agents(self, agents=None):
+        """Initialize all agents, reusing the ones passed in"""
+        agents = dict(agents or {})
+        # One researcher per subtopic so they can work at the same time
+        researchers = ['researcher'] + [f'researcher_{i}' for i in range(2, len(self.subtopics) + 1)]
+        for key in researchers:
+            if key not in agents:
+                agents[key] = create_research_agent(search_backends=self.search_backends)
+
+        factories = {
+            'analyst': create_analyst_agent,
+            'fact_checker': create_fact_checker_agent,
+            'writer': create_writer_agent
         }
+        for key, factory in factories.items():
+            if key not in agents:
+                agents[key] = factory()
+        return agents
     
     def _create_tasks(self):
         """Initialize all tasks with proper dependencies"""
-        research_task = create_research_task(
-            self.agents['researcher'],
-            topic=self.topic
-            )
+        research_tasks = {}
+        findings = format_findings(self.prior_findings)
+        if self.subtopics:
+            for i, subtopic in enumerate(self.subtopics, start=1):
+                suffix = "" if i == 1 else f"_{i}"
+                research_tasks[f'research{suffix}'] = create_research_task(
+                    self.agents[f'researcher{suffix}'],
+                    topic=self.topic,
+                    subtopic=subtopic,
+                    prior_findings=findings
+                )
+        else:
+            research_tasks['research'] = create_research_task(
+                self.agents['researcher'],
+                topic=self.topic,
+                prior_findings=findings
+                )
+        research_task_list = list(research_tasks.values())
         
         analysis_task = create_analysis_task(
             agent=self.agents['analyst'],
-            research_task=research_task
+            research_task=research_task_list
         )
 
-        fact_check_task = create_fact_check_task(
-            agent=self.agents['fact_checker'],
-            analysis_task=analysis_task
-        )
+        if self.process == "dag":
+            # Fact-check the research directly so it does not wait for the analysis
+            fact_check_task = create_fact_check_task(
+                agent=self.agents['fact_checker'],
+                research_tasks=research_task_list
+            )
+        else:
+            fact_check_task = create_fact_check_task(
+                agent=self.agents['fact_checker'],
+                analysis_task=analysis_task
+            )
 
         writing_task = create_writing_task(
             agent=self.agents['writer'],
             topic=self.topic,
-            research_task=research_task,
+            research_task=research_task_list,
             analysis_task=analysis_task,
-            fact_check_task=fact_check_task
+            fact_check_task=fact_check_task,
+            output_file=self.output_file
         )
 
         return {
-            'research': research_task,
+            **research_tasks,
             'analysis': analysis_task,
             'fact_check': fact_check_task,
             'writing': writing_task
         }
     
     def _create_crew(self): 
-        """Create the crew with sequential process"""
-        chroma_hf_key = os.getenv("CHROMA_HUGGINGFACE_API_KEY")
-        memory_enabled = bool(chroma_hf_key)
-        if not memory_enabled:
-            print(
-                "Note: Crew memory is disabled because CHROMA_HUGGINGFACE_API_KEY is not set. "
-                "Set it to enable vector-memory embeddings."
-            )
-
-        crew_kwargs = dict(
-            agents=list(self.agents.values()),
-            tasks=list(self.tasks.values()),
-            process=Process.sequential,
-            verbose=True,
-            memory=memory_enabled,
-        )
-
-        if memory_enabled:
-            crew_kwargs["embedder"] = {
-                "provider": "huggingface",
-                "config": {"model": "sentence-transformers/all-MiniLM-L6-v2"},
-            }
+        """Create the crew with the sequential process or the DAG scheduler"""
+        # Knowledge across runs comes from the local knowledge store, so
+        # crewai's own memory (and the embedding service it needs) stays off
+        crew_kwargs = {}
+        if self.process == "dag":
+            crew_class = DAGCrew
+            crew_kwargs["max_workers"] = settings.DAG_MAX_WORKERS
+        else:
+            crew_class = CompactingCrew
 
-        return Crew(
+        return crew_class(
             agents=list(self.agents.values()),
-            tasks=list(self.tasks.values()),
+            tasks=[task for key, task in self.tasks.items() if key not in self.restored_tasks],
             process=Process.sequential,
             verbose=True,
             tracing=True,
-            memory=crew_kwargs["memory"],
-            **({"embedder": crew_kwargs["embedder"]} if "embedder" in crew_kwargs else {}),
+            memory=False,
+            **crew_kwargs,
         )
     
-    def run(self):
+    def run(self, on_token=None, on_task_complete=None):
         """
         Execute the research crew
         Returns the final report.
+        on_token is called with each piece of the report as the writer generates it,
+        on_task_complete with the key and output of each task as it finishes.
         """
         print(f"\n{'='*80}")
         print(f"Starting AI Research Assistant Crew")
         print(f"Topic: {self.topic}")
+        print(f"Process: {self.process}")
+        if self.prior_findings:
+            print(f"Prior findings: {len(self.prior_findings)} from earlier runs")
+        if self.checkpoint is None and settings.CHECKPOINT_ENABLED:
+            self.checkpoint = RunCheckpoint.create(
+                self.topic,
+                process=self.process,
+                subtopics=self.subtopics,
+                search_backends=self.search_backends,
+                output_file=self.report_path
+            )
+        if self.checkpoint is not None:
+            print(f"Checkpoint: {self.checkpoint.run_dir}")
+        if self.restored_tasks:
+            print(f"Resuming: {', '.join(self.restored_tasks)} already completed")
         print(f"{'='*80}\n")
 
+        writing_task = self.tasks['writing']
+        writer_llm = self.agents['writer'].llm
+        previous_stream = writer_llm.stream
+        if on_token is not None or settings.REPORT_STREAMING:
+            writer_llm.stream = True
+
+        # ReportStream saves the report instead of the task so it can be
+        # written while it is generated and only replaced once complete
+        writing_task.output_file = None
+        self.report_stream = ReportStream(writing_task, self.report_path, on_token)
+
+        run_span = get_tracer().span(
+            "research_crew.run", **{"research.topic": self.topic, "crew.process": self.process}
+        )
+
+        tool_log = self.checkpoint.tool_log if self.checkpoint is not None else None
+        self._mark_checkpoint("running")
+        self._on_task_complete = on_task_complete
+
         try:
-            result = self.crew.kickoff()
+            with run_span as span, self.report_stream, recording(tool_log), research_topic(self.topic):
+                self.trace_id = span.trace_id
+                result = self.crew.kickoff() if self.crew is not None else self._restored_output()
+                self.report_stream.complete(result.raw)
+            self.result = result
+            self._mark_checkpoint("completed")
 
             print(f"\n{'='*80}")
             print(f"✅ Research Complete!")
@@ -116,11 +290,91 @@ class ResearchCrew:
             return result
         
         except Exception as e:
+            self._mark_checkpoint("failed", str(e))
             print(f"\n{'='*80}")
             print(f"❌ Error during research: {str(e)}")
             print(f"{'='*80}\n")
             raise
+
+        except KeyboardInterrupt:
+            self._mark_checkpoint("interrupted")
+            raise
+
+        finally:
+            writing_task.output_file = self.report_path
+            writer_llm.stream = previous_stream
+            self._on_task_complete = None
+
+    def _restored_output(self):
+        """The crew result of a run whose tasks had all completed before it was resumed"""
+        outputs = [task.output for task in self.tasks.values()]
+        return CrewOutput(raw=outputs[-1].raw, tasks_output=outputs, token_usage=UsageMetrics())
+
+    def stream(self):
+        """
+        Run the crew in a background thread and yield the report tokens as
+        the writer generates them. The final result is in self.result once
+        the iterator is exhausted; errors from the run are re-raised.
+        """
+        tokens = queue.Queue()
+        finished = object()
+        errors = []
+
+        def worker():
+            try:
+                self.run(on_token=tokens.put)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                tokens.put(finished)
+
+        thread = threading.Thread(target=worker, name="research-crew", daemon=True)
+        thread.start()
+
+        while True:
+            token = tokens.get()
+            if token is finished:
+                break
+            yield token
+
+        thread.join()
+        if errors:
+            raise errors[0]
     
     def get_usage_metrics(self):
         """Get token usage and cost metrics."""
-        return self.crew.usage_metrics
\ No newline at end of file
+        return self.crew.usage_metrics if self.crew is not None else None
+
+    def get_timing_metrics(self):
+        """
+        Wall time per task, tool, LLM call and HTTP request of the last run,
+        with bytes fetched and LLM token and queue totals
+        """
+        if self.trace_id is None:
+            return {}
+        return get_tracer().summary(self.trace_id)
+
+    def export_trace(self, directory: str = None):
+        """
+        Write the last run's spans as JSON (with timing summary and cache
+        metrics) and as OpenTelemetry OTLP/JSON.
+        Returns the paths of the two files.
+        """
+        if self.trace_id is None:
+            return []
+
+        directory = directory or settings.TRACE_DIR
+        stem = os.path.join(directory, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.trace_id[:8]}")
+        usage = self.get_usage_metrics()
+        metrics = {
+            "token_usage": usage.model_dump() if usage is not None else {},
+            "http_cache": get_http_client().cache_stats(),
+            "document_cache": get_document_cache().stats(),
+            "llm_cache": get_llm_cache().stats() if settings.LLM_CACHE_MODE != "off" else {},
+            "llm_rate_limits": rate_limit_stats(),
+        }
+
+        tracer = get_tracer()
+        tracer.export_json(f"{stem}.json", self.trace_id, metrics=metrics)
+        tracer.export_otlp(f"{stem}.otlp.json", self.trace_id)
+        return [f"{stem}.json", f"{stem}.otlp.json"]
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Disk cache for LLM completions.
+
+Responses are keyed on the model, the sampling parameters, the tool schemas
+and the full message list, and stored in SQLite. An optional near-duplicate
+lookup matches prompts by token overlap, and replay mode serves only from the
+cache so a run can be reproduced without calling the API.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override, call_stream_override, llm_call_context
+from pydantic import Field
+
+from config.settings import settings
+from telemetry.tracing import get_tracer, set_span_attributes
+from tools.text_processing import tokenize
+
+CACHE_MODES = ("off", "read_write", "replay")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    params_key TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_terms TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_params ON responses(params_key, created_at);
+"""
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no cached response"""
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def prompt_terms(messages: List[Dict]) -> set:
+    """Distinct lowercase tokens of every message, for near-duplicate lookup"""
+    text = " ".join(str(message.get("content", "")) for message in messages)
+    return set(tokenize(text, lower=True))
+
+
+def encode_response(result: Any) -> Optional[Dict]:
+    """
+    JSON-safe form of an LLM result: text, or native tool calls in the
+    OpenAI dict format crewai accepts back. None if it cannot be cached.
+    """
+    if isinstance(result, str):
+        return {"type": "text", "content": result}
+
+    if isinstance(result, list) and result:
+        from crewai.utilities.agent_utils import extract_tool_call_info
+
+        calls = []
+        for tool_call in result:
+            info = extract_tool_call_info(tool_call)
+            if info is None:
+                return None
+            call_id, name, arguments = info
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments)
+            calls.append({
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": arguments}
+            })
+        return {"type": "tool_calls", "calls": calls}
+
+    return None
+
+
+def decode_response(payload: Dict) -> Any:
+    if payload["type"] == "text":
+        return payload["content"]
+    return payload["calls"]
+
+
+class LLMResponseCache:
+    """
+    SQLite store of completions keyed by prompt, model and parameters
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.LLM_CACHE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def keys(params: Dict, messages: List[Dict]):
+        """(exact key, parameter key) for a request"""
+        params_key = _digest(params)
+        return _digest([params_key, messages]), params_key
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET hits = hits + 1 WHERE key = ?", (key,))
+            self._db.commit()
+            self._stats["hits"] += 1
+        return json.loads(row[0])
+
+    def find_similar(self, params_key: str, terms: set, threshold: float) -> Optional[Dict]:
+        """
+        Most recent response whose prompt has a token Jaccard similarity of at
+        least threshold with terms, under the same model and parameters
+        """
+        if not terms:
+            return None
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, prompt_terms, response FROM responses WHERE params_key = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (params_key, settings.LLM_CACHE_SEMANTIC_CANDIDATES)
+            ).fetchall()
+
+        best_key, best_response, best_score = None, None, threshold
+        for key, stored_terms, response in rows:
+            stored = set(stored_terms.split())
+            union = len(terms | stored)
+            score = len(terms & stored) / union if union else 0.0
+            if score >= best_score:
+                best_key, best_response, best_score = key, response, score
+                if score == 1.0:
+                    break
+
+        if best_key is None:
+            return None
+
+        with self._lock:
+            self._db.execute("UPDATE responses SET hits = hits + 1 WHERE key = ?", (best_key,))
+            self._db.commit()
+            self._stats["semantic_hits"] += 1
+        return json.loads(best_response)
+
+    def put(self, key: str, params_key: str, model: str, terms: set, payload: Dict):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, params_key, model, prompt_terms, response, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, params_key, model, " ".join(sorted(terms)), json.dumps(payload), time.time())
+            )
+            self._db.commit()
+            self._stats["stores"] += 1
+
+    def record_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["semantic_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache()
+    return _cache
+
+
+class CachedLLM(BaseLLM):
+    """
+    Wraps a crewai LLM and answers repeated prompts from LLMResponseCache.
+
+    Calls that execute tools inside the LLM (available_functions) or ask for
+    a structured response_model always go to the wrapped LLM.
+    """
+
+    llm_type: str = "cached"
+    llm: BaseLLM = Field(description="The LLM that answers cache misses")
+    cache_mode: str = "read_write"
+    semantic_threshold: Optional[float] = None
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        call_kwargs = dict(
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+
+        with get_tracer().span("llm.call", kind="client", **{"llm.model": self.model}):
+            return self._call(messages, call_kwargs)
+
+    # The wrapped LLM already retries rate-limited calls
+    call._crewai_rate_limit_wrapped = True
+
+    def _call(self, messages, call_kwargs: Dict):
+        """Answer from the cache, or complete and store the response"""
+        if self.cache_mode == "off" or call_kwargs["available_functions"] or call_kwargs["response_model"] is not None:
+            set_span_attributes(**{"llm.cache": "bypass"})
+            return self._complete(messages, **call_kwargs)
+
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        cache = get_llm_cache()
+        key, params_key = cache.keys(self._cache_params(call_kwargs["tools"]), messages)
+
+        payload = cache.get(key)
+        cache_status = "hit"
+        if payload is None and self.semantic_threshold:
+            payload = cache.find_similar(params_key, prompt_terms(messages), self.semantic_threshold)
+            cache_status = "near_duplicate_hit"
+        if payload is not None:
+            set_span_attributes(**{"llm.cache": cache_status})
+            result = decode_response(payload)
+            if isinstance(result, str) and self._effective_stream():
+                # Streaming consumers still see cached answers, as a single chunk
+                with llm_call_context() as call_id:
+                    self._emit_stream_chunk_event(
+                        result,
+                        from_task=call_kwargs["from_task"],
+                        from_agent=call_kwargs["from_agent"],
+                        response_id=call_id
+                    )
+            return result
+
+        set_span_attributes(**{"llm.cache": "miss"})
+        cache.record_miss()
+        if self.cache_mode == "replay":
+            raise LLMCacheMiss(
+                f"No cached response for this prompt (model {self.model}) and LLM_CACHE_MODE is 'replay'"
+            )
+
+        result = self._complete(messages, **call_kwargs)
+
+        payload = encode_response(result)
+        if payload is not None:
+            cache.put(key, params_key, self.model, prompt_terms(messages), payload)
+        return result
+
+    def _complete(self, messages, **kwargs):
+        """Send the request to the wrapped LLM"""
+        # Stop words and streaming are set per call on this wrapper; hand them on
+        with call_stop_override(self.llm, self.stop_sequences), \
+                call_stream_override(self.llm, bool(self._effective_stream() or self.llm.stream)):
+            return self.llm.call(messages, **kwargs)
+
+    def _cache_params(self, tools) -> Dict:
+        return {
+            "model": self.llm.model,
+            "temperature": self.llm.temperature,
+            "max_tokens": self.llm.max_tokens,
+            "top_p": self.llm.top_p,
+            "seed": self.llm.seed,
+            "stop": self.stop_sequences,
+            "tools": tools or [],
+        }
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def supports_multimodal(self) -> bool:
+        return self.llm.supports_multimodal()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        # Only completions that reached the API used tokens
+        return self.llm.get_token_usage_summary()
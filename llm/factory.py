@@ -0,0 +1,39 @@
+"""
+Builds the LLM used by the agents: behind the response cache when enabled,
+with cache misses throttled by the model's process-wide rate limiter.
+"""
+
+from typing import Optional
+
+from crewai import LLM
+
+from config.settings import settings
+from llm.cache import CACHE_MODES
+from llm.rate_limit import RateLimitedLLM
+
+
+def create_llm(temperature: Optional[float] = None, max_tokens: Optional[int] = None):
+    """
+    Create an agent LLM from settings; temperature and max_tokens override
+    settings.TEMPERATURE and settings.MAX_TOKENS
+    """
+    llm = LLM(
+        model=settings.MODEL_NAME,
+        base_url=settings.GROQ_BASE_URL,
+        api_key=settings.GROQ_API_KEY,
+        temperature=settings.TEMPERATURE if temperature is None else temperature,
+        max_tokens=max_tokens or settings.MAX_TOKENS,
+    )
+
+    mode = settings.LLM_CACHE_MODE
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown LLM cache mode '{mode}'. Expected one of: {', '.join(CACHE_MODES)}")
+
+    return RateLimitedLLM(
+        llm=llm,
+        model=llm.model,
+        temperature=llm.temperature,
+        max_tokens=llm.max_tokens,
+        cache_mode=mode,
+        semantic_threshold=settings.LLM_CACHE_SEMANTIC_THRESHOLD,
+    )
@@ -0,0 +1,260 @@
+"""
+Process-wide rate limiting for LLM requests.
+
+Every agent's LLM draws from one limiter per model: token buckets for
+requests and tokens per minute, requests queued in arrival order while the
+buckets refill, and a shared pause with exponential backoff when the API
+still answers 429. Queue wait times are recorded so throughput can be tuned
+against the account quota.
+"""
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config.settings import settings
+from llm.cache import CachedLLM
+from telemetry.tracing import set_span_attributes
+
+try:
+    # crewai retries rate-limited calls itself unless a retry is already active;
+    # marking ours active keeps backoff in one place, coordinated by the limiter
+    from crewai.llms.retry import _active_llm_rate_limit_retry
+except ImportError:
+    _active_llm_rate_limit_retry = None
+
+_RATE_LIMIT_MARKERS = ("rate limit", "rate_limit", "too many requests")
+# A 429 named as a status ("Error code: 429", "status 429", "HTTP 429"), not
+# any message that happens to contain the digits (token counts, request ids)
+_STATUS_429_RE = re.compile(r"\b(?:error|status|code|http)(?: code)?\s*[:=]?\s*429\b")
+
+
+class TokenBucket:
+    """
+    Refills continuously at per_minute / 60 units a second up to capacity.
+    Reconciling actual usage may leave it negative, which later callers wait out.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (requests above capacity wait for a full bucket)"""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by all callers
+    of one model
+    """
+
+    def __init__(self, requests_per_minute: Optional[int], tokens_per_minute: Optional[int]):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self._lock = threading.Lock()
+        # Held by the request at the head of the queue while it waits, so
+        # requests are granted one at a time in the order they arrive
+        self._queue = threading.Lock()
+        self._paused_until = 0.0
+        self._waiting = 0
+
+        self._waits = deque(maxlen=1000)
+        self._stats = {
+            "requests": 0,
+            "rate_limited": 0,
+            "queue_wait_seconds": 0.0,
+            "max_queue_wait_seconds": 0.0,
+        }
+
+    def acquire(self, tokens: int) -> float:
+        """Block until one request and tokens fit the quota; returns the seconds waited"""
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+
+        try:
+            with self._queue:
+                while True:
+                    with self._lock:
+                        now = time.monotonic()
+                        delay = self._paused_until - now
+                        if self.requests:
+                            delay = max(delay, self.requests.wait_time(1, now))
+                        if self.tokens:
+                            delay = max(delay, self.tokens.wait_time(tokens, now))
+
+                        if delay <= 0:
+                            if self.requests:
+                                self.requests.take(1)
+                            if self.tokens:
+                                self.tokens.take(tokens)
+                            break
+                    time.sleep(delay)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["queue_wait_seconds"] += waited
+            self._stats["max_queue_wait_seconds"] = max(self._stats["max_queue_wait_seconds"], waited)
+            self._waits.append(waited)
+        return waited
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once the actual usage of a request is known"""
+        if not self.tokens:
+            return
+        with self._lock:
+            if used > reserved:
+                self.tokens.take(used - reserved)
+            else:
+                self.tokens.give_back(reserved - used)
+
+    def pause(self, seconds: float):
+        """Hold every queued request after the API reported a rate limit"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["rate_limited"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            waits = sorted(self._waits)
+            stats["queued"] = self._waiting
+        stats["avg_queue_wait_seconds"] = stats["queue_wait_seconds"] / stats["requests"] if stats["requests"] else 0.0
+        stats["p95_queue_wait_seconds"] = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        return {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Return the process-wide limiter for a model, creating it on first use"""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = RateLimiter(
+                settings.LLM_REQUESTS_PER_MINUTE,
+                settings.LLM_TOKENS_PER_MINUTE
+            )
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict]:
+    """Limiter metrics per model"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception (or its cause) is an HTTP 429 / rate-limit response"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status == 429:
+            return True
+        message = str(error).lower()
+        if any(marker in message for marker in _RATE_LIMIT_MARKERS) or _STATUS_429_RE.search(message):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the API through a Retry-After header, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given zero-based retry attempt"""
+    delay = min(settings.LLM_BACKOFF_BASE * (2 ** attempt), settings.LLM_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def estimate_tokens(messages) -> int:
+    """Rough prompt size: about four characters per token"""
+    if isinstance(messages, str):
+        return len(messages) // 4 + 1
+    return sum(len(str(message.get("content", ""))) for message in messages) // 4 + 1
+
+
+class RateLimitedLLM(CachedLLM):
+    """
+    CachedLLM whose cache misses go through the model's shared RateLimiter,
+    with 429-aware retries
+    """
+
+    llm_type: str = "rate_limited"
+
+    def _complete(self, messages, **kwargs):
+        limiter = get_rate_limiter(self.llm.model)
+        completion_estimate = min(
+            int(self.llm.max_tokens or settings.LLM_COMPLETION_TOKENS_ESTIMATE),
+            settings.LLM_COMPLETION_TOKENS_ESTIMATE
+        )
+        reserved = estimate_tokens(messages) + completion_estimate
+        queue_wait = 0.0
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            queue_wait += limiter.acquire(reserved)
+            usage_before = self.llm.get_token_usage_summary()
+            token = _active_llm_rate_limit_retry.set(True) if _active_llm_rate_limit_retry else None
+
+            try:
+                result = super()._complete(messages, **kwargs)
+            except Exception as e:
+                # A failed request did not use the reserved tokens
+                limiter.settle(reserved, 0)
+                if not is_rate_limit_error(e) or attempt == settings.LLM_MAX_RETRIES:
+                    raise
+                limiter.pause(retry_after_seconds(e) or backoff_delay(attempt))
+                continue
+            finally:
+                if token is not None:
+                    _active_llm_rate_limit_retry.reset(token)
+                set_span_attributes(**{"llm.queue_wait_seconds": queue_wait, "llm.attempts": attempt + 1})
+
+            # Each agent has its own LLM and runs one call at a time, so the
+            # usage delta belongs to this call
+            usage = self.llm.get_token_usage_summary()
+            used = usage.total_tokens - usage_before.total_tokens
+            limiter.settle(reserved, used if used > 0 else reserved)
+            set_span_attributes(**{
+                "llm.prompt_tokens": usage.prompt_tokens - usage_before.prompt_tokens,
+                "llm.completion_tokens": usage.completion_tokens - usage_before.completion_tokens,
+            })
+            return result
@@ -3,12 +3,18 @@ AI Research Assistant using CrewAI
 A multi-agent system for comprehensive research and report generation
 """
 
+import argparse
+import importlib
 import os
 import sys
+import threading
 from datetime import datetime
-from crew.research_crew import ResearchCrew
 from config.settings import settings
 
+# crewai and the tools take seconds to import, so crew modules are imported
+# when a crew is built (or in the background while the topic is typed)
+CREW_MODULE = "crew.research_crew"
+
 
 def ensure_output_directory():
     """Create output directory if it doesn't exist."""
@@ -36,47 +42,215 @@ def get_research_topic():
     
     return topic
 
+def preload_crew():
+    """Import the crew modules in the background so they are ready once a topic is entered"""
+    thread = threading.Thread(
+        target=importlib.import_module, args=(CREW_MODULE,), name="preload-crew", daemon=True
+    )
+    thread.start()
+    return thread
+
+def parse_args(argv=None):
+    """Command-line options; with none, the topic is asked for interactively"""
+    parser = argparse.ArgumentParser(description="AI Research Assistant Crew")
+    parser.add_argument("--topic", help="Research a single topic without prompting")
+    parser.add_argument(
+        "--topics-file",
+        help="Research every topic in this file (one per line, '-' reads stdin) as a batch"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help=f"Topics researched at the same time in batch mode (default {settings.BATCH_MAX_WORKERS}) "
+             f"or service mode (default {settings.SERVICE_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--process", choices=["sequential", "dag"], default=None,
+        help=f"Task scheduling for each crew (default {settings.CREW_PROCESS})"
+    )
+    parser.add_argument(
+        "--resume", nargs="?", const="latest", metavar="RUN_DIR",
+        help=f"Resume an interrupted run from its checkpoint directory (default: the latest "
+             f"unfinished run in {settings.RUNS_DIR})"
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="Run as a long-lived research service that accepts jobs over a local HTTP API"
+    )
+    parser.add_argument("--host", default=None, help=f"Service address (default {settings.SERVICE_HOST})")
+    parser.add_argument("--port", type=int, default=None, help=f"Service port (default {settings.SERVICE_PORT})")
+    return parser.parse_args(argv)
+
+def run_batch_mode(args):
+    """Research every topic from --topics-file concurrently and print the manifest summary"""
+    from crew.batch_runner import BatchRunner, read_topics
+
+    topics = read_topics(args.topics_file)
+    if not topics:
+        print("Error: No topics found in the topics file")
+        sys.exit(1)
+
+    print(f"\nResearching {len(topics)} topics with up to "
+          f"{args.workers or settings.BATCH_MAX_WORKERS} running at once...")
+
+    runner = BatchRunner(topics, max_workers=args.workers, process=args.process)
+    manifest = runner.run()
+
+    print("\n" + "="*80)
+    print(f"BATCH RESULTS: {manifest['succeeded']} succeeded, {manifest['failed']} failed "
+          f"in {manifest['duration_seconds']}s")
+    for result in manifest["results"]:
+        outcome = result["report_path"] if result["status"] == "success" else f"error: {result['error']}"
+        print(f"  - {result['topic']}: {outcome}")
+    print(f"\n Manifest saved to: {os.path.join(runner.output_dir, 'manifest.json')}")
+    print("="*80)
+
+    if manifest["failed"]:
+        sys.exit(1)
+
+def make_token_printer():
+    """Print report tokens as they arrive, with a header before the first one"""
+    started = False
+
+    def print_token(token):
+        nonlocal started
+        if not started:
+            started = True
+            print("\n" + "="*80)
+            print("RESEARCH REPORT (streaming):\n")
+        print(token, end="", flush=True)
+
+    return print_token
+
 def display_results(result):
     """Display research results"""
     print("\n" + "="*80)
     print(f"RESEARCH RESULTS:\n {result}")
     print("\n" + "="*80)
 
+def display_timings(timings):
+    """Print wall time per stage and the HTTP, LLM and context totals of a run"""
+    if not timings:
+        return
+    print("\n Timings:")
+    for name, stage in timings["stages"].items():
+        print(f"   {name:<40} n={stage['count']:<4} total={stage['total_seconds']:>8.2f}s "
+              f"avg={stage['avg_seconds']:.2f}s p95={stage['p95_seconds']:.2f}s")
+    http, llm = timings["http"], timings["llm"]
+    print(f"   HTTP: {http['requests']} requests, {http['bytes_fetched']} bytes "
+          f"({http['bytes_from_network']} from network), {http['seconds']:.2f}s")
+    print(f"   LLM: {llm['calls']} calls ({llm['cache_hits']} cached), "
+          f"{llm['prompt_tokens']} prompt / {llm['completion_tokens']} completion tokens, "
+          f"{llm['seconds']:.2f}s incl. {llm['queue_wait_seconds']:.2f}s queued")
+    context = timings["context"]
+    if context["compactions"]:
+        print(f"   Context: {context['tokens_before']} -> {context['tokens_after']} estimated tokens "
+              f"over {context['compactions']} tasks ({context['duplicates_removed']} repeated points removed, "
+              f"{context['points_dropped']} dropped for the budget)")
+
+def print_resume_hint(crew):
+    """Tell the user how to continue a run that has a checkpoint"""
+    if crew is not None and crew.checkpoint is not None:
+        print(f"\n Completed tasks were saved. Resume with: python main.py --resume {crew.checkpoint.run_dir}")
+
 def main():
+    args = parse_args()
+    crew = None
+
     try:
+        settings.validate()
         ensure_output_directory()
 
-        topic = get_research_topic()
+        if args.serve:
+            from service.server import serve
+
+            serve(host=args.host, port=args.port, workers=args.workers)
+            return
+
+        if args.topics_file:
+            run_batch_mode(args)
+            return
+
+        if args.resume:
+            from crew.research_crew import ResearchCrew
+
+            crew = ResearchCrew.resume(None if args.resume == "latest" else args.resume)
+            print(f"\nResuming research on '{crew.topic}' from {crew.checkpoint.run_dir}")
+        else:
+            if args.topic:
+                topic = args.topic.strip()
+            else:
+                preload_crew()
+                topic = get_research_topic()
 
-        print(f"\nTopic confirmed: '{topic}'")
-        print(f"Starting research... (this may take several minutes)")
+            print(f"\nTopic confirmed: '{topic}'")
+            print(f"Starting research... (this may take several minutes)")
 
-        crew = ResearchCrew(topic)
-        result = crew.run()
+            from crew.research_crew import ResearchCrew
 
-        display_results(result=result)
+            crew = ResearchCrew(topic, process=args.process)
 
+        on_token = make_token_printer() if settings.REPORT_STREAMING else None
+        result = crew.run(on_token=on_token)
+
+        time_to_first_token = crew.report_stream.time_to_first_token
+        if time_to_first_token is None:
+            display_results(result=result)
+        else:
+            # The report was already printed while it was generated
+            print("\n\n" + "="*80)
+            print(f"\n Time to first report token: {time_to_first_token:.1f}s")
 
         try:
             metrics = crew.get_usage_metrics()
             print("\n Usage Metrics:")
             print(f"   {metrics}")
-        except:
-            pass
+        except Exception as e:
+            print(f"\n Usage metrics unavailable: {e}")
+
+        display_timings(crew.get_timing_metrics())
+
+        from llm.cache import get_llm_cache
+        from llm.rate_limit import rate_limit_stats
+        from tools.http_client import get_http_client
+
+        cache_stats = get_http_client().cache_stats()
+        if cache_stats:
+            print("\n HTTP Cache:")
+            print(f"   hits={cache_stats['hits']} revalidated={cache_stats['revalidated']} "
+                  f"misses={cache_stats['misses']} hit_rate={cache_stats['hit_rate']:.0%}")
+
+        if settings.LLM_CACHE_MODE != "off":
+            llm_stats = get_llm_cache().stats()
+            print("\n LLM Cache:")
+            print(f"   hits={llm_stats['hits']} near_duplicate_hits={llm_stats['semantic_hits']} "
+                  f"misses={llm_stats['misses']} hit_rate={llm_stats['hit_rate']:.0%}")
+
+        for model, limit_stats in rate_limit_stats().items():
+            print(f"\n LLM Rate Limiter ({model}):")
+            print(f"   requests={limit_stats['requests']} rate_limited={limit_stats['rate_limited']} "
+                  f"avg_wait={limit_stats['avg_queue_wait_seconds']}s "
+                  f"p95_wait={limit_stats['p95_queue_wait_seconds']}s "
+                  f"max_wait={limit_stats['max_queue_wait_seconds']}s")
     
-        report_path = os.path.join(settings.OUTPUT_DIR, "research_report.md")
-        if os.path.exists(report_path):
-                print(f"\n Report saved to: {report_path}")
+        if crew.report_path and os.path.exists(crew.report_path):
+                print(f"\n Report saved to: {crew.report_path}")
+
+        if settings.TRACING_ENABLED:
+            trace_paths = crew.export_trace()
+            if trace_paths:
+                print(f" Trace saved to: {', '.join(trace_paths)}")
             
         print("\nResearch completed successfully!\n")
     
     except KeyboardInterrupt:
         print("\n\n Research interrupted by user")
+        print_resume_hint(crew)
         sys.exit(1)
     except Exception as e:
         print(f"\n\n Error: {str(e)}")
         import traceback
         traceback.print_exc()
+        print_resume_hint(crew)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+"""
+Research jobs for the long-running research service.
+
+A JobManager runs submitted topics on a bounded worker pool. Each running
+job checks a set of agents out of a warm AgentPool, so LLM clients, agents
+and tools are built once per worker instead of once per job, and every job
+shares the process-wide HTTP client, caches and local index. Jobs record
+their progress and keep the report tokens as they stream in, so clients can
+poll a job or follow its report while it is written.
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config.settings import settings
+from crew.checkpoint import topic_slug
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while SERVICE_MAX_QUEUED jobs are waiting"""
+
+
+class AgentPool:
+    """
+    Sets of ready-built agents, one per worker. An agent keeps per-run
+    executor state, so a set is used by one job at a time.
+    """
+
+    def __init__(self, size: int, factory: Optional[Callable[[], Dict]] = None):
+        self.size = size
+        self._factory = factory or self._build_agents
+        self._idle: "queue.Queue[Dict]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_agents() -> Dict:
+        from agents.analyst_agent import create_analyst_agent
+        from agents.fact_checker_agent import create_fact_checker_agent
+        from agents.research_agent import create_research_agent
+        from agents.writer_agent import create_writer_agent
+
+        return {
+            'researcher': create_research_agent(),
+            'analyst': create_analyst_agent(),
+            'fact_checker': create_fact_checker_agent(),
+            'writer': create_writer_agent()
+        }
+
+    def warm(self):
+        """Build every agent set now instead of on first use"""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            self._idle.put(self._factory())
+
+    @contextmanager
+    def checkout(self) -> Iterator[Dict]:
+        """Borrow an agent set for the duration of one job"""
+        with self._lock:
+            build = self._idle.empty() and self._created < self.size
+            if build:
+                self._created += 1
+        agents = self._factory() if build else self._idle.get()
+        try:
+            yield agents
+        finally:
+            self._idle.put(agents)
+
+    def stats(self) -> Dict:
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+
+@dataclass
+class Job:
+    """One research request and its progress"""
+
+    topic: str
+    process: str
+    subtopics: List[str] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "queued"
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: float = 0.0
+    total_tasks: int = 0
+    completed_tasks: List[str] = field(default_factory=list)
+    report_path: Optional[str] = None
+    time_to_first_token: Optional[float] = None
+    error: Optional[str] = None
+    token_usage: Dict = field(default_factory=dict)
+    timings: Dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._chunks: List[str] = []
+        self._changed = threading.Condition()
+        self._started = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def start(self):
+        with self._changed:
+            self.status = "running"
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            self._started = time.perf_counter()
+            self._changed.notify_all()
+
+    def add_token(self, token: str):
+        with self._changed:
+            self._chunks.append(token)
+            self._changed.notify_all()
+
+    def task_completed(self, key: str, output):
+        with self._changed:
+            self.completed_tasks.append(key)
+            self._changed.notify_all()
+
+    def finish(self, status: str, report: Optional[str] = None, error: Optional[str] = None):
+        with self._changed:
+            # Reports from a cache or a non-streaming model arrive in one piece
+            if report and not self._chunks:
+                self._chunks.append(report)
+            self.status = status
+            self.error = error
+            self.finished_at = datetime.now().isoformat(timespec="seconds")
+            if self._started is not None:
+                self.duration_seconds = round(time.perf_counter() - self._started, 2)
+            self._changed.notify_all()
+
+    @property
+    def report(self) -> str:
+        with self._changed:
+            return "".join(self._chunks)
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Yield the report from its first token, waiting for new tokens until
+        the job finishes (or nothing arrives for timeout seconds)
+        """
+        position = 0
+        while True:
+            with self._changed:
+                if position == len(self._chunks) and not self.finished:
+                    if not self._changed.wait(timeout) and timeout is not None:
+                        return
+                chunks = self._chunks[position:]
+                done = self.finished
+            position += len(chunks)
+            for chunk in chunks:
+                yield chunk
+            if done and not chunks:
+                return
+
+    def to_dict(self) -> Dict:
+        with self._changed:
+            return {
+                "id": self.id,
+                "topic": self.topic,
+                "process": self.process,
+                "subtopics": list(self.subtopics),
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration_seconds": self.duration_seconds,
+                "progress": {
+                    "completed_tasks": list(self.completed_tasks),
+                    "total_tasks": self.total_tasks,
+                    "report_chars": sum(len(chunk) for chunk in self._chunks),
+                },
+                "report_path": self.report_path,
+                "time_to_first_token": self.time_to_first_token,
+                "error": self.error,
+                "token_usage": self.token_usage,
+                "timings": self.timings,
+            }
+
+
+class JobManager:
+    """
+    Queues research jobs and runs up to max_workers of them at once
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queued: Optional[int] = None,
+                 output_dir: Optional[str] = None, agent_pool: Optional[AgentPool] = None):
+        self.max_workers = max_workers or settings.SERVICE_MAX_WORKERS
+        self.max_queued = max_queued if max_queued is not None else settings.SERVICE_MAX_QUEUED
+        self.output_dir = output_dir or settings.SERVICE_OUTPUT_DIR
+        self.agent_pool = agent_pool or AgentPool(self.max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="research-job")
+        self._jobs: Dict[str, Job] = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Import the crew modules and build every worker's agents ahead of the first job"""
+        import crew.research_crew  # noqa: F401
+
+        self.agent_pool.warm()
+
+    def submit(self, topic: str, process: Optional[str] = None, subtopics=None) -> Job:
+        from crew.research_crew import ResearchCrew
+
+        if topic is not None and not isinstance(topic, str):
+            raise ValueError("The research topic must be a string")
+        topic = (topic or "").strip()
+        if not topic:
+            raise ValueError("A research topic is required")
+        process, subtopics = ResearchCrew.check_options(process, subtopics)
+
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if queued >= self.max_queued:
+                raise QueueFullError(f"{queued} jobs are already waiting; try again later")
+
+            job = Job(topic=topic, process=process, subtopics=subtopics)
+            job.report_path = os.path.join(self.output_dir, f"{job.id}_{topic_slug(topic)}.md")
+            self._jobs[job.id] = job
+            self._futures[job.id] = self._pool.submit(self._run_job, job)
+            self._forget_old_jobs()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet"""
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None or not future.cancel():
+                return False
+            job = self._jobs[job_id]
+        job.finish("cancelled")
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "max_workers": self.max_workers,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "completed": statuses.count("completed"),
+            "failed": statuses.count("failed"),
+            "agents": self.agent_pool.stats(),
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond SERVICE_MAX_FINISHED_JOBS (caller holds the lock)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - settings.SERVICE_MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+
+    def _run_job(self, job: Job):
+        from crew.research_crew import ResearchCrew
+
+        job.start()
+        crew = None
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with self.agent_pool.checkout() as agents:
+                crew = ResearchCrew(
+                    job.topic,
+                    process=job.process,
+                    subtopics=job.subtopics,
+                    output_file=job.report_path,
+                    agents=agents
+                )
+                job.report_path = crew.report_path
+                job.total_tasks = len(crew.tasks)
+                output = crew.run(on_token=job.add_token, on_task_complete=job.task_completed)
+
+            job.time_to_first_token = crew.report_stream.time_to_first_token
+            usage = crew.get_usage_metrics()
+            job.token_usage = usage.model_dump() if usage is not None else {}
+            job.timings = crew.get_timing_metrics()
+            job.finish("completed", report=output.raw)
+
+        except Exception as e:
+            if crew is not None:
+                job.timings = crew.get_timing_metrics()
+            job.report_path = None
+            job.finish("failed", error=str(e))
+
+        finally:
+            with self._lock:
+                self._forget_old_jobs()
+
+        if crew is not None and settings.TRACING_ENABLED:
+            crew.export_trace(os.path.join(self.output_dir, "traces"))
@@ -0,0 +1,197 @@
+"""
+Local HTTP API of the research service (python main.py --serve).
+
+    POST   /jobs                 {"topic": ..., "process": "dag", "subtopics": [...]}
+    GET    /jobs                 every known job and its status
+    GET    /jobs/<id>            status and progress of one job
+    GET    /jobs/<id>/report     the finished report (Markdown)
+    GET    /jobs/<id>/stream     the report as plain text, streamed while it is written
+    DELETE /jobs/<id>            cancel a job that has not started
+    GET    /health               worker, queue and cache statistics
+
+Requests are served on their own threads, so a client following a report
+stream does not hold up status polling or new submissions.
+"""
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+from config.settings import settings
+from service.jobs import JobManager, QueueFullError
+
+
+class ResearchRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ResearchService/1.0"
+
+    @property
+    def jobs(self) -> JobManager:
+        return self.server.jobs
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {"status": "error", "message": message})
+
+    def _route(self):
+        """Split the path into (job id, action); both None for /jobs"""
+        parts = [part for part in urlsplit(self.path).path.split("/") if part]
+        if not parts or parts[0] != "jobs" or len(parts) > 3:
+            return None
+        job_id = parts[1] if len(parts) > 1 else None
+        action = parts[2] if len(parts) > 2 else None
+        return job_id, action
+
+    def _job_or_404(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if job is None:
+            self._send_error(404, f"Unknown job '{job_id}'")
+        return job
+
+    def do_GET(self):
+        if urlsplit(self.path).path.rstrip("/") == "/health":
+            from tools.http_client import get_http_client
+
+            self._send_json(200, {
+                "status": "ok",
+                "jobs": self.jobs.stats(),
+                "http_cache": get_http_client().cache_stats(),
+            })
+            return
+
+        route = self._route()
+        if route is None:
+            self._send_error(404, "Not found")
+            return
+        job_id, action = route
+
+        if job_id is None:
+            self._send_json(200, {"jobs": [job.to_dict() for job in self.jobs.jobs()]})
+            return
+
+        job = self._job_or_404(job_id)
+        if job is None:
+            return
+
+        if action is None:
+            self._send_json(200, job.to_dict())
+        elif action == "report":
+            if job.status != "completed":
+                self._send_error(409, f"Job '{job_id}' is {job.status}; the report is not ready")
+                return
+            body = job.report.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/markdown; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif action == "stream":
+            self._stream_report(job)
+        else:
+            self._send_error(404, f"Unknown action '{action}'")
+
+    def _stream_report(self, job):
+        # No Content-Length: the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for chunk in job.stream(timeout=settings.SERVICE_STREAM_IDLE_TIMEOUT):
+                self.wfile.write(chunk.encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading; the job carries on
+            pass
+        self.close_connection = True
+
+    def do_POST(self):
+        if self._route() != (None, None):
+            self._send_error(404, "Not found")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Expected a JSON object")
+            job = self.jobs.submit(
+                payload.get("topic"),
+                process=payload.get("process"),
+                subtopics=payload.get("subtopics"),
+            )
+        except QueueFullError as e:
+            self._send_error(503, str(e))
+            return
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+
+        self._send_json(202, {
+            **job.to_dict(),
+            "links": {
+                "status": f"/jobs/{job.id}",
+                "report": f"/jobs/{job.id}/report",
+                "stream": f"/jobs/{job.id}/stream",
+            },
+        })
+
+    def do_DELETE(self):
+        route = self._route()
+        if route is None or route[0] is None or route[1] is not None:
+            self._send_error(404, "Not found")
+            return
+
+        job = self._job_or_404(route[0])
+        if job is None:
+            return
+        if not self.jobs.cancel(job.id):
+            self._send_error(409, f"Job '{job.id}' is {job.status} and can no longer be cancelled")
+            return
+        self._send_json(200, job.to_dict())
+
+
+class ResearchServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, jobs: JobManager, verbose: bool = False):
+        super().__init__(address, ResearchRequestHandler)
+        self.jobs = jobs
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None,
+          warm: bool = True, verbose: bool = True):
+    """Run the research service until interrupted"""
+    settings.validate()
+    jobs = JobManager(max_workers=workers)
+    if warm:
+        print("Warming up agents...")
+        jobs.warm()
+
+    server = ResearchServer((host or settings.SERVICE_HOST, port or settings.SERVICE_PORT), jobs, verbose=verbose)
+    print(f"Research service listening on {server.base_url} with {jobs.max_workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down research service")
+    finally:
+        server.server_close()
+        jobs.shutdown(wait=False)
@@ -1,15 +1,18 @@
-from crewai import Task
+from telemetry.instrumentation import TracedTask
 
 def create_analysis_task(agent, research_task):
     """
-    Creates an analysis task for examining research findings
+    Creates an analysis task for examining research findings.
+    research_task may be a single task or a list of research tasks.
     """
+    research_tasks = research_task if isinstance(research_task, list) else [research_task]
 
-    return Task(
+    return TracedTask(
         description=(
             "Analyze the research findings provided by the Research Agent.\n\n"
             "Your responsibilities:\n"
-            "1. Use the Content Analysis Tool to examine all gathered sources\n"
+            "1. Use the Content Analysis Tool to examine all gathered sources (scraped sources can be "
+            "passed by URL, with the research topic as 'topic' to analyze their most relevant passages)\n"
             "2. Identify common themes and patterns across sources\n"
             "3. Extract key insights and main arguments\n"
             "4. Detect any contradictions or inconsistencies between sources\n"
@@ -35,5 +38,6 @@ def create_analysis_task(agent, research_task):
             "- Confidence score for the overall research quality"
         ),
         agent=agent,
-        context=[research_task]
+        name="analysis",
+        context=research_tasks
         )
\ No newline at end of file
@@ -1,15 +1,27 @@
-from crewai import Task
+from telemetry.instrumentation import TracedTask
 
-def create_fact_check_task(agent, analysis_task):
+def create_fact_check_task(agent, analysis_task=None, research_tasks=None):
     """
-    Creates a fact-checking task for verifying claims
+    Creates a fact-checking task for verifying claims.
+    Claims come from the analysis, or straight from the research tasks when
+    research_tasks is given so fact-checking can run alongside the analysis.
     """
-    return Task(
+    if research_tasks:
+        claims_from = "the research findings"
+        context = list(research_tasks)
+    else:
+        claims_from = "the analysis"
+        context = [analysis_task]
+
+    return TracedTask(
         description=(
-            "Verify the accuracy of key claims and statements from the analysis.\n\n"
+            f"Verify the accuracy of key claims and statements from {claims_from}.\n\n"
             "Your responsibilities:\n"
-            "1. Extract major claims and assertions from the analysis\n"
-            "2. Use the Fact Verification Tool to cross-check each claim against sources\n"
+            f"1. Extract major claims and assertions from {claims_from}\n"
+            "2. Use the Fact Verification Tool to cross-check each claim against sources "
+            "(scraped sources can be passed by URL; the passages of each page most relevant to the claims are used), and the "
+            "Passage Search Tool to find the evidence for a specific claim; the Knowledge Base Tool shows how "
+            "earlier runs verified similar claims\n"
             "3. Identify any unverified or potentially misleading statements\n"
             "4. Flag contradictions that need resolution\n"
             "5. Assess the overall credibility of the findings\n"
@@ -34,5 +46,6 @@ def create_fact_check_task(agent, analysis_task):
             "- Green-light status (yes/no) for proceeding to final report"
         ),
         agent=agent,
-        context=[analysis_task]
+        name="fact_check",
+        context=context
     )
\ No newline at end of file
@@ -1,18 +1,40 @@
-from crewai import Task
+from telemetry.instrumentation import TracedTask
 
 
-def create_research_task(agent, topic: str):
+def create_research_task(agent, topic: str, subtopic: str = None, prior_findings: str = None):
     """
     Create a research task for gathering information on a topic.
+    With a subtopic, the research is narrowed to that aspect of the topic.
+    prior_findings lists related findings of earlier runs (one per line).
     """
 
-    return Task(
+    if subtopic:
+        focus = f"the '{subtopic}' aspect of the following topic: '{topic}'"
+    else:
+        focus = f"the following topic: '{topic}'"
+
+    if prior_findings:
+        prior = (
+            "Earlier research runs already found the following. Reuse what is relevant, cite these "
+            "URLs without scraping them again unless you need more detail, and spend your searches on "
+            "what they do not cover (the Knowledge Base Tool searches all earlier findings):\n"
+            f"{prior_findings}\n\n"
+        )
+    else:
+        prior = ""
+
+    return TracedTask(
         description=(
-            f"Conduct comprehensive research on the following topic: '{topic}'\n\n"
+            f"Conduct comprehensive research on {focus}\n\n"
+            f"{prior}"
             "Your responsibilities:\n"
-            "1. Use the Web Search Tool to find relevant and credible sources\n"
+            "1. Use the Multi-Query Search Tool with 3-5 query variants covering different angles "
+            "of the topic to find relevant and credible sources in one step\n"
             "2. Identify at least 5-7 high-quality sources covering different aspects of the topic\n"
-            "3. Use the Web Scraper Tool to extract detailed content from each source\n"
+            "3. Use the Batch Web Scraper Tool to extract detailed content from all sources at once "
+            "(fall back to the Web Scraper Tool for a single URL), passing the topic as the query "
+            "so long pages return their most relevant passages; use the Passage Search Tool to find "
+            "specific facts in everything scraped so far\n"
             "4. Evaluate the credibility and relevance of each source\n"
             "5. Organize the gathered information systematically\n"
             "6. Note the URL, title, and key points from each source\n\n"
@@ -30,5 +52,8 @@ def create_research_task(agent, topic: str):
             "- Brief overview of different perspectives found\n"
             "- Total word count and number of sources analyzed"
             ),
-        agent=agent
+        agent=agent,
+        name=f"research: {subtopic}" if subtopic else "research",
+        # Research needs no earlier output, so sub-topic tasks can run side by side
+        context=[]
         )
\ No newline at end of file
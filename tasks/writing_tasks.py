@@ -1,10 +1,22 @@
-from crewai import Task
+import os
 
-def create_writing_task(agent, topic: str, research_task, analysis_task, fact_check_task):
+from config.settings import settings
+from telemetry.instrumentation import TracedTask
+
+
+def default_report_path(topic: str) -> str:
+    """Where the report on topic is written when no output file is given"""
+    return os.path.join(settings.OUTPUT_DIR, f"{topic}_research_report.md")
+
+
+def create_writing_task(agent, topic: str, research_task, analysis_task, fact_check_task, output_file: str = None):
     """
-    Creates a writing task for producing the final report
+    Creates a writing task for producing the final report.
+    research_task may be a single task or a list of research tasks.
     """
-    return Task(
+    research_tasks = research_task if isinstance(research_task, list) else [research_task]
+
+    return TracedTask(
         description=(
             f"Create a comprehensive, well-structured research report on: '{topic}'\n\n"
             "Your responsibilities:\n"
@@ -42,6 +54,7 @@ def create_writing_task(agent, topic: str, research_task, analysis_task, fact_ch
             "- Professional formatting and readability"
         ),
         agent=agent,
-        context=[research_task, analysis_task, fact_check_task],
-        output_file=f"outputs/{topic}_research_report.md"
+        name="writing",
+        context=[*research_tasks, analysis_task, fact_check_task],
+        output_file=output_file or default_report_path(topic)
     )
\ No newline at end of file
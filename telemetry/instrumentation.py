@@ -0,0 +1,41 @@
+"""
+Span instrumentation for the crewai building blocks of a research run:
+tasks and tools.
+"""
+
+import functools
+
+from crewai import Task
+
+from telemetry.tracing import get_tracer
+
+
+class TracedTask(Task):
+    """
+    Task whose execution is recorded as a "task <name>" span. Tool and LLM
+    spans made while it runs become its children.
+    """
+
+    def _execute_core(self, agent, context, tools):
+        agent = agent or self.agent
+        with get_tracer().span(
+            f"task {self.name or 'unnamed'}",
+            **{"task.id": str(self.id), "agent.role": getattr(agent, "role", None)}
+        ) as span:
+            output = super()._execute_core(agent, context, tools)
+            span.set_attribute("task.output_chars", len(output.raw or ""))
+            return output
+
+
+def trace_tool(run):
+    """Decorator for a tool's _run: records the call as a "tool <name>" span"""
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        with get_tracer().span(f"tool {self.name}", **{"tool.name": self.name}) as span:
+            result = run(self, *args, **kwargs)
+            if isinstance(result, str):
+                span.set_attribute("tool.output_chars", len(result))
+            return result
+
+    return wrapper
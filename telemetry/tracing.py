@@ -0,0 +1,272 @@
+"""
+Lightweight span tracing for research runs.
+
+Spans are nested through a context variable, so a tool call made while a
+task runs becomes a child of the task span, and an HTTP request made by the
+tool a child of the tool span. Finished spans are kept in memory by the
+process-wide Tracer and exported as JSON (with per-stage timing summaries)
+or as OpenTelemetry OTLP/JSON that any OTLP-compatible viewer can load.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.settings import settings
+
+SERVICE_NAME = "ai-research-assistant"
+
+# OTLP SpanKind values
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed operation and its attributes"""
+
+    name: str
+    kind: str = "internal"
+    trace_id: str = field(default_factory=lambda: os.urandom(16).hex())
+    span_id: str = field(default_factory=lambda: os.urandom(8).hex())
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_seconds(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_seconds": round(self.duration_seconds, 6),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": dict(self.attributes),
+        }
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span in this context, if any"""
+    return _current_span.get()
+
+
+def set_span_attributes(**attributes):
+    """Set attributes on the current span; does nothing outside a span"""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+class Tracer:
+    """
+    Records finished spans for the process
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_spans: Optional[int] = None):
+        self.enabled = settings.TRACING_ENABLED if enabled is None else enabled
+        self._spans = deque(maxlen=max_spans or settings.TRACE_MAX_SPANS)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current span"""
+        parent = _current_span.get()
+        span = Span(name=name, kind=kind, attributes=attributes)
+        if parent is not None:
+            span.trace_id = parent.trace_id
+            span.parent_id = parent.span_id
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if self.enabled:
+                with self._lock:
+                    self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        """Finished spans, optionally only those of one trace"""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self, trace_id: Optional[str] = None) -> Dict:
+        """Timing per span name plus HTTP and LLM totals"""
+        return summarize(self.spans(trace_id))
+
+    def export_json(self, path: str, trace_id: Optional[str] = None, metrics: Optional[Dict] = None):
+        """Write the spans, their summary and any extra metrics as JSON"""
+        spans = self.spans(trace_id)
+        _write_json(path, {
+            "service": SERVICE_NAME,
+            "trace_ids": list(dict.fromkeys(s.trace_id for s in spans)),
+            "summary": summarize(spans),
+            "metrics": metrics or {},
+            "spans": [s.to_dict() for s in spans],
+        })
+
+    def export_otlp(self, path: str, trace_id: Optional[str] = None):
+        """Write the spans in the OpenTelemetry OTLP/JSON trace format"""
+        _write_json(path, to_otlp(self.spans(trace_id)))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))] if values else 0.0
+
+
+def summarize(spans: List[Span]) -> Dict:
+    """
+    Aggregate spans by name, and total the HTTP bytes, LLM usage and
+    context compaction savings they recorded
+    """
+    by_name: Dict[str, List[Span]] = {}
+    for span in spans:
+        by_name.setdefault(span.name, []).append(span)
+
+    stages = {}
+    for name, group in sorted(by_name.items()):
+        durations = [s.duration_seconds for s in group]
+        stages[name] = {
+            "count": len(group),
+            "errors": sum(1 for s in group if s.error),
+            "total_seconds": round(sum(durations), 3),
+            "avg_seconds": round(sum(durations) / len(durations), 3),
+            "p95_seconds": round(_percentile(durations, 0.95), 3),
+            "max_seconds": round(max(durations), 3),
+        }
+
+    http = [s for s in spans if s.name.startswith("http ")]
+    llm = [s for s in spans if s.name == "llm.call"]
+    compactions = [s for s in spans if s.name == "context.compact"]
+
+    def total(group, key):
+        return sum(s.attributes.get(key, 0) or 0 for s in group)
+
+    def count(group, key, value):
+        return sum(1 for s in group if s.attributes.get(key) == value)
+
+    return {
+        "stages": stages,
+        "http": {
+            "requests": len(http),
+            "bytes_fetched": total(http, "http.response_bytes"),
+            "bytes_from_network": sum(
+                s.attributes.get("http.response_bytes", 0) for s in http
+                if s.attributes.get("http.cache") not in ("hit", "revalidated")
+            ),
+            "cache_hits": count(http, "http.cache", "hit"),
+            "seconds": round(sum(s.duration_seconds for s in http), 3),
+        },
+        "llm": {
+            "calls": len(llm),
+            "cache_hits": count(llm, "llm.cache", "hit") + count(llm, "llm.cache", "near_duplicate_hit"),
+            "prompt_tokens": total(llm, "llm.prompt_tokens"),
+            "completion_tokens": total(llm, "llm.completion_tokens"),
+            "queue_wait_seconds": round(total(llm, "llm.queue_wait_seconds"), 3),
+            "seconds": round(sum(s.duration_seconds for s in llm), 3),
+        },
+        "context": {
+            "compactions": len(compactions),
+            "tokens_before": total(compactions, "context.tokens_before"),
+            "tokens_after": total(compactions, "context.tokens_after"),
+            "duplicates_removed": total(compactions, "context.duplicates_removed"),
+            "points_dropped": total(compactions, "context.points_dropped"),
+        },
+    }
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def to_otlp(spans: List[Span]) -> Dict:
+    """OTLP/JSON ExportTraceServiceRequest for the spans"""
+    otlp_spans = []
+    for span in spans:
+        item = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": _OTLP_KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        otlp_spans.append(item)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": otlp_spans}],
+        }]
+    }
+
+
+def _write_json(path: str, payload: Dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, creating it on first use"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+    return _tracer
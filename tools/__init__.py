@@ -1,15 +1,42 @@
 """
 Custom tools for the AI Research Assistant Crew
+
+The tool classes are imported on first access, so importing a helper module
+such as tools.http_client does not load crewai and the HTML parsers.
 """
 
-from .web_search_tool import WebSearchTool
-from .web_scraper_tool import WebScraperTool
-from .analysis_tool import AnalysisTool
-from .fact_check_tool import FactCheckTool
+import importlib
+
+_TOOL_MODULES = {
+    'WebSearchTool': '.web_search_tool',
+    'MultiQuerySearchTool': '.web_search_tool',
+    'WebScraperTool': '.web_scraper_tool',
+    'BatchWebScraperTool': '.web_scraper_tool',
+    'AnalysisTool': '.analysis_tool',
+    'FactCheckTool': '.fact_check_tool',
+    'PassageSearchTool': '.passage_search_tool',
+    'KnowledgeSearchTool': '.knowledge_search_tool',
+}
 
 __all__ = [
     'WebSearchTool',
+    'MultiQuerySearchTool',
     'WebScraperTool',
+    'BatchWebScraperTool',
     'AnalysisTool',
-    'FactCheckTool'
-]
\ No newline at end of file
+    'FactCheckTool',
+    'PassageSearchTool',
+    'KnowledgeSearchTool'
+]
+
+
+def __getattr__(name):
+    if name not in _TOOL_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_TOOL_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
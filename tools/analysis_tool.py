@@ -1,16 +1,24 @@
 from crewai.tools import BaseTool
 import json
+from collections import Counter
 from typing import List, Dict
-import re
+from config.settings import settings
+from tools.contradictions import detect_contradictions, source_terms
+from tools.dedup import DedupResult, deduplicate_sources
+from tools.passage_store import with_stored_text
+from tools.text_processing import token_counts, top_keywords
+from telemetry.instrumentation import trace_tool
 
 class AnalysisTool(BaseTool):
     name: str = "Content Analysis Tool"
     description: str = (
         "Analyzes research content to extract key insights, identify patterns, "
         "and detect contradictions. Input should be JSON string containing "
-        "multiple source contents to compare."
+        "multiple source contents to compare. Scraped sources can be given by 'url' alone; "
+        "add a 'topic' field to analyze the passages of each page most relevant to it."
     )
     
+    @trace_tool
     def _run(self, content: str) -> str:
         """
         Analyze research content for insights and contradictions
@@ -34,46 +42,52 @@ class AnalysisTool(BaseTool):
                     "message": "No sources provided for analysis"
                 })
             
+            # Scraped pages are read from the passage store: the passages most
+            # relevant to the topic, from anywhere in the page
+            sources, from_store = with_stored_text(sources, query=data.get("topic"))
+            
+            # Syndicated copies and mirrors would otherwise count once per URL
+            received = len(sources)
+            dedup = deduplicate_sources(sources) if settings.SOURCE_DEDUP_ENABLED else DedupResult(sources)
+            sources = dedup.sources
+            
             # Extract key statistics
             total_word_count = 0
-            all_keywords = []
+            keyword_freq = Counter()
+            term_sets = []
             source_summaries = []
             
             for idx, source in enumerate(sources):
                 text = source.get("content", "")
-                words = text.split()
-                total_word_count += len(words)
+                word_count = len(text.split())
+                total_word_count += word_count
                 
-                # Extract potential keywords (simplified)
-                # Look for capitalized words and repeated terms
-                keywords = self._extract_keywords(text)
-                all_keywords.extend(keywords)
+                # Tokenize once; keywords and contradiction terms share the counts
+                tokens = token_counts(text)
+                keywords = top_keywords(tokens)
+                keyword_freq.update(keywords)
+                term_sets.append(source_terms(tokens))
                 
                 source_summaries.append({
                     "source_id": idx,
                     "url": source.get("url", "Unknown"),
-                    "word_count": len(words),
+                    "word_count": word_count,
                     "key_topics": keywords[:5]
                 })
             
             # Find common themes
-            keyword_freq = {}
-            for kw in all_keywords:
-                keyword_freq[kw] = keyword_freq.get(kw, 0) + 1
-            
-            common_themes = sorted(
-                keyword_freq.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:10]
+            common_themes = keyword_freq.most_common(10)
             
             # Detect potential contradictions (simplified heuristic)
-            contradictions = self._detect_contradictions(sources)
+            contradictions = self._detect_contradictions(sources, term_sets)
             
             result = {
                 "status": "success",
                 "analysis": {
                     "total_sources": len(sources),
+                    "sources_received": received,
+                    "sources_from_passage_store": from_store,
+                    "duplicates_merged": dedup.merged,
                     "total_word_count": total_word_count,
                     "common_themes": [{"theme": t[0], "frequency": t[1]} for t in common_themes],
                     "source_summaries": source_summaries,
@@ -92,51 +106,11 @@ class AnalysisTool(BaseTool):
     
     def _extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
         """Extract potential keywords from text"""
-        # Remove common words and extract meaningful terms
-        common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                       'of', 'with', 'is', 'was', 'are', 'were', 'been', 'be', 'have', 'has',
-                       'that', 'this', 'it', 'from', 'by', 'as'}
-        
-        words = re.findall(r'\b[A-Z][a-z]+\b|\b[a-z]{4,}\b', text)
-        keywords = [w.lower() for w in words if w.lower() not in common_words]
-        
-        # Count frequency
-        freq = {}
-        for kw in keywords:
-            freq[kw] = freq.get(kw, 0) + 1
-        
-        return [k for k, v in sorted(freq.items(), key=lambda x: x[1], reverse=True)[:top_n]]
+        return top_keywords(token_counts(text), top_n)
     
-    def _detect_contradictions(self, sources: List[Dict]) -> List[Dict]:
-        """Detect potential contradictions between sources"""
-        contradictions = []
-        
-        # Simple heuristic: look for opposing terms
-        opposing_pairs = [
-            ('increase', 'decrease'),
-            ('rise', 'fall'),
-            ('growth', 'decline'),
-            ('positive', 'negative'),
-            ('improve', 'worsen'),
-            ('success', 'failure'),
-            ('gain', 'loss')
-        ]
-        
-        for i, source1 in enumerate(sources):
-            text1 = source1.get("content", "").lower()
-            for j, source2 in enumerate(sources[i+1:], start=i+1):
-                text2 = source2.get("content", "").lower()
-                
-                for term1, term2 in opposing_pairs:
-                    if term1 in text1 and term2 in text2:
-                        contradictions.append({
-                            "source_1": source1.get("url", f"Source {i}"),
-                            "source_2": source2.get("url", f"Source {j}"),
-                            "type": f"Opposing terms: {term1} vs {term2}",
-                            "severity": "medium"
-                        })
-        
-        return contradictions[:5]  # Limit to top 5
+    def _detect_contradictions(self, sources: List[Dict], term_sets: List[set] = None) -> List[Dict]:
+        """Detect potential contradictions between sources, strongest first"""
+        return detect_contradictions(sources, term_sets)
     
     def _generate_recommendation(self, sources: List[Dict], contradictions: List[Dict]) -> str:
         """Generate analysis recommendation"""
@@ -0,0 +1,121 @@
+"""
+Contradiction detection between sources for AnalysisTool.
+
+Each source is reduced once to its set of distinct lowercase tokens, the
+opposition lexicon becomes two boolean matrices (sources x term pairs), and
+all source pairs are scored together with a matrix product.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from tools.text_processing import token_counts
+
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def normalize_term(word: str) -> str:
+    """
+    Crude suffix stripping so inflections of a lexicon term match it:
+    increase / increases / increased / increasing -> "increas"
+    """
+    word = word.lower()
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith("ss"):
+                break
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=1024)
+def term_forms(term: str) -> FrozenSet[str]:
+    """
+    Every word that normalize_term maps to the same stem as term, so a
+    source is checked with a few set lookups instead of normalizing all of
+    its tokens
+    """
+    stem = normalize_term(term)
+    candidates = {
+        base + suffix
+        for base in (stem, stem + "e")
+        for suffix in ("",) + _SUFFIXES
+    }
+    return frozenset(word for word in candidates if normalize_term(word) == stem)
+
+
+def source_terms(tokens: Iterable[str]) -> set:
+    """Distinct lowercase tokens of a tokenized source (tokens or token counts)"""
+    return {token.lower() for token in tokens}
+
+
+def detect_contradictions(
+    sources: List[Dict],
+    term_sets: Optional[List[set]] = None,
+    opposing_terms: Optional[Sequence[Tuple[str, str]]] = None,
+    max_results: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Find source pairs where one source uses only one side of an opposing
+    term pair and the other source uses only the other side.
+
+    Strength is the number of such opposing pairs between two sources;
+    results are ranked by strength. Sources that use both sides of a pair
+    are treated as neutral on it.
+    """
+    import numpy as np
+
+    opposing_terms = opposing_terms or settings.CONTRADICTION_OPPOSING_TERMS
+    max_results = max_results or settings.CONTRADICTION_MAX_RESULTS
+
+    if len(sources) < 2 or not opposing_terms:
+        return []
+
+    if term_sets is None:
+        term_sets = [source_terms(token_counts(source.get("content", ""))) for source in sources]
+
+    first = [term_forms(a) for a, _ in opposing_terms]
+    second = [term_forms(b) for _, b in opposing_terms]
+
+    # has_first[i, k]: source i mentions the first term of pair k
+    has_first = np.array([[not forms.isdisjoint(terms) for forms in first] for terms in term_sets], dtype=bool)
+    has_second = np.array([[not forms.isdisjoint(terms) for forms in second] for terms in term_sets], dtype=bool)
+
+    only_first = (has_first & ~has_second).astype(np.int32)
+    only_second = (has_second & ~has_first).astype(np.int32)
+
+    # strength[i, j]: opposing pairs where i and j take opposite sides
+    cross = only_first @ only_second.T
+    strength = cross + cross.T
+
+    rows, cols = np.triu_indices(len(sources), k=1)
+    pair_strength = strength[rows, cols]
+    candidates = np.nonzero(pair_strength)[0]
+    if candidates.size == 0:
+        return []
+
+    # Strongest first; ties keep source order
+    ranked = candidates[np.argsort(-pair_strength[candidates], kind="stable")][:max_results]
+
+    contradictions = []
+    for idx in ranked:
+        i, j = int(rows[idx]), int(cols[idx])
+        opposed = np.nonzero(
+            (only_first[i] & only_second[j]) | (only_second[i] & only_first[j])
+        )[0]
+        pairs = [f"{opposing_terms[k][0]} vs {opposing_terms[k][1]}" for k in opposed]
+        score = int(pair_strength[idx])
+
+        contradictions.append({
+            "source_1": sources[i].get("url", f"Source {i}"),
+            "source_2": sources[j].get("url", f"Source {j}"),
+            "type": f"Opposing terms: {', '.join(pairs)}",
+            "strength": score,
+            "severity": "high" if score >= 3 else "medium" if score == 2 else "low"
+        })
+
+    return contradictions
@@ -0,0 +1,187 @@
+"""
+Duplicate and near-duplicate detection for scraped sources.
+
+Sources are grouped first by canonical URL (url_utils.normalize_url), then
+by content: every text gets a 64-bit SimHash of its word shingles, and the
+fingerprint is cut into max_distance + 1 bands. Two fingerprints within
+max_distance bits of each other agree on at least one whole band, so only
+sources sharing a band value are compared; the cost grows about linearly
+with the number of sources instead of with every pair of them.
+
+Each group keeps the source with the most content, which lists the URLs
+merged into it.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from tools.text_processing import tokenize
+from tools.url_utils import normalize_url
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+
+@lru_cache(maxsize=100_000)
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix(values):
+    """splitmix64 finalizer: spreads every input bit over the whole hash"""
+    import numpy as np
+
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def simhash(words: List[str], min_words: int = 0) -> Optional[int]:
+    """
+    64-bit SimHash of the distinct shingles of a list of (lowercased) words,
+    or None when there are fewer than min_words words
+    """
+    import numpy as np
+
+    if len(words) < max(min_words, 1):
+        return None
+
+    # Each distinct word is hashed once; shingle hashes are combined from
+    # the word hashes with vectorized (wrapping) uint64 arithmetic
+    hashes = np.fromiter((_word_hash(word) for word in words), dtype=np.uint64, count=len(words))
+    size = min(SHINGLE_SIZE, len(words))
+    shingles = np.zeros(len(words) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        shingles = _mix(shingles ^ hashes[offset:len(hashes) - size + 1 + offset])
+    shingles = np.unique(shingles)
+
+    # A bit is set when more than half of the shingle hashes have it set
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if 2 * int(((shingles >> np.uint64(bit)) & np.uint64(1)).sum()) > len(shingles):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+@dataclass
+class DedupResult:
+    """Unique sources, and which URLs were merged into which"""
+
+    sources: List[Dict]
+    merged: List[Dict] = field(default_factory=list)
+
+    @property
+    def removed(self) -> int:
+        return sum(len(group["merged_urls"]) for group in self.merged)
+
+
+class _Groups:
+    """Union-find over source positions"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.reasons: Dict[int, set] = {}
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int, reason: str):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return
+        # The earliest source stays the root, so groups keep input order
+        first, second = sorted((root_i, root_j))
+        self.parent[second] = first
+        self.reasons[first] = self.reasons.get(first, set()) | self.reasons.pop(second, set()) | {reason}
+
+
+def deduplicate_sources(sources: List[Dict], max_distance: Optional[int] = None,
+                        min_words: Optional[int] = None) -> DedupResult:
+    """
+    Collapse sources with the same canonical URL, or whose content SimHash
+    differs in at most max_distance bits. Contents shorter than min_words
+    words only merge by URL or identical text.
+    """
+    max_distance = settings.SOURCE_DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+    min_words = settings.SOURCE_DEDUP_MIN_WORDS if min_words is None else min_words
+    groups = _Groups(len(sources))
+
+    by_url: Dict[str, int] = {}
+    by_text: Dict[str, int] = {}
+    words: Dict[int, List[str]] = {}
+    for i, source in enumerate(sources):
+        url = normalize_url(source.get("url") or "")
+        if url:
+            if url in by_url:
+                groups.union(by_url[url], i, "same_url")
+            else:
+                by_url[url] = i
+
+        tokens = tokenize(source.get("content") or "", lower=True)
+        if tokens:
+            text_key = hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=16).digest()
+            if text_key in by_text:
+                groups.union(by_text[text_key], i, "identical_content")
+            else:
+                by_text[text_key] = i
+                words[i] = tokens
+
+    if max_distance >= 0:
+        _merge_near_duplicates(words, groups, max_distance, min_words)
+
+    members: Dict[int, List[int]] = {}
+    for i in range(len(sources)):
+        members.setdefault(groups.find(i), []).append(i)
+
+    unique, merged = [], []
+    for root in sorted(members):
+        positions = members[root]
+        keep = max(positions, key=lambda i: (len(sources[i].get("content") or ""), -i))
+        source = dict(sources[keep])
+        duplicates = [sources[i].get("url") for i in positions if i != keep]
+        if duplicates:
+            source["merged_urls"] = duplicates
+            merged.append({
+                "url": source.get("url"),
+                "merged_urls": duplicates,
+                "reasons": sorted(groups.reasons.get(root, ())),
+            })
+        unique.append(source)
+
+    return DedupResult(sources=unique, merged=merged)
+
+
+def _merge_near_duplicates(words: Dict[int, List[str]], groups: _Groups, max_distance: int, min_words: int):
+    """Union sources whose fingerprints are within max_distance bits, via LSH banding"""
+    fingerprints = {}
+    for i, tokens in words.items():
+        fingerprint = simhash(tokens, min_words=min_words)
+        if fingerprint is not None:
+            fingerprints[i] = fingerprint
+
+    bands = max_distance + 1
+    band_bits = FINGERPRINT_BITS // bands
+    mask = (1 << band_bits) - 1
+    buckets: Dict[tuple, List[int]] = {}
+
+    for i, fingerprint in fingerprints.items():
+        for band in range(bands):
+            # The last band takes the bits left over by the integer division
+            shift = band * band_bits
+            value = fingerprint >> shift if band == bands - 1 else (fingerprint >> shift) & mask
+            bucket = buckets.setdefault((band, value), [])
+            for j in bucket:
+                if groups.find(i) != groups.find(j) and \
+                        hamming_distance(fingerprint, fingerprints[j]) <= max_distance:
+                    groups.union(j, i, "near_duplicate")
+            bucket.append(i)
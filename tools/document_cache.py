@@ -0,0 +1,134 @@
+"""
+Cache of extracted page documents keyed by the hash of the response body.
+
+Repeat scrapes of the same page (common within a single ReAct loop) skip
+HTML parsing entirely: an in-memory LRU answers most lookups and an optional
+on-disk tier keeps extracted documents across runs.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from config.settings import settings
+
+
+class DocumentCache:
+    """
+    Two-tier (memory LRU + optional disk) cache of extracted documents
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries or settings.DOCUMENT_CACHE_SIZE
+        self.cache_dir = cache_dir
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def key_for(body: bytes, namespace: str = "") -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        return f"{namespace}-{digest}" if namespace else digest
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Look a document up in memory, then on disk"""
+        with self._lock:
+            doc = self._entries.get(key)
+            if doc is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(doc)
+
+        doc = self._read_disk(key)
+        if doc is not None:
+            self._remember(key, doc)
+            with self._lock:
+                self._stats["disk_hits"] += 1
+            return copy.deepcopy(doc)
+
+        return None
+
+    def put(self, key: str, doc: Dict):
+        self._remember(key, copy.deepcopy(doc))
+        self._write_disk(key, doc)
+
+    def get_or_extract(self, body: bytes, extract: Callable[[bytes], Dict], namespace: str = "") -> Dict:
+        """
+        Return the cached document for body, extracting (and caching) it on a miss
+        """
+        key = self.key_for(body, namespace)
+        doc = self.get(key)
+        if doc is not None:
+            return doc
+
+        with self._lock:
+            self._stats["misses"] += 1
+
+        doc = extract(body)
+        self.put(key, doc)
+        return doc
+
+    def _remember(self, key: str, doc: Dict):
+        with self._lock:
+            self._entries[key] = doc
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        digest = key.rsplit("-", 1)[-1]
+        return os.path.join(self.cache_dir, digest[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, key: str, doc: Dict):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[DocumentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Return the process-wide document cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache_dir = settings.DOCUMENT_CACHE_DIR if settings.DOCUMENT_CACHE_DISK else None
+                _cache = DocumentCache(cache_dir=cache_dir)
+    return _cache
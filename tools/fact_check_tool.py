@@ -1,15 +1,24 @@
 from crewai.tools import BaseTool
 import json
-import re
 from typing import List, Dict
+from config.settings import settings
+from tools.dedup import DedupResult, deduplicate_sources
+from tools.knowledge_store import record_verification
+from tools.passage_store import with_stored_text
+from tools.similarity import PassageMatcher
+from tools.text_index import InvertedIndex
+from tools.text_processing import key_terms
+from telemetry.instrumentation import trace_tool
 
 class FactCheckTool(BaseTool):
     name: str = "Fact Verification Tool"
     description: str = (
         "Verifies claims against provided sources and checks for consistency. "
-        "Input should be JSON with 'claims' and 'sources' fields."
+        "Input should be JSON with 'claims' and 'sources' fields; scraped sources can be given by 'url' alone. "
+        "An optional 'mode' field selects 'terms', 'tfidf' or 'embedding' matching."
     )
     
+    @trace_tool
     def _run(self, input_data: str) -> str:
         """
         Verify claims against source material
@@ -42,16 +51,35 @@ class FactCheckTool(BaseTool):
                     "message": "No sources provided for verification"
                 })
             
-            # Combine all source content
-            all_source_text = " ".join([
-                source.get("content", "") for source in sources
-            ]).lower()
+            mode = data.get("mode") or settings.FACT_CHECK_MODE
             
-            verification_results = []
+            # Scraped pages are read from the passage store: from anywhere in
+            # the page, the passages most relevant to the claims
+            sources, from_store = with_stored_text(sources, query=" ".join(map(str, claims)))
             
-            for claim in claims:
-                result = self._verify_claim(claim, all_source_text, sources)
-                verification_results.append(result)
+            # A claim backed by one article syndicated on several sites has one source
+            dedup = deduplicate_sources(sources) if settings.SOURCE_DEDUP_ENABLED else DedupResult(sources)
+            sources = dedup.sources
+            
+            if mode == "terms":
+                # Index all source content once; every claim is checked against it
+                index = InvertedIndex(source.get("content", "") for source in sources)
+                
+                verification_results = []
+                
+                for claim in claims:
+                    result = self._verify_claim(claim, index, sources)
+                    verification_results.append(result)
+            else:
+                try:
+                    verification_results = self._verify_by_similarity(claims, sources, mode)
+                except ImportError:
+                    # No local embedding model installed; TF-IDF needs nothing extra
+                    mode = "tfidf"
+                    verification_results = self._verify_by_similarity(claims, sources, mode)
+            
+            # Later runs can reuse these verdicts through the knowledge store
+            record_verification(verification_results)
             
             # Calculate overall credibility score
             verified_count = sum(1 for r in verification_results if r["status"] == "verified")
@@ -59,7 +87,10 @@ class FactCheckTool(BaseTool):
             
             return json.dumps({
                 "status": "success",
+                "verification_mode": mode,
                 "verification_results": verification_results,
+                "duplicates_merged": dedup.merged,
+                "sources_from_passage_store": from_store,
                 "summary": {
                     "total_claims": len(claims),
                     "verified": verified_count,
@@ -74,32 +105,26 @@ class FactCheckTool(BaseTool):
                 "message": f"Fact-checking failed: {str(e)}"
             })
     
-    def _verify_claim(self, claim: str, source_text: str, sources: List[Dict]) -> Dict:
+    def _verify_claim(self, claim: str, index: InvertedIndex, sources: List[Dict]) -> Dict:
         """
-        Verify a single claim against sources
+        Verify a single claim against the indexed sources
         """
-        claim_lower = claim.lower()
-        
         # Extract key terms from claim (simple approach)
         key_terms = self._extract_key_terms(claim)
         
         # Check if key terms are present in sources
-        matching_terms = []
-        for term in key_terms:
-            if term.lower() in source_text:
-                matching_terms.append(term)
+        matching_terms = [term for term in key_terms if term in index]
         
         match_percentage = (len(matching_terms) / len(key_terms) * 100) if key_terms else 0
         
         # Find supporting sources
         supporting_sources = []
-        for source in sources:
-            source_content = source.get("content", "").lower()
-            if any(term.lower() in source_content for term in key_terms):
-                supporting_sources.append({
-                    "url": source.get("url", "Unknown"),
-                    "title": source.get("title", "Untitled")
-                })
+        for doc_id in index.documents_with_any(matching_terms)[:3]:
+            source = sources[doc_id]
+            supporting_sources.append({
+                "url": source.get("url", "Unknown"),
+                "title": source.get("title", "Untitled")
+            })
         
         # Determine verification status
         if match_percentage >= 70:
@@ -121,15 +146,50 @@ class FactCheckTool(BaseTool):
             "key_terms_found": matching_terms
         }
     
-    def _extract_key_terms(self, text: str) -> List[str]:
-        """Extract key terms from claim"""
-        # Remove common words
-        common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 
-                       'for', 'of', 'with', 'is', 'was', 'are', 'were', 'been', 'be',
-                       'has', 'have', 'had', 'that', 'this', 'it', 'from', 'by'}
+    def _verify_by_similarity(self, claims: List[str], sources: List[Dict], mode: str) -> List[Dict]:
+        """
+        Verify all claims at once by scoring them against every source passage
+        """
+        matcher = PassageMatcher(sources, mode=mode)
+        verified_threshold, partial_threshold = settings.FACT_CHECK_SIMILARITY_THRESHOLDS[mode]
         
-        # Extract words (3+ characters)
-        words = re.findall(r'\b\w{3,}\b', text.lower())
-        key_terms = [w for w in words if w not in common_words]
+        results = []
+        for claim, passages in zip(claims, matcher.top_passages(claims)):
+            best_score = passages[0]["score"] if passages else 0.0
+            
+            if best_score >= verified_threshold:
+                status = "verified"
+                confidence = "high"
+            elif best_score >= partial_threshold:
+                status = "partially_verified"
+                confidence = "medium"
+            else:
+                status = "unverified"
+                confidence = "low"
+            
+            supporting_passages = []
+            supporting_sources = []
+            for match in passages:
+                source = sources[match["source_id"]]
+                evidence = {
+                    "url": source.get("url", "Unknown"),
+                    "title": source.get("title", "Untitled")
+                }
+                supporting_passages.append({**evidence, "passage": match["passage"], "score": match["score"]})
+                if evidence not in supporting_sources:
+                    supporting_sources.append(evidence)
+            
+            results.append({
+                "claim": claim,
+                "status": status,
+                "confidence": confidence,
+                "match_percentage": round(best_score * 100, 2),
+                "supporting_sources": supporting_sources[:3],
+                "supporting_passages": supporting_passages
+            })
         
-        return key_terms[:10]  # Limit to top 10 terms
\ No newline at end of file
+        return results
+    
+    def _extract_key_terms(self, text: str) -> List[str]:
+        """Extract key terms from claim"""
+        return key_terms(text, limit=10)
\ No newline at end of file
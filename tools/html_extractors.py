@@ -0,0 +1,462 @@
+"""
+HTML extraction engines used by WebScraperTool.
+
+- "bs4": BeautifulSoup on top of lxml (the original extractor)
+- "lxml": the same extraction done directly on an lxml tree with XPath,
+  producing identical output without building a BeautifulSoup tree
+- StreamingExtractor: incremental extraction for SCRAPER_MODE = "streaming"
+"""
+
+import codecs
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+# Elements whose content never counts as page text
+SKIPPED_TAGS = frozenset(["script", "style", "nav", "footer", "aside"])
+HEADING_TAGS = frozenset(["h1", "h2", "h3"])
+
+# BeautifulSoup files strings inside these under special string classes that
+# get_text() leaves out, so the lxml engine has to leave them out too
+UNLISTED_TEXT_TAGS = frozenset(["template", "rt", "rp"])
+
+MIN_PARAGRAPH_CHARS = 50
+MAX_HEADINGS = 10
+
+# Body bytes StreamingExtractor holds back to sniff the encoding from when
+# the response declares no charset
+SNIFF_BYTES = 2048
+
+# XPath predicate for elements BeautifulSoup would not have decomposed
+_OUTSIDE_SKIPPED = "[not(" + " or ".join(f"ancestor::{tag}" for tag in sorted(SKIPPED_TAGS)) + ")]"
+
+_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+# Same declaration patterns BeautifulSoup's EncodingDetector uses
+_XML_ENCODING_RE = re.compile(b'^\\s*<\\?.*encoding=[\'"](.*?)[\'"].*\\?>', re.IGNORECASE)
+_HTML_META_CHARSET_RE = re.compile(b'<\\s*meta[^>]+charset\\s*=\\s*["\']?([^>]*?)[ /;\'">]', re.IGNORECASE)
+
+_BYTE_ORDER_MARKS = (
+    (b"\xef\xbb\xbf", "utf-8"),
+    (b"\x00\x00\xfe\xff", "utf-32be"),
+    (b"\xff\xfe\x00\x00", "utf-32le"),
+    (b"\xfe\xff", "utf-16be"),
+    (b"\xff\xfe", "utf-16le"),
+)
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Charset declared in a Content-Type header, if any"""
+    if not content_type:
+        return None
+    match = _CHARSET_RE.search(content_type)
+    return match.group(1) if match else None
+
+
+def element_strings(element) -> Iterator[str]:
+    """
+    Stripped, non-empty text nodes of an lxml element in document order.
+
+    Mirrors the strings BeautifulSoup's get_text(strip=True) yields on a tree
+    where the SKIPPED_TAGS elements were decomposed: their content is dropped
+    but the text following them is kept. Comments and text inside
+    UNLISTED_TEXT_TAGS are left out as well.
+    """
+    if element.tag in UNLISTED_TEXT_TAGS:
+        return
+    for ancestor in element.iterancestors():
+        if ancestor.tag in UNLISTED_TEXT_TAGS:
+            return
+
+    def walk(node):
+        if node.text:
+            text = node.text.strip()
+            if text:
+                yield text
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in SKIPPED_TAGS and child.tag not in UNLISTED_TEXT_TAGS:
+                yield from walk(child)
+            if child.tail:
+                tail = child.tail.strip()
+                if tail:
+                    yield tail
+
+    yield from walk(element)
+
+
+def element_text(element) -> str:
+    """Text of an lxml element, equivalent to BeautifulSoup's get_text(strip=True)"""
+    return "".join(element_strings(element))
+
+
+class StreamingExtractor:
+    """
+    Incremental extractor fed with raw body chunks.
+
+    Collects the title, meta description, headings and paragraphs while the
+    page is still downloading and reports when the content budget is full,
+    so the caller can stop reading. Unlike the full extractor it does not
+    look for a <main>/<article> container first (that would require the
+    whole document); paragraphs are taken from anywhere outside the
+    SKIPPED_TAGS elements.
+
+    Without an encoding the parser is only created once SNIFF_BYTES of the
+    body have arrived, with the encoding sniffed from them.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None, encoding: Optional[str] = None):
+        self.max_chars = max_chars or settings.SCRAPER_MAX_DOCUMENT_CHARS
+        self.encoding = encoding
+        self._parser = None
+        self._head = b""
+
+        self.title: Optional[str] = None
+        self._title_seen = False
+        self.description: Optional[str] = None
+        self.headings: List[Dict] = []
+        self.paragraphs: List[str] = []
+
+        self._content_chars = 0
+        self._skip_depth = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Feed the next body chunk; returns True once extraction is complete"""
+        if self.done:
+            return True
+        if self._parser is None:
+            self._head += chunk
+            if self.encoding is None and len(self._head) < SNIFF_BYTES:
+                return False
+            chunk = self._open_parser()
+        self._parser.feed(chunk)
+        self._drain()
+        return self.done
+
+    def _open_parser(self) -> bytes:
+        """Create the pull parser; returns the buffered body to feed it"""
+        from lxml import etree
+
+        markup, self._head = self._head, b""
+        if self.encoding is None:
+            markup, self.encoding = sniff_encoding(markup)
+        self._parser = etree.HTMLPullParser(events=("start", "end"), encoding=self.encoding)
+        return markup
+
+    def _drain(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else None
+
+            if event == "start":
+                if tag in SKIPPED_TAGS:
+                    self._skip_depth += 1
+                elif tag == "meta" and self.description is None and element.get("name") == "description":
+                    self.description = element.get("content") or ""
+                continue
+
+            if tag in SKIPPED_TAGS:
+                self._skip_depth -= 1
+                element.clear(keep_tail=True)
+                continue
+
+            if self._skip_depth:
+                continue
+
+            if tag == "title" and not self._title_seen:
+                self._title_seen = True
+                self.title = _single_string(element)
+            elif tag in HEADING_TAGS and len(self.headings) < MAX_HEADINGS:
+                self.headings.append({"level": tag, "text": element_text(element)})
+            elif tag == "p":
+                self._add_paragraph(element_text(element))
+                # The paragraph is consumed; free its subtree
+                element.clear(keep_tail=True)
+                if self.done:
+                    return
+
+    def _add_paragraph(self, text: str):
+        if len(text) <= MIN_PARAGRAPH_CHARS:
+            return
+        # Account for the "\n\n" separator between paragraphs
+        self._content_chars += len(text) + (2 if self.paragraphs else 0)
+        self.paragraphs.append(text)
+        if self._content_chars >= self.max_chars:
+            self.done = True
+
+    def result(self) -> Dict:
+        """Finish parsing and return the extracted document"""
+        if self._parser is None:
+            # The whole body fit in the sniffing buffer
+            markup = self._open_parser()
+            self._parser.feed(markup)
+            self._drain()
+        if not self.done:
+            try:
+                self._parser.close()
+            except Exception:
+                # A truncated body can leave the parser in an error state;
+                # whatever was collected so far is still usable
+                pass
+            else:
+                self._drain()
+
+        content_text = "\n\n".join(self.paragraphs)[:self.max_chars]
+
+        return {
+            "title": self.title if self._title_seen else "No title",
+            "description": self.description or "",
+            "headings": self.headings,
+            "content": content_text,
+            "word_count": len(content_text.split())
+        }
+
+
+def extract_with_bs4(html: bytes) -> Dict:
+    """Extract title, description, headings and main text using BeautifulSoup"""
+    from bs4 import BeautifulSoup
+
+    # Parse HTML
+    soup = BeautifulSoup(html, 'lxml')
+
+    # Remove script and style elements
+    for script in soup(["script", "style", "nav", "footer", "aside"]):
+        script.decompose()
+
+    # Extract metadata
+    title = soup.find('title')
+    title_text = title.string if title else "No title"
+    if title_text is not None:
+        # Plain str so cached documents don't keep the whole tree alive
+        title_text = str(title_text)
+
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    description = meta_desc['content'] if meta_desc and meta_desc.get('content') else ""
+
+    # Extract headings
+    headings = []
+    for heading in soup.find_all(['h1', 'h2', 'h3'])[:10]:
+        headings.append({
+            "level": heading.name,
+            "text": heading.get_text(strip=True)
+        })
+
+    # Extract main content
+    main_content = soup.find('main') or soup.find('article') or soup.find('body')
+
+    if main_content:
+        # Get paragraphs
+        paragraphs = [p.get_text(strip=True) for p in main_content.find_all('p')]
+        content_text = '\n\n'.join([p for p in paragraphs if len(p) > 50])[:settings.SCRAPER_MAX_DOCUMENT_CHARS]
+    else:
+        content_text = soup.get_text(separator='\n', strip=True)[:settings.SCRAPER_MAX_DOCUMENT_CHARS]
+
+    return {
+        "title": title_text,
+        "description": description,
+        "headings": headings,
+        "content": content_text,
+        "word_count": len(content_text.split())
+    }
+
+
+def _strip_byte_order_mark(html: bytes) -> Tuple[bytes, Optional[str]]:
+    """The body without its byte-order mark, and the encoding the mark names"""
+    for mark, encoding in _BYTE_ORDER_MARKS:
+        if html.startswith(mark):
+            return html[len(mark):], encoding
+    return html, None
+
+
+def _declared_encoding(html: bytes) -> Optional[str]:
+    """Encoding named by an XML declaration or a <meta> charset near the start of the body"""
+    match = _XML_ENCODING_RE.search(html, 0, 1024)
+    if not match:
+        match = _HTML_META_CHARSET_RE.search(html, 0, max(2048, int(len(html) * 0.05)))
+    return match.group(1).decode("ascii", "replace").lower() if match and match.group(1) else None
+
+
+def _candidate_encodings(html: bytes) -> Tuple[bytes, Iterator[str]]:
+    """
+    Encodings to try for a raw body, in the order BeautifulSoup tries them:
+    byte-order mark, declared encoding, charset detection, utf-8, windows-1252
+    """
+    html, sniffed = _strip_byte_order_mark(html)
+
+    def candidates():
+        tried = set()
+
+        def usable(encoding):
+            if not encoding or encoding.lower() in tried:
+                return False
+            tried.add(encoding.lower())
+            return True
+
+        if usable(sniffed):
+            yield sniffed
+
+        declared = _declared_encoding(html)
+        if usable(declared):
+            yield declared
+
+        detected = _detect_encoding(html)
+        if usable(detected):
+            yield detected
+
+        for fallback in ("utf-8", "windows-1252"):
+            if usable(fallback):
+                yield fallback
+
+    return html, candidates()
+
+
+def sniff_encoding(head: bytes) -> Tuple[bytes, str]:
+    """
+    Encoding of a body known only by its first bytes, for when the response
+    declares no charset: byte-order mark, declared encoding, then charset
+    detection, falling back to utf-8. Returns the head without its
+    byte-order mark along with the encoding.
+    """
+    head, encoding = _strip_byte_order_mark(head)
+    for candidate in (encoding, _declared_encoding(head)):
+        if candidate and _codec_name(candidate):
+            return head, candidate
+
+    # Detection only sees the head, which may end mid-character; a head
+    # that is valid UTF-8 up to that point is taken as UTF-8
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return head, "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    detected = _detect_encoding(head)
+    if detected and _codec_name(detected) not in (None, "ascii"):
+        return head, detected
+    return head, "utf-8"
+
+
+def _codec_name(encoding: str) -> Optional[str]:
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def _detect_encoding(html: bytes) -> Optional[str]:
+    """Third-party charset detection, preferring the same modules as BeautifulSoup"""
+    for module_name in ("cchardet", "chardet", "charset_normalizer"):
+        try:
+            module = __import__(module_name)
+        except ImportError:
+            continue
+        return module.detect(html)["encoding"]
+    return None
+
+
+def _parse_lxml(html: bytes):
+    """Parse raw HTML into an lxml.html tree, decoding it the way BeautifulSoup would"""
+    from lxml import etree
+    import lxml.html
+
+    markup, encodings = _candidate_encodings(html)
+    for encoding in encodings:
+        parser = lxml.html.HTMLParser(recover=True, encoding=encoding)
+        try:
+            parser.feed(markup)
+            return parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError):
+            continue
+    return None
+
+
+def _single_string(element) -> Optional[str]:
+    """BeautifulSoup's Tag.string: the only child string, looking through single-child tags"""
+    children = []
+    if element.text:
+        children.append(element.text)
+    for child in element:
+        children.append(child)
+        if child.tail:
+            children.append(child.tail)
+
+    if len(children) != 1:
+        return None
+
+    child = children[0]
+    if isinstance(child, str):
+        return str(child)
+    if not isinstance(child.tag, str):
+        # Comments and processing instructions are strings to BeautifulSoup
+        return child.text
+    return _single_string(child)
+
+
+def extract_with_lxml(html: bytes) -> Dict:
+    """
+    Extract title, description, headings and main text straight from an lxml tree.
+
+    Produces the same document as extract_with_bs4 for the same body, at a
+    fraction of the CPU cost.
+    """
+    root = _parse_lxml(html)
+    if root is None:
+        return {
+            "title": "No title",
+            "description": "",
+            "headings": [],
+            "content": "",
+            "word_count": 0
+        }
+
+    # Script, style and page chrome stay in the tree (dropping them would merge
+    # the text around them) and are filtered out of every query instead
+
+    # Extract metadata
+    title = root.xpath(f'//title{_OUTSIDE_SKIPPED}')
+    title_text = _single_string(title[0]) if title else "No title"
+
+    meta_desc = root.xpath(f'//meta[@name="description"]{_OUTSIDE_SKIPPED}')
+    description = meta_desc[0].get('content') if meta_desc and meta_desc[0].get('content') else ""
+
+    # Extract headings
+    headings = [
+        {"level": heading.tag, "text": element_text(heading)}
+        for heading in root.xpath(f'//h1{_OUTSIDE_SKIPPED}|//h2{_OUTSIDE_SKIPPED}|//h3{_OUTSIDE_SKIPPED}')[:MAX_HEADINGS]
+    ]
+
+    # Extract main content
+    main_content = None
+    for tag in ('main', 'article', 'body'):
+        matches = root.xpath(f'//{tag}{_OUTSIDE_SKIPPED}')
+        if matches:
+            main_content = matches[0]
+            break
+
+    if main_content is not None:
+        paragraphs = [element_text(p) for p in main_content.xpath(f'.//p{_OUTSIDE_SKIPPED}')]
+        content_text = '\n\n'.join([p for p in paragraphs if len(p) > MIN_PARAGRAPH_CHARS])[:settings.SCRAPER_MAX_DOCUMENT_CHARS]
+    else:
+        content_text = '\n'.join(element_strings(root))[:settings.SCRAPER_MAX_DOCUMENT_CHARS]
+
+    return {
+        "title": title_text,
+        "description": description,
+        "headings": headings,
+        "content": content_text,
+        "word_count": len(content_text.split())
+    }
+
+
+EXTRACTORS: Dict[str, Callable[[bytes], Dict]] = {
+    "bs4": extract_with_bs4,
+    "lxml": extract_with_lxml,
+}
+
+
+def get_extractor(engine: Optional[str] = None) -> Callable[[bytes], Dict]:
+    """Return the extraction function for an engine name (defaults to settings)"""
+    engine = engine or settings.SCRAPER_ENGINE
+    if engine not in EXTRACTORS:
+        raise ValueError(f"Unknown scraper engine '{engine}'. Expected one of: {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[engine]
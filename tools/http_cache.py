@@ -0,0 +1,309 @@
+"""
+Persistent HTTP response cache used underneath the shared HTTP client.
+
+Bodies are stored content-addressed (by SHA-256) on disk and indexed in
+SQLite. Entries expire after a per-domain TTL and are then revalidated with
+ETag / Last-Modified; total body size is bounded with LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config.settings import settings
+
+# Headers that describe the wire encoding rather than the decoded body we store
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_body_hash ON entries(body_hash);
+"""
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body_hash: str
+    size: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class HttpResponseCache:
+    """
+    On-disk cache of GET responses with TTL, revalidation and LRU eviction
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        domain_ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.cache_dir = cache_dir or settings.HTTP_CACHE_DIR
+        self.max_bytes = max_bytes or settings.HTTP_CACHE_MAX_BYTES
+        self.default_ttl = default_ttl if default_ttl is not None else settings.HTTP_CACHE_DEFAULT_TTL
+        self.domain_ttls = domain_ttls if domain_ttls is not None else settings.HTTP_CACHE_DOMAIN_TTLS
+
+        self._bodies_dir = os.path.join(self.cache_dir, "bodies")
+        os.makedirs(self._bodies_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.sqlite3"),
+            check_same_thread=False
+        )
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_served": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """TTL for a URL, using the most specific matching domain entry"""
+        host = urlsplit(url).hostname or ""
+        while host:
+            if host in self.domain_ttls:
+                return self.domain_ttls[host]
+            host = host.partition(".")[2]
+        return self.default_ttl
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cache entry for a URL (fresh or stale), if any"""
+        key = self.key_for(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT key, url, status, headers, body_hash, size, etag, last_modified, expires_at "
+                "FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        entry = CacheEntry(
+            key=row[0],
+            url=row[1],
+            status=row[2],
+            headers=json.loads(row[3]),
+            body_hash=row[4],
+            size=row[5],
+            etag=row[6],
+            last_modified=row[7],
+            expires_at=row[8],
+        )
+
+        # The index can outlive a body file that was removed by hand
+        if not os.path.exists(self._body_path(entry.body_hash)):
+            self._delete_entry(entry.key)
+            return None
+
+        return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Headers for revalidating a stale entry with the origin"""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, response: requests.Response):
+        """Store a successful response body and its validators"""
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if response.status_code != 200 or "no-store" in cache_control:
+            return
+
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(body_hash)
+
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+
+        headers = {
+            k: v for k, v in response.headers.items()
+            if k.lower() not in _DROPPED_HEADERS
+        }
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, url, status, headers, body_hash, size, etag, last_modified, "
+                "stored_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key_for(url), url, response.status_code, json.dumps(headers),
+                    body_hash, len(body), response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    now, now + self.ttl_for(url), now
+                )
+            )
+            self._db.commit()
+            self._stats["stores"] += 1
+
+        self._evict()
+
+    def refresh(self, entry: CacheEntry):
+        """Extend a stale entry after the origin answered 304 Not Modified"""
+        now = time.time()
+        entry.expires_at = now + self.ttl_for(entry.url)
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET expires_at = ?, last_access = ? WHERE key = ?",
+                (entry.expires_at, now, entry.key)
+            )
+            self._db.commit()
+            self._stats["revalidated"] += 1
+
+    def to_response(self, entry: CacheEntry, count_hit: bool = True) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry"""
+        with open(self._body_path(entry.body_hash), "rb") as f:
+            body = f.read()
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (time.time(), entry.key)
+            )
+            self._db.commit()
+            if count_hit:
+                self._stats["hits"] += 1
+            self._stats["bytes_served"] += len(body)
+
+        response = requests.Response()
+        response.status_code = entry.status
+        response.reason = "OK"
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def record_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+
+    # ------------------------------------------------------------------
+    # Eviction and housekeeping
+    # ------------------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        """Size of all distinct bodies currently referenced by the index"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM "
+                "(SELECT body_hash, MAX(size) AS size FROM entries GROUP BY body_hash)"
+            ).fetchone()
+        return row[0]
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self.total_bytes()
+        while total > self.max_bytes:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT key FROM entries ORDER BY last_access ASC LIMIT 1"
+                ).fetchone()
+            if row is None:
+                break
+            self._delete_entry(row[0])
+            with self._lock:
+                self._stats["evictions"] += 1
+            total = self.total_bytes()
+
+    def _delete_entry(self, key: str):
+        """Remove an index entry and its body if no other entry shares it"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            still_used = self._db.execute(
+                "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (row[0],)
+            ).fetchone()
+            self._db.commit()
+
+        if not still_used:
+            try:
+                os.remove(self._body_path(row[0]))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            keys = [r[0] for r in self._db.execute("SELECT key FROM entries").fetchall()]
+        for key in keys:
+            self._delete_entry(key)
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self._bodies_dir, body_hash[:2], body_hash)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["entries"] = entries
+        stats["total_bytes"] = self.total_bytes()
+        stats["hit_rate"] = round((stats["hits"] + stats["revalidated"]) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,238 @@
+"""
+Shared HTTP fetch layer for the research tools.
+
+Every tool goes through one process-wide client so connections are kept
+alive between calls, and the number of requests in flight is bounded both
+globally and per host. GET responses are served from the on-disk response
+cache when one is configured.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import settings
+from telemetry.tracing import get_tracer
+from tools.http_cache import HttpResponseCache
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by WebSearchTool and WebScraperTool
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        cache: Optional[HttpResponseCache] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.HTTP_MAX_CONCURRENCY
+        self.per_host_concurrency = per_host_concurrency or settings.HTTP_PER_HOST_CONCURRENCY
+        self.cache = cache
+
+        retry = Retry(
+            total=settings.HTTP_MAX_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or settings.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+
+        self._session = requests.Session()
+        self._session.headers.update({'User-Agent': settings.HTTP_USER_AGENT})
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._global_slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Get (or lazily create) the concurrency slot for a URL's host"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_concurrency)
+                self._host_slots[host] = slot
+        return slot
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> requests.Response:
+        """
+        Issue a GET request over the shared connection pool, via the cache
+        """
+        with get_tracer().span("http GET", kind="client", **{"http.url": url}) as span:
+            response, cache_status = self._cached_get(url, params, headers, timeout, use_cache)
+            span.attributes.update({
+                "http.cache": cache_status,
+                "http.status_code": response.status_code,
+                "http.response_bytes": len(response.content),
+            })
+            return response
+
+    def _cached_get(self, url, params, headers, timeout, use_cache):
+        """The response for a GET and how the cache answered it"""
+        if self.cache is None or not use_cache:
+            return self._fetch(url, params=params, headers=headers, timeout=timeout), "bypass"
+
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        entry = self.cache.lookup(full_url)
+
+        if entry is not None and entry.fresh:
+            return self.cache.to_response(entry), "hit"
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(self.cache.conditional_headers(entry))
+
+        response = self._fetch(full_url, headers=request_headers, timeout=timeout)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.refresh(entry)
+            return self.cache.to_response(entry, count_hit=False), "revalidated"
+
+        self.cache.record_miss()
+        self.cache.store(full_url, response)
+        return response, "miss"
+
+    def _fetch(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        """Send the request, holding a host slot and a global slot"""
+        # Host slot first, then global slot, always in that order to avoid deadlocks
+        with self._host_slot(url), self._global_slots:
+            return self._session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=timeout or settings.SCRAPING_TIMEOUT
+            )
+
+    def post(
+        self,
+        url: str,
+        json: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        """
+        Issue a POST request over the shared connection pool (never cached)
+        """
+        with get_tracer().span("http POST", kind="client", **{"http.url": url}) as span, \
+                self._host_slot(url), self._global_slots:
+            response = self._session.post(
+                url,
+                json=json,
+                headers=headers,
+                timeout=timeout or settings.SCRAPING_TIMEOUT
+            )
+            span.attributes.update({
+                "http.status_code": response.status_code,
+                "http.response_bytes": len(response.content),
+            })
+            return response
+
+    @contextmanager
+    def stream(
+        self,
+        url: str,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[requests.Response]:
+        """
+        Open a GET request whose body is read incrementally with iter_content().
+
+        A fresh cache entry is served from disk; otherwise the connection is
+        held (with its host and global slots) until the caller is done, and
+        closing early simply drops the rest of the body. Partial bodies are
+        never written to the cache. The caller records the bytes it read on
+        the current span as http.response_bytes.
+        """
+        with get_tracer().span("http GET", kind="client", **{"http.url": url, "http.streaming": True}) as span:
+            if self.cache is not None:
+                entry = self.cache.lookup(url)
+                if entry is not None and entry.fresh:
+                    span.set_attribute("http.cache", "hit")
+                    yield self.cache.to_response(entry)
+                    return
+                self.cache.record_miss()
+            span.set_attribute("http.cache", "miss" if self.cache is not None else "bypass")
+
+            with self._host_slot(url), self._global_slots:
+                response = self._session.get(
+                    url,
+                    headers=headers,
+                    timeout=timeout or settings.SCRAPING_TIMEOUT,
+                    stream=True
+                )
+                span.set_attribute("http.status_code", response.status_code)
+                try:
+                    yield response
+                finally:
+                    response.close()
+
+    def cache_stats(self) -> Dict:
+        """Response cache hit/miss counters (empty when caching is disabled)"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        Run fn over items concurrently, returning results in input order
+        """
+        items = list(items)
+        if not items:
+            return []
+        if len(items) == 1:
+            return [fn(items[0])]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as pool:
+            # Each item runs in a copy of the caller's context so its spans
+            # nest under the caller's span
+            futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+            return [future.result() for future in futures]
+
+    def close(self):
+        self._session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                cache = HttpResponseCache() if settings.HTTP_CACHE_ENABLED else None
+                _client = HttpClient(cache=cache)
+    return _client
@@ -0,0 +1,79 @@
+from crewai.tools import BaseTool
+import json
+import sqlite3
+from config.settings import settings
+from tools.knowledge_store import get_knowledge_store
+from telemetry.instrumentation import trace_tool
+
+class KnowledgeSearchTool(BaseTool):
+    name: str = "Knowledge Base Tool"
+    description: str = (
+        "Searches what earlier research runs found: sources they scraped and claims they "
+        "fact-checked, with each claim's verification status and supporting sources. "
+        "Input should be a query string, or JSON with 'query' and optionally 'kind' "
+        "('source' or 'claim') and 'k' (number of results)."
+    )
+
+    @trace_tool
+    def _run(self, query: str) -> str:
+        """
+        Retrieve the findings of earlier runs most similar to a query
+        """
+        try:
+            data = json.loads(query)
+        except (TypeError, json.JSONDecodeError):
+            data = query
+        if not isinstance(data, dict):
+            data = {"query": str(data)}
+
+        # Arguments come from the LLM: accept a numeric string for k
+        kind = data.get("kind") or None
+        try:
+            k = int(data["k"]) if data.get("k") is not None else None
+        except (TypeError, ValueError):
+            k = 0
+        if not isinstance(data.get("query") or "", str) or kind not in (None, "source", "claim") or (
+            k is not None and k < 1
+        ):
+            return json.dumps({
+                "status": "error",
+                "message": "Expected 'query' as a string, 'kind' as 'source' or 'claim' and 'k' as a positive number",
+                "findings": []
+            })
+
+        text = (data.get("query") or "").strip()
+        if not text:
+            return json.dumps({
+                "status": "error",
+                "message": "No query provided",
+                "findings": []
+            })
+
+        if not settings.KNOWLEDGE_STORE_ENABLED:
+            return json.dumps({
+                "status": "error",
+                "message": "The knowledge store is disabled (KNOWLEDGE_STORE_ENABLED)",
+                "findings": []
+            })
+
+        try:
+            findings = get_knowledge_store().search(text, k=k, kinds=[kind] if kind else None)
+        except (sqlite3.Error, OSError) as e:
+            return json.dumps({
+                "status": "error",
+                "message": f"Knowledge search failed: {str(e)}",
+                "findings": []
+            })
+
+        if not findings:
+            return json.dumps({
+                "status": "no_results",
+                "message": f"No earlier findings match: {text}",
+                "findings": []
+            })
+
+        return json.dumps({
+            "status": "success",
+            "query": text,
+            "findings": findings
+        }, indent=2)
@@ -0,0 +1,543 @@
+"""
+Persistent knowledge store shared by every research run.
+
+Sources, claims and their verification results are kept across runs, so a
+later topic can start from what earlier ones found instead of fetching and
+verifying it all again. Each item's text is embedded locally and its vector
+appended to a float32 file that is read through a memory map: opening the
+store costs the same however large it grows, and new items are added
+without rewriting the index. Item metadata lives in SQLite next to it.
+Queries weight each dimension by its inverse document frequency, counted
+as items are added, so terms that every item shares (the words of the
+topic a store was built up around) do not drown out the distinctive ones.
+
+The default hashing embedder needs no model, network access or API key.
+With KNOWLEDGE_EMBEDDER="sentence-transformers" the local EMBEDDING_MODEL is
+used when it can be loaded; switching embedders re-embeds the stored items.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+from config.settings import settings
+from tools.text_processing import STOPWORDS, tokenize
+from tools.url_utils import normalize_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge_items (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    text TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    topic TEXT,
+    data TEXT NOT NULL,
+    vector_row INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE TABLE IF NOT EXISTS knowledge_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Vectors scored per step of a search, bounding the memory a search touches
+SEARCH_CHUNK_ROWS = 65536
+# Characters of a page embedded for its source item
+SOURCE_TEXT_CHARS = 1500
+# Nearest vectors re-scored by the query terms their text contains
+RERANK_CANDIDATES = 50
+
+_current_topic: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("knowledge_topic", default=None)
+
+
+@lru_cache(maxsize=100_000)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of word unigrams and bigrams: no model to load,
+    and the same text always gets the same vector
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or settings.KNOWLEDGE_HASHING_DIM
+        self.name = f"hashing-{self.dim}"
+
+    def encode(self, texts: List[str]):
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = [word for word in tokenize(text, lower=True) if word not in STOPWORDS]
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((_feature_hash(f) for f in features), dtype=np.uint64, count=len(features))
+            signs = np.where(hashes >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+            np.add.at(vectors[row], (hashes % np.uint64(self.dim)).astype(np.int64), signs)
+
+        # Dampen repeated terms, then normalize so a dot product is the cosine
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+
+
+class SentenceTransformerEmbedder:
+    """The local sentence-embedding model (settings.EMBEDDING_MODEL)"""
+
+    def __init__(self):
+        from tools.similarity import get_embedding_model
+
+        self._model = get_embedding_model()
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{settings.EMBEDDING_MODEL}"
+
+    def encode(self, texts: List[str]):
+        import numpy as np
+
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder(name: Optional[str] = None):
+    """The configured knowledge embedder; falls back to hashing when no model can be loaded"""
+    name = name or settings.KNOWLEDGE_EMBEDDER
+    if name == "hashing":
+        return HashingEmbedder()
+    if name == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder()
+        except (ImportError, OSError):
+            # Not installed, or the model is not downloaded and there is no network
+            return HashingEmbedder()
+    raise ValueError(f"Unknown knowledge embedder '{name}'. Expected 'hashing' or 'sentence-transformers'")
+
+
+class KnowledgeStore:
+    """
+    Items (sources, verified claims) with one embedding each. Vectors are
+    append-only rows of vectors.f32; an item whose text changes gets a new
+    row and its old row is ignored.
+    """
+
+    def __init__(self, directory: Optional[str] = None, embedder=None):
+        self.directory = directory or settings.KNOWLEDGE_STORE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.embedder = embedder or get_embedder()
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._row_bytes = self.embedder.dim * 4
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, "items.sqlite3"), check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+        self._matrix = None
+        self._rows = self._trim_vectors()
+        self._row_items: List[int] = []
+        self._row_kinds: List[str] = []
+        self._masks = None
+        self._df = None
+
+        row = self._db.execute("SELECT value FROM knowledge_meta WHERE name = 'embedder'").fetchone()
+        if row is not None and row[0] != self.embedder.name:
+            self._reembed()
+        else:
+            self._db.execute(
+                "INSERT OR REPLACE INTO knowledge_meta (name, value) VALUES ('embedder', ?)", (self.embedder.name,)
+            )
+            self._db.commit()
+            self._load_rows()
+
+    def _trim_vectors(self) -> int:
+        """Drop a row left half-written by a crash; returns the number of whole rows"""
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        if size % self._row_bytes:
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(size - size % self._row_bytes)
+        return size // self._row_bytes
+
+    def _load_rows(self):
+        # Rows written before a crash but never committed to an item stay unowned
+        self._row_items = [-1] * self._rows
+        self._row_kinds = [""] * self._rows
+        for item_id, kind, vector_row in self._db.execute("SELECT id, kind, vector_row FROM knowledge_items"):
+            if vector_row < self._rows:
+                self._row_items[vector_row] = item_id
+                self._row_kinds[vector_row] = kind
+        self._masks = None
+        self._load_document_frequencies()
+
+    def _load_document_frequencies(self):
+        """Per-dimension counts of items with a nonzero value there; recounted if missing or stale"""
+        import numpy as np
+
+        row = self._db.execute("SELECT value FROM knowledge_meta WHERE name = 'document_frequencies'").fetchone()
+        live = sum(1 for item in self._row_items if item >= 0)
+        if row is not None:
+            counts = np.frombuffer(row[0], dtype=np.int64)
+            if len(counts) == self.embedder.dim + 1 and counts[-1] == live:
+                self._df = counts.copy()
+                return
+
+        self._df = np.zeros(self.embedder.dim + 1, dtype=np.int64)
+        matrix = self._memmap()
+        if matrix is not None:
+            owned = np.array(self._row_items, dtype=np.int64) >= 0
+            for start in range(0, self._rows, SEARCH_CHUNK_ROWS):
+                end = min(start + SEARCH_CHUNK_ROWS, self._rows)
+                self._df[:-1] += (matrix[start:end][owned[start:end]] != 0).sum(axis=0)
+        self._df[-1] = live
+        self._save_document_frequencies()
+        self._db.commit()
+
+    def _save_document_frequencies(self):
+        # The last entry is the number of items counted
+        self._db.execute(
+            "INSERT OR REPLACE INTO knowledge_meta (name, value) VALUES ('document_frequencies', ?)",
+            (self._df.tobytes(),)
+        )
+
+    def _reembed(self):
+        """Rebuild every vector with the current embedder (the store was built with another)"""
+        items = self._db.execute("SELECT id, text FROM knowledge_items ORDER BY id").fetchall()
+        # Written aside and moved into place, so a process still mapping the old file is unaffected
+        with open(self._vectors_path + ".tmp", "wb") as f:
+            for start in range(0, len(items), 256):
+                batch = items[start:start + 256]
+                f.write(self._encode([text for _, text in batch]).tobytes())
+        self._db.executemany(
+            "UPDATE knowledge_items SET vector_row = ? WHERE id = ?",
+            [(row, item_id) for row, (item_id, _) in enumerate(items)]
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO knowledge_meta (name, value) VALUES ('embedder', ?)", (self.embedder.name,)
+        )
+        self._db.execute("DELETE FROM knowledge_meta WHERE name = 'document_frequencies'")
+        os.replace(self._vectors_path + ".tmp", self._vectors_path)
+        self._db.commit()
+        self._rows = len(items)
+        self._matrix = None
+        self._load_rows()
+
+    def _encode(self, texts: List[str]):
+        """
+        Item vectors. The text before the first blank line (a source's title
+        and description) weighs as much as the rest, so a long page does not
+        drown out what it is about.
+        """
+        import numpy as np
+
+        heads, bodies = zip(*((head, body) for head, _, body in (text.partition("\n\n") for text in texts)))
+        vectors = self.embedder.encode(list(heads)) + self.embedder.encode(list(bodies))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+
+    def add(self, kind: str, key: str, text: str, url: Optional[str] = None, title: Optional[str] = None,
+            topic: Optional[str] = None, data: Optional[Dict] = None) -> int:
+        """
+        Insert an item, or update the item with the same kind and key.
+        Only new or changed text is embedded. Returns the item id.
+        """
+        now = time.time()
+        data_json = json.dumps(data or {}, ensure_ascii=False)
+        topic = topic or current_topic()
+
+        with self._lock:
+            existing = self._db.execute(
+                "SELECT id, text FROM knowledge_items WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if existing is not None and existing[1] == text:
+                self._db.execute(
+                    "UPDATE knowledge_items SET url = ?, title = ?, topic = COALESCE(?, topic), data = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (url, title, topic, data_json, now, existing[0])
+                )
+                self._db.commit()
+                return existing[0]
+
+        vector = self._encode([text])[0]
+
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT vector_row FROM knowledge_items WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+
+            self._df[:-1] += vector != 0
+            if previous is None:
+                self._df[-1] += 1
+            elif previous[0] < self._rows:
+                self._df[:-1] -= self._memmap()[previous[0]] != 0
+
+            # The vector is on disk before the item refers to it. Its row is
+            # read back from the append, as another process may have added rows
+            fd = os.open(self._vectors_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(fd, vector.tobytes())
+                vector_row = os.lseek(fd, 0, os.SEEK_CUR) // self._row_bytes - 1
+            finally:
+                os.close(fd)
+            self._rows = max(self._rows, vector_row + 1)
+
+            cursor = self._db.execute(
+                "INSERT INTO knowledge_items "
+                "(kind, key, text, url, title, topic, data, vector_row, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET text = excluded.text, url = excluded.url, "
+                "title = excluded.title, topic = COALESCE(excluded.topic, topic), data = excluded.data, "
+                "vector_row = excluded.vector_row, updated_at = excluded.updated_at "
+                "RETURNING id",
+                (kind, key, text, url, title, topic, data_json, vector_row, now, now)
+            )
+            item_id = cursor.fetchone()[0]
+            self._save_document_frequencies()
+            self._db.commit()
+
+            if previous is not None and previous[0] < len(self._row_items):
+                self._row_items[previous[0]] = -1
+            missing = self._rows - len(self._row_items)
+            self._row_items.extend([-1] * missing)
+            self._row_kinds.extend([""] * missing)
+            self._row_items[vector_row] = item_id
+            self._row_kinds[vector_row] = kind
+            self._masks = None
+        return item_id
+
+    def add_source(self, url: str, title: Optional[str], description: str, content: str,
+                   topic: Optional[str] = None) -> int:
+        """Record a scraped page; its title, description and opening text are embedded"""
+        head = "\n".join(part for part in (title, description) if part)
+        text = "\n\n".join(part for part in (head, (content or "")[:SOURCE_TEXT_CHARS]) if part)
+        return self.add(
+            "source", normalize_url(url) or url, text, url=url, title=title, topic=topic,
+            data={"description": description or ""}
+        )
+
+    def add_claim(self, result: Dict, topic: Optional[str] = None) -> int:
+        """Record a claim with its latest verification result (a FactCheckTool result entry)"""
+        claim = str(result.get("claim", ""))
+        return self.add(
+            "claim", " ".join(tokenize(claim, lower=True)), claim, topic=topic,
+            data={
+                "status": result.get("status"),
+                "confidence": result.get("confidence"),
+                "match_percentage": result.get("match_percentage"),
+                "supporting_sources": result.get("supporting_sources", []),
+            }
+        )
+
+    def search(self, query: str, k: Optional[int] = None, kinds: Optional[List[str]] = None,
+               min_score: Optional[float] = None) -> List[Dict]:
+        """
+        The k items most similar to query, optionally of the given kinds;
+        best first. The nearest vectors are re-scored with an even mix of
+        their similarity and the share of query terms they contain, which
+        keeps hashing collisions from passing for matches.
+        """
+        import numpy as np
+
+        k = k or settings.KNOWLEDGE_TOP_K
+        min_score = settings.KNOWLEDGE_MIN_SCORE if min_score is None else min_score
+        query_vector = self.embedder.encode([query])[0]
+
+        with self._lock:
+            self._refresh()
+            matrix = self._memmap()
+            allowed = self._allowed_rows(kinds)
+            df = self._df.copy()
+        if matrix is None or not allowed.any():
+            return []
+
+        # Smoothed idf, so a query of only common terms still ranks by them
+        query_vector = query_vector * (np.log((1 + df[-1]) / (1 + df[:-1])) + 1).astype(np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm == 0:
+            return []
+        query_vector /= norm
+
+        rows = min(len(allowed), len(matrix))
+        scores = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, SEARCH_CHUNK_ROWS):
+            end = min(start + SEARCH_CHUNK_ROWS, rows)
+            scores[start:end] = matrix[start:end] @ query_vector
+        scores[~allowed[:rows]] = -np.inf
+
+        candidates = min(max(k, RERANK_CANDIDATES), rows)
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        top = [int(row) for row in top if scores[row] > -np.inf]
+        if not top:
+            return []
+
+        with self._lock:
+            items = {
+                row[0]: row for row in self._db.execute(
+                    "SELECT vector_row, kind, text, url, title, topic, data, updated_at FROM knowledge_items "
+                    f"WHERE vector_row IN ({', '.join('?' * len(top))})", top
+                )
+            }
+
+        terms = {word for word in tokenize(query, lower=True) if word not in STOPWORDS}
+        ranked = []
+        for row in top:
+            if row not in items:
+                continue
+            overlap = len(terms & set(tokenize(items[row][2], lower=True))) / len(terms) if terms else 0.0
+            score = 0.5 * float(scores[row]) + 0.5 * overlap
+            if score >= min_score:
+                ranked.append((score, row))
+        ranked.sort(reverse=True)
+
+        results = []
+        for score, row in ranked[:k]:
+            _, kind, text, url, title, topic, data, updated_at = items[row]
+            entry = {"kind": kind, "text": text, "score": round(score, 4)}
+            if url:
+                entry["url"] = url
+            if title:
+                entry["title"] = title
+            if topic:
+                entry["topic"] = topic
+            entry.update(json.loads(data))
+            entry["recorded_at"] = datetime.fromtimestamp(updated_at).isoformat(timespec="seconds")
+            results.append(entry)
+        return results
+
+    def _refresh(self):
+        """Pick up rows another process appended since this one last looked (caller holds the lock)"""
+        rows = os.path.getsize(self._vectors_path) // self._row_bytes if os.path.exists(self._vectors_path) else 0
+        if rows != self._rows:
+            self._rows = rows
+            self._matrix = None
+            self._load_rows()
+
+    def _memmap(self):
+        """The vector file mapped read-only; remapped after appends (caller holds the lock)"""
+        import numpy as np
+
+        if self._rows == 0:
+            return None
+        if self._matrix is None or len(self._matrix) != self._rows:
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.embedder.dim)
+            )
+        return self._matrix
+
+    def _allowed_rows(self, kinds: Optional[List[str]]):
+        """Boolean mask of rows owned by an item of one of kinds (caller holds the lock)"""
+        import numpy as np
+
+        if self._masks is None:
+            self._masks = {
+                "items": np.array(self._row_items, dtype=np.int64) >= 0,
+                "kinds": np.array(self._row_kinds, dtype=object),
+            }
+        allowed = self._masks["items"]
+        if kinds:
+            allowed = allowed & np.isin(self._masks["kinds"], list(kinds))
+        return allowed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT kind, COUNT(*) FROM knowledge_items GROUP BY kind").fetchall())
+        return {
+            "items": sum(counts.values()),
+            "by_kind": counts,
+            "vector_rows": self._rows,
+            "embedder": self.embedder.name,
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM knowledge_items").fetchone()[0]
+
+
+@contextmanager
+def research_topic(topic: Optional[str]) -> Iterator[None]:
+    """Attribute the items recorded in the enclosed block to topic"""
+    token = _current_topic.set(topic)
+    try:
+        yield
+    finally:
+        _current_topic.reset(token)
+
+
+def current_topic() -> Optional[str]:
+    return _current_topic.get()
+
+
+def record_source(url: str, title: Optional[str], description: str, content: str):
+    """Add a scraped page to the knowledge store (best effort)"""
+    if not settings.KNOWLEDGE_STORE_ENABLED or not content:
+        return
+    try:
+        get_knowledge_store().add_source(url, title, description, content)
+    except (sqlite3.Error, OSError):
+        # Recording is a side effect; never fail a tool call over it
+        pass
+
+
+def record_verification(results: List[Dict]):
+    """Add fact-check results to the knowledge store (best effort)"""
+    if not settings.KNOWLEDGE_STORE_ENABLED:
+        return
+    try:
+        store = get_knowledge_store()
+        for result in results:
+            if result.get("claim"):
+                store.add_claim(result)
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def prior_findings(topic: str, k: Optional[int] = None) -> List[Dict]:
+    """Findings of earlier runs related to topic"""
+    k = settings.KNOWLEDGE_PRIOR_FINDINGS if k is None else k
+    if not settings.KNOWLEDGE_STORE_ENABLED or k <= 0:
+        return []
+    try:
+        return get_knowledge_store().search(topic, k=k)
+    except (sqlite3.Error, OSError):
+        return []
+
+
+def format_findings(findings: List[Dict]) -> str:
+    """One line per finding, for a task description"""
+    lines = []
+    for finding in findings:
+        if finding["kind"] == "claim":
+            sources = ", ".join(s.get("url", "") for s in finding.get("supporting_sources", [])[:3])
+            line = f"- Claim ({finding.get('status', 'unchecked')}): {finding['text']}"
+            if sources:
+                line += f" [sources: {sources}]"
+        else:
+            line = f"- Source: {finding.get('title') or 'Untitled'} ({finding.get('url', '')})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+_store: Optional[KnowledgeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_knowledge_store() -> KnowledgeStore:
+    """Return the process-wide knowledge store, creating it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = KnowledgeStore()
+    return _store
@@ -0,0 +1,108 @@
+"""
+Local full-text index of previously scraped documents.
+
+Backed by SQLite FTS5 with BM25 ranking, so repeat topics can be searched in
+milliseconds without any network access.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from tools.text_processing import tokenize
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    url UNINDEXED,
+    title,
+    description,
+    content,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS document_meta (
+    url TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+"""
+
+
+class LocalDocumentIndex:
+    """
+    SQLite FTS5 index of scraped pages
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.LOCAL_INDEX_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def add_document(self, url: str, title: Optional[str], description: str, content: str):
+        """Insert or replace the indexed copy of a page"""
+        with self._lock:
+            self._db.execute("DELETE FROM documents WHERE url = ?", (url,))
+            self._db.execute(
+                "INSERT INTO documents (url, title, description, content) VALUES (?, ?, ?, ?)",
+                (url, title or "", description or "", content or "")
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO document_meta (url, indexed_at) VALUES (?, ?)",
+                (url, time.time())
+            )
+            self._db.commit()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        BM25-ranked search; any query term may match
+        """
+        terms = tokenize(query, lower=True)
+        if not terms:
+            return []
+
+        # Quote every term so user input can never be read as FTS5 syntax
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, title, snippet(documents, 3, '', '', '...', 32), bm25(documents) "
+                "FROM documents WHERE documents MATCH ? ORDER BY bm25(documents) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+
+        return [
+            {
+                "title": title or url,
+                "snippet": snippet,
+                "url": url,
+                "source": "Local index",
+                # bm25() is lower-is-better; flip it so higher means more relevant
+                "relevance": round(-rank, 4)
+            }
+            for url, title, snippet, rank in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM document_meta").fetchone()[0]
+
+
+_index: Optional[LocalDocumentIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_local_index() -> LocalDocumentIndex:
+    """Return the process-wide local index, creating it on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LocalDocumentIndex()
+    return _index
@@ -0,0 +1,80 @@
+from crewai.tools import BaseTool
+import json
+import sqlite3
+from config.settings import settings
+from tools.passage_store import get_passage_store
+from telemetry.instrumentation import trace_tool
+
+class PassageSearchTool(BaseTool):
+    name: str = "Passage Search Tool"
+    description: str = (
+        "Finds the passages most relevant to a question in every page scraped so far, "
+        "including the parts of long pages the scraper did not return. "
+        "Input should be a query string, or JSON with 'query' and optionally 'urls' "
+        "(only search those pages) and 'k' (number of passages)."
+    )
+
+    @trace_tool
+    def _run(self, query: str) -> str:
+        """
+        Retrieve the top passages for a query from the passage store
+        """
+        try:
+            data = json.loads(query)
+        except (TypeError, json.JSONDecodeError):
+            data = query
+        if not isinstance(data, dict):
+            data = {"query": str(data)}
+
+        # Arguments come from the LLM: accept a single URL and a numeric string for k
+        urls = data.get("urls") or None
+        if isinstance(urls, str):
+            urls = [urls]
+        try:
+            k = int(data["k"]) if data.get("k") is not None else None
+        except (TypeError, ValueError):
+            k = 0
+        valid_urls = urls is None or (isinstance(urls, list) and all(isinstance(u, str) for u in urls))
+        if not isinstance(data.get("query") or "", str) or not valid_urls or (k is not None and k < 1):
+            return json.dumps({
+                "status": "error",
+                "message": "Expected 'query' as a string, 'urls' as a list of URLs and 'k' as a positive number",
+                "passages": []
+            })
+
+        text = (data.get("query") or "").strip()
+        if not text:
+            return json.dumps({
+                "status": "error",
+                "message": "No query provided",
+                "passages": []
+            })
+
+        if not settings.PASSAGE_STORE_ENABLED:
+            return json.dumps({
+                "status": "error",
+                "message": "The passage store is disabled (PASSAGE_STORE_ENABLED)",
+                "passages": []
+            })
+
+        try:
+            passages = get_passage_store().search(text, k=k, urls=urls)
+        except sqlite3.Error as e:
+            return json.dumps({
+                "status": "error",
+                "message": f"Passage search failed: {str(e)}",
+                "passages": []
+            })
+
+        if not passages:
+            return json.dumps({
+                "status": "no_results",
+                "message": f"No scraped passages match: {text}",
+                "passages": []
+            })
+
+        return json.dumps({
+            "status": "success",
+            "query": text,
+            "passages": passages
+        }, indent=2)
@@ -0,0 +1,333 @@
+"""
+Passage-level index of scraped pages.
+
+Every scraped page is kept whole, split into passages (similarity.split_passages)
+and indexed in SQLite FTS5, so tools can ask for the passages most relevant
+to a topic or claim instead of working on the first few thousand characters
+of each page. Passages live in a plain table indexed by page, with the FTS5
+index kept as its external-content index, so reading one page is a B-tree
+lookup rather than a scan of the whole index. Retrieval is BM25; in
+"hybrid" mode the BM25 candidates are reranked with local sentence
+embeddings, whose vectors are stored alongside the passages and computed
+once per passage.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import settings
+from tools.similarity import split_passages
+from tools.text_processing import tokenize
+from tools.url_utils import normalize_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    document TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_by_document ON passages (document, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS passage_index USING fts5(
+    text,
+    content = 'passages',
+    content_rowid = 'id',
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS passage_documents (
+    document TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    content_hash TEXT NOT NULL,
+    passages INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passage_vectors (
+    passage_id INTEGER PRIMARY KEY,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL
+);
+"""
+
+
+def _document_key(url: str) -> str:
+    return normalize_url(url) or url
+
+
+def _placeholders(values) -> str:
+    return ", ".join("?" * len(values))
+
+
+class PassageStore:
+    """
+    SQLite FTS5 index of page passages, keyed by canonical URL
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.PASSAGE_STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def add_document(self, url: str, title: Optional[str], content: str) -> int:
+        """Split a page into passages and (re)index them; returns the passage count"""
+        key = _document_key(url)
+        content_hash = hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, passages FROM passage_documents WHERE document = ?", (key,)
+            ).fetchone()
+        if row and row[0] == content_hash:
+            return row[1]
+
+        passages = split_passages(content or "")
+
+        with self._lock:
+            old = self._db.execute("SELECT id, text FROM passages WHERE document = ?", (key,)).fetchall()
+            # Rows of an external-content FTS5 index are removed by replaying their text as a 'delete'
+            self._db.executemany(
+                "INSERT INTO passage_index (passage_index, rowid, text) VALUES ('delete', ?, ?)", old
+            )
+            self._db.executemany("DELETE FROM passage_vectors WHERE passage_id = ?", [(i,) for i, _ in old])
+            self._db.execute("DELETE FROM passages WHERE document = ?", (key,))
+            for position, passage in enumerate(passages):
+                cursor = self._db.execute(
+                    "INSERT INTO passages (document, position, text) VALUES (?, ?, ?)", (key, position, passage)
+                )
+                self._db.execute("INSERT INTO passage_index (rowid, text) VALUES (?, ?)", (cursor.lastrowid, passage))
+            self._db.execute(
+                "INSERT OR REPLACE INTO passage_documents "
+                "(document, url, title, content_hash, passages, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, title or "", content_hash, len(passages), time.time())
+            )
+            self._db.commit()
+        return len(passages)
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM passage_documents WHERE document = ?", (_document_key(url),)
+            ).fetchone() is not None
+
+    def passages(self, url: str) -> List[str]:
+        """All passages of a page, in page order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT text FROM passages WHERE document = ? ORDER BY position", (_document_key(url),)
+            ).fetchall()
+        return [text for text, in rows]
+
+    def text(self, url: str) -> Optional[str]:
+        """The full indexed text of a page, or None when it was never scraped"""
+        passages = self.passages(url)
+        return "\n\n".join(passages) if passages else None
+
+    def search(self, query: str, k: Optional[int] = None, urls: Optional[Iterable[str]] = None,
+               mode: Optional[str] = None) -> List[Dict]:
+        """
+        The k passages most relevant to query, optionally only from the
+        given pages; highest score first
+        """
+        k = k or settings.PASSAGE_TOP_K
+        mode = mode or settings.PASSAGE_RETRIEVAL_MODE
+
+        matches = self._match(query, urls, max(k, settings.PASSAGE_RERANK_CANDIDATES) if mode == "hybrid" else k)
+        if not matches:
+            return []
+
+        if mode == "hybrid":
+            try:
+                matches = self._rerank(query, matches)
+            except ImportError:
+                # No local embedding model installed; keep the BM25 order
+                pass
+        matches = matches[:k]
+
+        documents = self._documents({match["document"] for match in matches})
+        return [
+            {
+                "url": documents.get(match["document"], (match["document"], ""))[0],
+                "title": documents.get(match["document"], ("", ""))[1] or "Untitled",
+                "position": match["position"],
+                "passage": match["passage"],
+                "score": round(match["score"], 4)
+            }
+            for match in matches
+        ]
+
+    def relevant_passages(self, url: str, query: Optional[str], max_chars: int) -> List[str]:
+        """
+        Passages of one page within max_chars, the most relevant to query
+        first, returned in page order. Without a query, or when nothing
+        matches it, the page's leading passages are used.
+        """
+        return self.select_passages([url], query, max_chars).get(url, [])
+
+    def select_passages(self, urls: List[str], query: Optional[str], max_chars: int) -> Dict[str, List[str]]:
+        """relevant_passages for several pages, ranked with a single index query"""
+        keys = {url: _document_key(url) for url in urls}
+        ranked: Dict[str, List[int]] = {}
+        if query and keys:
+            for match in self._match(query, keys.values(), limit=-1):
+                ranked.setdefault(match["document"], []).append(match["position"])
+
+        selected = {}
+        for url, key in keys.items():
+            passages = self.passages(url)
+            order = ranked.get(key) or range(len(passages))
+            chosen, used = [], 0
+            for position in order:
+                cost = len(passages[position]) + (2 if chosen else 0)
+                if used + cost > max_chars:
+                    # Leading passages stop at the first that does not fit;
+                    # ranked ones let a shorter, less relevant passage fill the gap
+                    if key in ranked:
+                        continue
+                    break
+                chosen.append(position)
+                used += cost
+            selected[url] = [passages[position] for position in sorted(chosen)]
+        return selected
+
+    def _match(self, query: str, urls: Optional[Iterable[str]], limit: int) -> List[Dict]:
+        """BM25-ranked passages containing any query term; a limit of -1 returns all"""
+        terms = tokenize(query, lower=True)
+        if not terms:
+            return []
+
+        # Quote every term so user input can never be read as FTS5 syntax
+        sql = (
+            "SELECT p.id, p.document, p.position, p.text, bm25(passage_index) "
+            "FROM passage_index JOIN passages p ON p.id = passage_index.rowid "
+            "WHERE passage_index MATCH ?"
+        )
+        params: list = [" OR ".join(f'"{term}"' for term in dict.fromkeys(terms))]
+        if urls is not None:
+            keys = list(dict.fromkeys(_document_key(url) for url in urls))
+            if not keys:
+                return []
+            sql += f" AND p.document IN ({_placeholders(keys)})"
+            params.extend(keys)
+        sql += " ORDER BY bm25(passage_index) LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+
+        # bm25() is lower-is-better; flip it so higher means more relevant
+        return [
+            {"id": passage_id, "document": document, "position": position, "passage": text, "score": -rank}
+            for passage_id, document, position, text, rank in rows
+        ]
+
+    def _documents(self, keys) -> Dict[str, Tuple[str, str]]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT document, url, title FROM passage_documents WHERE document IN ({_placeholders(keys)})",
+                keys
+            ).fetchall()
+        return {document: (url, title) for document, url, title in rows}
+
+    def _rerank(self, query: str, matches: List[Dict]) -> List[Dict]:
+        """Order BM25 candidates by an even mix of normalized BM25 and embedding similarity"""
+        from tools.similarity import get_embedding_model
+
+        model = get_embedding_model()
+        vectors = self._vectors(model, matches)
+        query_vector = model.encode([query], normalize_embeddings=True, convert_to_numpy=True)[0]
+        similarity = vectors @ query_vector
+
+        best = max(match["score"] for match in matches) or 1.0
+        for match, cosine in zip(matches, similarity):
+            match["score"] = 0.5 * match["score"] / best + 0.5 * float(cosine)
+        return sorted(matches, key=lambda match: match["score"], reverse=True)
+
+    def _vectors(self, model, matches: List[Dict]):
+        """Embeddings of the matched passages; only passages not embedded before are encoded"""
+        import numpy as np
+
+        ids = [match["id"] for match in matches]
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT passage_id, vector FROM passage_vectors WHERE model = ? AND passage_id IN ({_placeholders(ids)})",
+                [settings.EMBEDDING_MODEL, *ids]
+            ).fetchall()
+        stored = {passage_id: np.frombuffer(vector, dtype=np.float32) for passage_id, vector in rows}
+
+        missing = [match for match in matches if match["id"] not in stored]
+        if missing:
+            encoded = model.encode(
+                [match["passage"] for match in missing], normalize_embeddings=True, convert_to_numpy=True
+            ).astype(np.float32)
+            for match, vector in zip(missing, encoded):
+                stored[match["id"]] = vector
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO passage_vectors (passage_id, model, vector) VALUES (?, ?, ?)",
+                    [(match["id"], settings.EMBEDDING_MODEL, vector.tobytes()) for match, vector in zip(missing, encoded)]
+                )
+                self._db.commit()
+
+        return np.stack([stored[i] for i in ids])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM passage_documents").fetchone()[0]
+
+
+def with_stored_text(sources: List[Dict], query: Optional[str] = None,
+                     max_chars: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """
+    Read sources whose pages are in the passage store from the store. With
+    a query, their content becomes the page's passages most relevant to it
+    (within max_chars, SCRAPER_MAX_CONTENT_CHARS by default), replacing
+    whatever excerpt the agent passed; without one, only sources given
+    without content are filled, with the page's leading passages.
+    Returns (sources, replaced count).
+    """
+    if not settings.PASSAGE_STORE_ENABLED:
+        return sources, 0
+
+    def wanted(source) -> bool:
+        return isinstance(source, dict) and bool(source.get("url")) and bool(query or not source.get("content"))
+
+    store = get_passage_store()
+    stored = [url for url in dict.fromkeys(s["url"] for s in sources if wanted(s)) if url in store]
+    selected = store.select_passages(stored, query, max_chars or settings.SCRAPER_MAX_CONTENT_CHARS)
+    texts = {url: "\n\n".join(passages) for url, passages in selected.items()}
+
+    result, replaced = [], 0
+    for source in sources:
+        text = texts.get(source["url"]) if wanted(source) else None
+        if text:
+            source = {**source, "content": text}
+            replaced += 1
+        result.append(source)
+    return result, replaced
+
+
+_store: Optional[PassageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_passage_store() -> PassageStore:
+    """Return the process-wide passage store, creating it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PassageStore()
+    return _store
@@ -0,0 +1,182 @@
+"""
+Pluggable search backends for WebSearchTool.
+
+Backends are registered by name and tried in order; when one is
+unavailable, fails or returns nothing, the next one is used.
+"""
+
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from tools.http_client import get_http_client
+
+
+class SearchBackend:
+    """
+    Base class for search backends
+    """
+
+    name: str = "base"
+
+    def available(self) -> bool:
+        """Whether the backend can be used in this environment"""
+        return True
+
+    def search(self, query: str, max_results: int) -> List[Dict]:
+        """
+        Return results as dicts with title, snippet, url and source.
+        Raise on failure so the caller can fall back to the next backend.
+        """
+        raise NotImplementedError
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """DuckDuckGo Instant Answer API (no key required)"""
+
+    name = "duckduckgo"
+
+    def search(self, query: str, max_results: int) -> List[Dict]:
+        url = settings.DUCKDUCKGO_API_URL
+        params = {
+            "q": query,
+            "format": "json",
+            "no_html": 1,
+            "skip_disambig": 1
+        }
+
+        response = get_http_client().get(url, params=params, timeout=10)
+        data = response.json()
+
+        results = []
+
+        if data.get("Abstract"):
+            results.append({
+                "title": data.get("Heading", "Summary"),
+                "snippet": data.get("Abstract"),
+                "url": data.get("AbstractURL", ""),
+                "source": data.get("AbstractSource", "DuckDuckGo")
+            })
+
+        for topic in data.get("RelatedTopics", [])[:5]:
+            if isinstance(topic, dict) and "Text" in topic:
+                results.append({
+                    "title": topic.get("Text", "")[:100],
+                    "snippet": topic.get("Text", ""),
+                    "url": topic.get("FirstURL", ""),
+                    "source": "DuckDuckGo"
+                })
+
+        return results[:max_results]
+
+
+class SerperBackend(SearchBackend):
+    """Google results through the Serper API (needs SERPER_API_KEY)"""
+
+    name = "serper"
+
+    def available(self) -> bool:
+        return bool(os.getenv("SERPER_API_KEY"))
+
+    def search(self, query: str, max_results: int) -> List[Dict]:
+        response = get_http_client().post(
+            "https://google.serper.dev/search",
+            json={"q": query, "num": max_results},
+            headers={"X-API-KEY": os.getenv("SERPER_API_KEY", "")},
+            timeout=10
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        results = []
+
+        answer = data.get("answerBox") or {}
+        if answer.get("snippet") or answer.get("answer"):
+            results.append({
+                "title": answer.get("title", "Answer"),
+                "snippet": answer.get("snippet") or answer.get("answer"),
+                "url": answer.get("link", ""),
+                "source": "Serper"
+            })
+
+        for item in data.get("organic", []):
+            results.append({
+                "title": item.get("title", ""),
+                "snippet": item.get("snippet", ""),
+                "url": item.get("link", ""),
+                "source": "Serper"
+            })
+
+        return results[:max_results]
+
+
+class LocalIndexBackend(SearchBackend):
+    """BM25 search over previously scraped documents, fully offline"""
+
+    name = "local"
+
+    def available(self) -> bool:
+        return settings.LOCAL_INDEX_ENABLED
+
+    def search(self, query: str, max_results: int) -> List[Dict]:
+        from tools.local_index import get_local_index
+
+        return get_local_index().search(query, limit=max_results)
+
+
+_BACKENDS: Dict[str, Callable[[], SearchBackend]] = {}
+
+
+def register_backend(name: str, factory: Callable[[], SearchBackend]):
+    """Register a backend factory under a name usable in SEARCH_BACKENDS"""
+    _BACKENDS[name] = factory
+
+
+def get_backend(name: str) -> SearchBackend:
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown search backend '{name}'. Expected one of: {', '.join(_BACKENDS)}")
+    return _BACKENDS[name]()
+
+
+def available_backends() -> List[str]:
+    return list(_BACKENDS)
+
+
+def search_with_fallback(
+    query: str,
+    backend_names: Optional[List[str]] = None,
+    max_results: Optional[int] = None,
+) -> Tuple[Optional[str], List[Dict]]:
+    """
+    Try backends in order and return (backend name, results) from the first
+    one that answers with results. Raises the last error if every usable
+    backend failed.
+    """
+    backend_names = backend_names or settings.SEARCH_BACKENDS
+    max_results = max_results or settings.MAX_SEARCH_RESULTS
+
+    last_error: Optional[Exception] = None
+    answered = False
+
+    for name in backend_names:
+        backend = get_backend(name)
+        if not backend.available():
+            continue
+        try:
+            results = backend.search(query, max_results)
+        except Exception as e:
+            last_error = e
+            continue
+        answered = True
+        if results:
+            return name, results
+
+    if last_error is not None and not answered:
+        raise last_error
+
+    return None, []
+
+
+register_backend(DuckDuckGoBackend.name, DuckDuckGoBackend)
+register_backend(SerperBackend.name, SerperBackend)
+register_backend(LocalIndexBackend.name, LocalIndexBackend)
@@ -0,0 +1,139 @@
+"""
+Vectorized claim-to-passage similarity for FactCheckTool.
+
+Sources are split into passages, claims and passages are encoded into
+TF-IDF (or, optionally, sentence-embedding) matrices, and every
+claim-passage pair is scored with a single matrix product.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_embedding_model = None
+_embedding_lock = threading.Lock()
+
+
+def split_passages(text: str, max_chars: Optional[int] = None) -> List[str]:
+    """
+    Split text into passages: paragraphs, with long paragraphs packed
+    sentence by sentence into windows of at most max_chars
+    """
+    max_chars = max_chars or settings.PASSAGE_MAX_CHARS
+    passages = []
+
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            passages.append(paragraph)
+            continue
+
+        window = ""
+        for sentence in _SENTENCE_RE.split(paragraph):
+            if window and len(window) + len(sentence) + 1 > max_chars:
+                passages.append(window)
+                window = ""
+            window = f"{window} {sentence}".strip()
+        if window:
+            passages.append(window)
+
+    return passages
+
+
+def get_embedding_model():
+    """Load the local sentence-embedding model once per process"""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+
+                _embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+    return _embedding_model
+
+
+class PassageMatcher:
+    """
+    Scores claims against all passages of a set of sources at once
+    """
+
+    def __init__(self, sources: List[Dict], mode: str = "tfidf"):
+        if mode not in ("tfidf", "embedding"):
+            raise ValueError(f"Unknown similarity mode '{mode}'. Expected 'tfidf' or 'embedding'")
+
+        self.sources = sources
+        self.mode = mode
+        self.passages: List[Tuple[int, str]] = [
+            (source_id, passage)
+            for source_id, source in enumerate(sources)
+            for passage in split_passages(source.get("content", ""))
+        ]
+
+    def score(self, claims: List[str]):
+        """
+        Similarity matrix of shape (len(claims), len(passages))
+        """
+        import numpy as np
+
+        if not claims or not self.passages:
+            return np.zeros((len(claims), len(self.passages)))
+
+        texts = [passage for _, passage in self.passages]
+
+        if self.mode == "embedding":
+            model = get_embedding_model()
+            passage_vectors = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+            claim_vectors = model.encode(claims, normalize_embeddings=True, convert_to_numpy=True)
+            return claim_vectors @ passage_vectors.T
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+        try:
+            passage_matrix = vectorizer.fit_transform(texts)
+        except ValueError:
+            # Every passage was empty after stop-word removal
+            return np.zeros((len(claims), len(self.passages)))
+        claim_matrix = vectorizer.transform(claims)
+
+        # Rows are L2-normalized, so the sparse product is the cosine similarity
+        return (claim_matrix @ passage_matrix.T).toarray()
+
+    def top_passages(self, claims: List[str], k: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Best k passages per claim, highest similarity first
+        """
+        import numpy as np
+
+        k = k or settings.FACT_CHECK_TOP_PASSAGES
+        scores = self.score(claims)
+        if scores.shape[1] == 0:
+            return [[] for _ in claims]
+
+        k = min(k, scores.shape[1])
+        # argpartition finds the top k per row without a full sort
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            matches = []
+            for passage_idx in ordered:
+                score = float(scores[row, passage_idx])
+                if score <= 0:
+                    continue
+                source_id, passage = self.passages[passage_idx]
+                matches.append({
+                    "source_id": source_id,
+                    "passage": passage,
+                    "score": round(score, 4)
+                })
+            results.append(matches)
+        return results
@@ -0,0 +1,54 @@
+"""
+Token-level inverted index over a set of source texts.
+"""
+
+from typing import Dict, Iterable, List
+
+from tools.text_processing import tokenize
+
+
+class InvertedIndex:
+    """
+    Maps each lowercase token to the sources containing it.
+
+    Built once per tool call so every claim is answered with dictionary
+    lookups instead of substring scans over the concatenated sources.
+    Matching is on whole tokens, so "art" no longer matches "start".
+    Token positions are resolved on demand from the kept token lists, which
+    keeps building the index close to the cost of tokenizing.
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        self.postings: Dict[str, List[int]] = {}
+        self.tokens: List[List[str]] = []
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text, lower=True)
+            self.tokens.append(tokens)
+            for token in set(tokens):
+                self.postings.setdefault(token, []).append(doc_id)
+
+    @property
+    def num_documents(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, term: str) -> bool:
+        return term.lower() in self.postings
+
+    def documents(self, term: str) -> List[int]:
+        """Ids of the sources containing term, in source order"""
+        return list(self.postings.get(term.lower(), ()))
+
+    def positions(self, term: str, doc_id: int) -> List[int]:
+        """Token positions of term within one source"""
+        term = term.lower()
+        if doc_id not in self.postings.get(term, ()):
+            return []
+        return [i for i, token in enumerate(self.tokens[doc_id]) if token == term]
+
+    def documents_with_any(self, terms: Iterable[str]) -> List[int]:
+        """Ids of the sources containing at least one of terms, in source order"""
+        doc_ids = set()
+        for term in terms:
+            doc_ids.update(self.postings.get(term.lower(), ()))
+        return sorted(doc_ids)
@@ -0,0 +1,62 @@
+"""
+Shared tokenization and keyword extraction for the analysis tools.
+
+Patterns are compiled and the stopword set is built once at import. A
+source is tokenized a single time into token counts, and keywords and
+contradiction terms are derived from the distinct tokens rather than from
+every occurrence.
+"""
+
+import re
+from collections import Counter
+from typing import List
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Capitalized words and lowercase words of four or more letters, one per line
+_KEYWORD_LINE_RE = re.compile(r"^(?:[A-Z][a-z]+|[a-z]{4,})$", re.MULTILINE)
+
+STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'is', 'was', 'are', 'were', 'been', 'be', 'have', 'has',
+    'had', 'that', 'this', 'it', 'from', 'by', 'as'
+})
+
+
+def tokenize(text: str, lower: bool = False) -> List[str]:
+    """Split text into word tokens, optionally lowercased"""
+    return TOKEN_RE.findall(text.lower() if lower else text)
+
+
+def token_counts(text: str) -> Counter:
+    """Case-preserved token frequencies, in first-occurrence order"""
+    return Counter(tokenize(text))
+
+
+def keyword_counts(tokens: Counter) -> Counter:
+    """
+    Frequency of candidate keywords (capitalized words and lowercase words
+    of four or more letters), lowercased and with stopwords removed
+    """
+    # Tokens never contain newlines, so one regex pass over the distinct
+    # tokens joined line by line filters them all
+    keywords = _KEYWORD_LINE_RE.findall("\n".join(tokens))
+    lowered = [keyword.lower() for keyword in keywords]
+
+    counts = Counter(dict.fromkeys(lowered, 0))
+    for key, keyword in zip(lowered, keywords):
+        counts[key] += tokens[keyword]
+    for word in STOPWORDS:
+        counts.pop(word, None)
+    return counts
+
+
+def top_keywords(tokens: Counter, top_n: int = 10) -> List[str]:
+    """Most frequent keywords; ties keep first-occurrence order"""
+    return [word for word, _ in keyword_counts(tokens).most_common(top_n)]
+
+
+def key_terms(text: str, limit: int = 10) -> List[str]:
+    """Lowercase terms of three or more characters that are not stopwords, in text order"""
+    terms = [t for t in tokenize(text, lower=True) if len(t) >= 3 and t not in STOPWORDS]
+    return terms[:limit]
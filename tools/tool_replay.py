@@ -0,0 +1,128 @@
+"""
+Persistent log of tool results, so a resumed run does not fetch again.
+
+While a log is active (see recording()), tools whose _run is decorated with
+replayable answer a call already made in this run from the log, and append
+every new successful result to it. Results that failed, found nothing, or
+failed in part (a batch with a page that could not be fetched, a search
+with a query that errored) are not recorded, so a resumed run makes those
+calls again. The log is a JSON-lines file, so results
+recorded before a crash survive it.
+"""
+
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from telemetry.tracing import set_span_attributes
+
+_active_log: contextvars.ContextVar[Optional["ToolResultLog"]] = contextvars.ContextVar(
+    "active_tool_log", default=None
+)
+
+
+class ToolResultLog:
+    """
+    Tool results of one run keyed by tool name and arguments
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results: Dict[str, str] = {}
+        self._stats = {"replayed": 0, "recorded": 0}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash; everything before it is intact
+                        continue
+                    self._results[entry["key"]] = entry["result"]
+
+    @staticmethod
+    def key(tool_name: str, args, kwargs) -> str:
+        canonical = json.dumps([tool_name, args, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._stats["replayed"] += 1
+        return result
+
+    def put(self, key: str, tool_name: str, result: str):
+        line = json.dumps({"key": key, "tool": tool_name, "result": result})
+        with self._lock:
+            self._results[key] = result
+            self._stats["recorded"] += 1
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._results)}
+
+
+@contextmanager
+def recording(log: Optional[ToolResultLog]) -> Iterator[Optional[ToolResultLog]]:
+    """Record and replay tool results through log for the enclosed block"""
+    token = _active_log.set(log)
+    try:
+        yield log
+    finally:
+        _active_log.reset(token)
+
+
+def _is_failure(result: str) -> bool:
+    """Whether a tool result is an error, empty, or includes failed parts"""
+    try:
+        data = json.loads(result)
+    except (TypeError, ValueError):
+        return False
+    if not isinstance(data, dict):
+        return False
+    if data.get("status") in ("error", "no_results") or data.get("errors"):
+        return True
+    if data.get("scraped") == 0 or data.get("total_results") == 0:
+        return True
+    results = data.get("results")
+    return isinstance(results, list) and any(
+        isinstance(r, dict) and r.get("status") == "error" for r in results
+    )
+
+
+def replayable(run):
+    """Decorator for a tool's _run: answer repeated calls from the active ToolResultLog"""
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        log = _active_log.get()
+        if log is None:
+            return run(self, *args, **kwargs)
+
+        key = log.key(self.name, args, kwargs)
+        cached = log.get(key)
+        if cached is not None:
+            set_span_attributes(**{"tool.replayed": True})
+            return cached
+
+        result = run(self, *args, **kwargs)
+        # Failures are not recorded, so a resumed run tries them again
+        if isinstance(result, str) and not _is_failure(result):
+            log.put(key, self.name, result)
+        return result
+
+    return wrapper
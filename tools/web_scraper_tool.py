@@ -1,101 +1,245 @@
 import requests
-from bs4 import BeautifulSoup
-from crewai.tools import BaseTool 
+from crewai.tools import BaseTool
 import json
-import validators
+import sqlite3
+from typing import Dict, List, Optional
 from config.settings import settings
+from tools.http_client import get_http_client
+from tools.dedup import deduplicate_sources
+from tools.document_cache import get_document_cache
+from tools.local_index import get_local_index
+from tools.knowledge_store import record_source
+from tools.passage_store import get_passage_store
+from tools.html_extractors import StreamingExtractor, charset_from_content_type, get_extractor
+from tools.tool_replay import replayable
+from tools.url_utils import normalize_url
+from telemetry.instrumentation import trace_tool
+from telemetry.tracing import set_span_attributes
 
 class WebScraperTool(BaseTool):
     name: str = "Web Scraper Tool"
     description: str = (
         "Scrapes content from a given URL and extracts main text, headings, and metadata. "
-        "Input should be a valid URL string."
+        "Input should be a valid URL string. Long pages are cut to their most relevant "
+        "passages for the optional 'query' (the topic or question), or to their beginning without one."
     )
-    
-    def _run(self, url: str) -> str:
+
+    @trace_tool
+    @replayable
+    def _run(self, url: str, query: str = "") -> str:
         """
         Scrape and extract content from a webpage
         """
+        result = self.scrape(url, query=query)
+        if result["status"] != "success":
+            return json.dumps(result)
+        return json.dumps(result, indent=2)
+
+    def scrape(self, url: str, query: Optional[str] = None) -> Dict:
+        """
+        Fetch a single URL and return the extracted result as a dict. The
+        whole page is indexed; the returned content is cut to
+        SCRAPER_MAX_CONTENT_CHARS, keeping the passages most relevant to query.
+        """
+        import validators
+
         try:
             # Validate URL
             if not validators.url(url):
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": "Invalid URL provided",
                     "content": None
-                })
-            
-            # Fetch page content
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(
-                url, 
-                headers=headers, 
-                timeout=settings.SCRAPING_TIMEOUT
-            )
+                }
+
+            if settings.SCRAPER_MODE == "streaming":
+                document = self._scrape_streaming(url)
+                self._index(url, document)
+                return {
+                    "status": "success",
+                    "url": url,
+                    **self._fit_content(url, document, query)
+                }
+
+            # Fetch page content over the shared connection pool
+            response = get_http_client().get(url, timeout=settings.SCRAPING_TIMEOUT)
             response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'lxml')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "aside"]):
-                script.decompose()
-            
-            # Extract metadata
-            title = soup.find('title')
-            title_text = title.string if title else "No title"
-            
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            description = meta_desc['content'] if meta_desc and meta_desc.get('content') else ""
-            
-            # Extract headings
-            headings = []
-            for heading in soup.find_all(['h1', 'h2', 'h3'])[:10]:
-                headings.append({
-                    "level": heading.name,
-                    "text": heading.get_text(strip=True)
-                })
-            
-            # Extract main content
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
-            
-            if main_content:
-                # Get paragraphs
-                paragraphs = [p.get_text(strip=True) for p in main_content.find_all('p')]
-                content_text = '\n\n'.join([p for p in paragraphs if len(p) > 50])[:5000]
-            else:
-                content_text = soup.get_text(separator='\n', strip=True)[:5000]
-            
-            result = {
+
+            # Parsing is skipped entirely when this exact body was seen before;
+            # the namespace keeps documents extracted under another length cap apart
+            document = get_document_cache().get_or_extract(
+                response.content, self._extract, namespace=f"chars{settings.SCRAPER_MAX_DOCUMENT_CHARS}"
+            )
+
+            self._index(url, document)
+
+            return {
                 "status": "success",
                 "url": url,
-                "title": title_text,
-                "description": description,
-                "headings": headings,
-                "content": content_text,
-                "word_count": len(content_text.split())
+                **self._fit_content(url, document, query)
             }
-            
-            return json.dumps(result, indent=2)
-            
+
         except requests.exceptions.Timeout:
-            return json.dumps({
+            return {
                 "status": "error",
                 "message": "Request timed out",
                 "content": None
-            })
+            }
         except requests.exceptions.RequestException as e:
-            return json.dumps({
+            return {
                 "status": "error",
                 "message": f"Failed to fetch URL: {str(e)}",
                 "content": None
-            })
+            }
         except Exception as e:
-            return json.dumps({
+            return {
                 "status": "error",
                 "message": f"Scraping failed: {str(e)}",
                 "content": None
-            })
\ No newline at end of file
+            }
+
+    def scrape_many(self, urls: List[str], query: Optional[str] = None) -> List[Dict]:
+        """
+        Scrape several URLs concurrently, returning results in input order
+        """
+        return get_http_client().map(lambda url: self.scrape(url, query=query), urls)
+
+    def _index(self, url: str, document: Dict):
+        """Add a scraped page to the local search index, the passage store and the knowledge store"""
+        if not document.get("content"):
+            return
+        try:
+            if settings.LOCAL_INDEX_ENABLED:
+                get_local_index().add_document(
+                    url,
+                    document.get("title"),
+                    document.get("description", ""),
+                    document["content"]
+                )
+            if settings.PASSAGE_STORE_ENABLED:
+                get_passage_store().add_document(url, document.get("title"), document["content"])
+        except sqlite3.Error:
+            # The indexes are a best-effort side effect; never fail a scrape over them
+            pass
+        record_source(url, document.get("title"), document.get("description", ""), document["content"])
+
+    def _fit_content(self, url: str, document: Dict, query: Optional[str]) -> Dict:
+        """
+        The document with its content cut to SCRAPER_MAX_CONTENT_CHARS: the
+        passages most relevant to query, or the leading ones
+        """
+        content = document.get("content") or ""
+        max_chars = settings.SCRAPER_MAX_CONTENT_CHARS
+        if len(content) <= max_chars:
+            return document
+
+        passages = []
+        if settings.PASSAGE_STORE_ENABLED:
+            try:
+                passages = get_passage_store().relevant_passages(url, query, max_chars)
+            except sqlite3.Error:
+                pass
+        fitted = "\n\n".join(passages) if passages else content[:max_chars]
+
+        return {
+            **document,
+            "content": fitted,
+            "word_count": len(fitted.split()),
+            # The whole page stays available to the passage search and verification tools
+            "page_word_count": document.get("word_count", len(content.split())),
+            "content_selection": "relevant_passages" if query and passages else "leading_text"
+        }
+
+    def _scrape_streaming(self, url: str) -> Dict:
+        """
+        Read the body incrementally and stop once SCRAPER_STREAMING_MAX_CHARS
+        of text are collected or SCRAPER_MAX_BYTES have been read. Only the
+        text read so far is indexed, unlike full mode which keeps up to
+        SCRAPER_MAX_DOCUMENT_CHARS.
+        """
+        with get_http_client().stream(url, timeout=settings.SCRAPING_TIMEOUT) as response:
+            response.raise_for_status()
+
+            extractor = StreamingExtractor(
+                max_chars=settings.SCRAPER_STREAMING_MAX_CHARS,
+                encoding=charset_from_content_type(response.headers.get("Content-Type"))
+            )
+            bytes_read = 0
+            for chunk in response.iter_content(chunk_size=settings.SCRAPER_CHUNK_SIZE):
+                bytes_read += len(chunk)
+                if extractor.feed(chunk) or bytes_read >= settings.SCRAPER_MAX_BYTES:
+                    break
+            set_span_attributes(**{"http.response_bytes": bytes_read})
+
+            return extractor.result()
+
+    def _extract(self, html: bytes) -> Dict:
+        """Extract title, description, headings and main text from raw HTML"""
+        return get_extractor()(html)
+
+
+class BatchWebScraperTool(BaseTool):
+    name: str = "Batch Web Scraper Tool"
+    description: str = (
+        "Scrapes several URLs at once and returns the extracted content of each page. "
+        "Much faster than scraping URLs one by one. "
+        "Input should be a JSON list of URL strings, URLs separated by commas or newlines, "
+        "or a JSON object with 'urls' (the list) and 'query'. "
+        "Pass the research topic as 'query' to get the most relevant passages of long pages."
+    )
+
+    @trace_tool
+    @replayable
+    def _run(self, urls: str, query: str = "") -> str:
+        """
+        Scrape a list of URLs concurrently
+        """
+        if isinstance(urls, str):
+            try:
+                url_list = json.loads(urls)
+            except json.JSONDecodeError:
+                url_list = urls.replace(",", "\n").splitlines()
+        else:
+            url_list = urls
+
+        if isinstance(url_list, dict):
+            query = url_list.get("query") or query
+            url_list = url_list.get("urls") or []
+        if isinstance(url_list, str):
+            url_list = [url_list]
+        if not isinstance(url_list, list) or not isinstance(query, str):
+            return json.dumps({
+                "status": "error",
+                "message": "Expected a list of URLs, or an object with 'urls' and 'query'",
+                "results": []
+            })
+
+        url_list = [u.strip() for u in url_list if isinstance(u, str) and u.strip()]
+
+        if not url_list:
+            return json.dumps({
+                "status": "error",
+                "message": "No URLs provided",
+                "results": []
+            })
+
+        # Keep order, drop repeats (including other spellings of the same URL), cap the batch size
+        unique_urls = {}
+        for url in url_list:
+            unique_urls.setdefault(normalize_url(url) or url, url)
+        url_list = list(unique_urls.values())[:settings.SCRAPER_MAX_BATCH]
+
+        results = WebScraperTool().scrape_many(url_list, query=query)
+
+        # Mirrors and syndicated copies are returned once, listing the URLs merged into them
+        merged = []
+        if settings.SOURCE_DEDUP_ENABLED:
+            dedup = deduplicate_sources(results)
+            results, merged = dedup.sources, dedup.merged
+
+        return json.dumps({
+            "status": "success",
+            "scraped": sum(1 for r in results if r.get("status") == "success"),
+            "duplicates_merged": merged,
+            "results": results
+        }, indent=2)
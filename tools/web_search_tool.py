@@ -1,7 +1,15 @@
-import requests
-from typing import List, Dict
+from typing import List, Dict, Optional
 from crewai.tools import BaseTool
 import json
+from config.settings import settings
+from tools.http_client import get_http_client
+from tools.search_backends import search_with_fallback
+from tools.url_utils import normalize_url
+from tools.tool_replay import replayable
+from telemetry.instrumentation import trace_tool
+
+# Reciprocal-rank-fusion constant: dampens the advantage of the very top ranks
+RRF_K = 60
 
 
 class WebSearchTool(BaseTool):
@@ -11,60 +19,140 @@ class WebSearchTool(BaseTool):
         "Returns a list of relevant URLs and snippets. "
         "Input should be a search query string."
     )
+    # Search backends to try in order; defaults to settings.SEARCH_BACKENDS
+    backends: Optional[List[str]] = None
 
+    @trace_tool
+    @replayable
     def _run(self, query:str):
         """
-        Execute web search using DuckDuckGo API (no key required)
+        Execute web search, falling back across the configured backends
         """
+        result = self.search(query)
+        if result["status"] != "success":
+            return json.dumps(result)
+        return json.dumps(result, indent=2)
 
+    def search(self, query: str) -> Dict:
+        """
+        Run a single query and return the result payload as a dict
+        """
         try:
-            url = "https://api.duckduckgo.com/"
-            params = {
-                "q": query,
-                "format": "json",
-                "no_html":1,
-                "skip_disambig":1
-            }
+            backend, results = search_with_fallback(query, self.backends)
 
-            response = requests.get(url=url, params=params, timeout=10)
-            data = response.json()
-
-            results = []
-
-            if data.get("Abstract"):
-                results.append({
-                    "title": data.get("Heading", "Summary"),
-                    "snippet": data.get("Abstract"),
-                    "url": data.get("AbstractURL", ""),
-                    "source": data.get("AbstractSource", "DuckDuckGo")
-                })
-            
-
-            for topic in data.get("RelatedTopics", [])[:5]:
-                if isinstance(topic, dict) and "Text" in topic:
-                    results.append({
-                        "title": topic.get("Text", "")[:100],
-                        "snippet": topic.get("Text", ""),
-                        "url": topic.get("FirstURL", ""),
-                        "source": "DuckDuckGo"
-                    })
-            
             if not results:
-                return json.dumps({
+                return {
                     "status": "no_results",
                     "message": f"No results found for query: {query}",
                     "results": []
-                })
-            
-            return json.dumps({
+                }
+
+            return {
                 "status": "success",
                 "query": query,
+                "backend": backend,
                 "results": results[:10]
-            }, indent=2)
-            
+            }
+
         except Exception as e:
-            return json.dumps({
+            return {
                 "status": "error",
                 "message": f"Search failed: {str(e)}",
                 "results": []
-            })
\ No newline at end of file
+            }
+
+    def search_many(self, queries: List[str]) -> Dict:
+        """
+        Run several queries concurrently and merge their results.
+
+        Results are deduplicated by normalized URL and ranked with reciprocal
+        rank fusion, so pages returned by several query variants come first.
+        """
+        responses = get_http_client().map(self.search, queries)
+
+        merged: Dict[str, Dict] = {}
+        errors = []
+
+        for query, response in zip(queries, responses):
+            if response["status"] == "error":
+                errors.append({"query": query, "message": response["message"]})
+                continue
+
+            for rank, item in enumerate(response["results"]):
+                key = normalize_url(item.get("url", "")) or item.get("title", "").lower()
+                entry = merged.get(key)
+                if entry is None:
+                    entry = merged[key] = {**item, "matched_queries": [], "score": 0.0}
+                if query not in entry["matched_queries"]:
+                    entry["matched_queries"].append(query)
+                entry["score"] += 1.0 / (RRF_K + rank + 1)
+
+        ranked = sorted(merged.values(), key=lambda r: r["score"], reverse=True)
+        ranked = ranked[:settings.SEARCH_MAX_MERGED_RESULTS]
+        for item in ranked:
+            item["score"] = round(item["score"], 4)
+
+        if ranked:
+            status = "success"
+        elif errors and len(errors) == len(queries):
+            status = "error"
+        else:
+            status = "no_results"
+
+        return {
+            "status": status,
+            "queries": queries,
+            "total_results": len(ranked),
+            "results": ranked,
+            "errors": errors
+        }
+
+
+class MultiQuerySearchTool(BaseTool):
+    name: str = "Multi-Query Search Tool"
+    description: str = (
+        "Searches the web for several query variants at once and returns one merged, "
+        "deduplicated and ranked list of URLs and snippets. Prefer this over repeated "
+        "single searches. Input should be a JSON list of query strings, queries "
+        "separated by newlines, or a JSON object with 'queries' (the list)."
+    )
+    backends: Optional[List[str]] = None
+
+    @trace_tool
+    @replayable
+    def _run(self, queries: str) -> str:
+        """
+        Fan a list of queries out concurrently and merge the results
+        """
+        if isinstance(queries, str):
+            try:
+                query_list = json.loads(queries)
+            except json.JSONDecodeError:
+                query_list = queries.splitlines()
+        else:
+            query_list = queries
+
+        if isinstance(query_list, dict):
+            query_list = query_list.get("queries") or []
+        if isinstance(query_list, str):
+            query_list = [query_list]
+        if not isinstance(query_list, list):
+            return json.dumps({
+                "status": "error",
+                "message": "Expected a list of queries, or an object with 'queries'",
+                "results": []
+            })
+
+        query_list = [q.strip() for q in query_list if isinstance(q, str) and q.strip()]
+
+        if not query_list:
+            return json.dumps({
+                "status": "error",
+                "message": "No queries provided",
+                "results": []
+            })
+
+        # Keep order, drop repeats, cap the fan-out
+        query_list = list(dict.fromkeys(query_list))[:settings.SEARCH_MAX_QUERIES]
+
+        return json.dumps(WebSearchTool(backends=self.backends).search_many(query_list), indent=2)